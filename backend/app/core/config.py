@@ -78,14 +78,121 @@ class Settings(BaseSettings):
     THUMBNAIL_TYPE: str = "mock"
     LOCAL_STORAGE_PATH: str = ""
 
+    # CPU pool: OCR, thumbnails and local embeddings run in worker processes
+    # None starts one process per core, 0 runs the work on threads in-process
+    CPU_POOL_WORKERS: Optional[int] = None
+    # resources loaded once per pool process: "auto", or a list of "tesseract", "bge"
+    CPU_POOL_WARMUP: str = "auto"
+
     # OCR
-    OCR_BACKEND: str = "supersimple"  # mock, google, supersimple
+    # mock, google, tesseract, supersimple; a comma-separated list is a fallback chain, e.g. "google,tesseract"
+    OCR_BACKEND: str = "supersimple"
+    # per-call timeout, OCR_<BACKEND>_TIMEOUT_S overrides it for one backend
+    OCR_TIMEOUT_S: float = 120.0
+    # also the HTTP timeout of the Vision client, so the two never disagree
+    OCR_GOOGLE_TIMEOUT_S: Optional[float] = 60.0
+    # a backend is skipped for OCR_BREAKER_RESET_S after this many consecutive failures
+    OCR_BREAKER_FAILURES: int = 5
+    OCR_BREAKER_RESET_S: float = 60.0
     GOOGLE_API_KEY: Optional[str] = None
+    # concurrent pages are sent together, up to 16 per images:annotate request;
+    # raise OCR_WORKER_CONCURRENCY to fill the batches
+    GOOGLE_VISION_BATCH_SIZE: int = 16
+    GOOGLE_VISION_BATCH_WAIT_MS: float = 50.0
+    # tesseract engine (0 legacy, 1 LSTM) and page segmentation mode; pages run in parallel in the
+    # CPU pool, so each tesseract keeps to few threads
+    TESSERACT_LANG: str = "eng"
+    TESSERACT_OEM: int = 1
+    TESSERACT_PSM: int = 3
+    TESSERACT_THREADS: int = 1
+    # reuse OCR results of byte-identical images
+    OCR_CACHE_ENABLED: bool = True
+    # normalize pages before OCR: downscale to the DPI, grayscale, deskew, optionally binarize
+    OCR_PREPROCESS: bool = True
+    OCR_PREPROCESS_DPI: int = 300
+    OCR_PREPROCESS_DESKEW: bool = True
+    OCR_PREPROCESS_BINARIZE: bool = False
+    # PDF and ZIP uploads are split into pages; PDFs are rendered at this resolution
+    INGEST_PDF_DPI: int = 300
+    INGEST_MAX_PAGES: int = 1000
     MOCK_RESPONSE_FILE: str = "tests/unit/data/google_vision_response.json"
-    SEGMENTATION: str = "mock"
+    # text-vs-photo page routing: "numpy" measures the page, "simple" alternates (for demos)
+    TEXT_OR_IMAGE: str = "numpy"
+    # text probability from which a page is sent to OCR
+    TEXT_PAGE_THRESHOLD: float = 0.35
+    # "geometry" splits pages into recipes from the OCR layout, "mock" keeps every page whole
+    SEGMENTATION: str = "geometry"
+    # segmentations at least this confident skip the manual review, e.g. 0.8; opt-in like
+    # CLS_AUTO_APPROVE, unset every page is reviewed
+    SEG_AUTO_APPROVE_CONFIDENCE: Optional[float] = None
+
+    # checkpoints of the segmentation and classification graphs: "postgres" keeps reviews across
+    # restarts and shares them with `app.worker`, "memory" is per process
+    GRAPH_CHECKPOINTER: str = "postgres"
+    # threads that ran to the end are removed after this long, interrupted ones wait for their review
+    GRAPH_THREAD_RETENTION_S: float = 3600.0
+    GRAPH_PRUNE_INTERVAL_S: float = 600.0
+
+    # Workers: number of items each pipeline stage handles at the same time
+    OCR_WORKER_CONCURRENCY: int = 4
+    SEG_WORKER_CONCURRENCY: int = 4
+    CLS_WORKER_CONCURRENCY: int = 1
+    # page groups of one book classified at the same time, the LLM calls are limited separately
+    CLS_GROUP_CONCURRENCY: int = 8
+    # save recipes without the grouping, recipe and taxonomy reviews when they pass the checks of
+    # `workflows.classification.auto_approve`; flagged records still wait for the user
+    CLS_AUTO_APPROVE: bool = False
+    EMB_WORKER_CONCURRENCY: int = 1
+    # embedding jobs are taken in batches of up to this many, waiting at most this long to fill one
+    EMB_BATCH_SIZE: int = 16
+    EMB_BATCH_WAIT_MS: float = 200.0
+    # stages whose workers run inside the API process: "all", "none" (API-only, needs the postgres
+    # queue backend and `python -m app.worker`) or a list such as "cls,emb"
+    API_WORKER_STAGES: str = "all"
+    # on shutdown, workers finish in-flight items for up to this long before they are cancelled
+    WORKER_DRAIN_TIMEOUT_S: float = 30.0
+
+    # Retries: transient backend failures are retried with exponential backoff, then dead-lettered
+    OCR_RETRY_MAX_ATTEMPTS: int = 5
+    SEG_RETRY_MAX_ATTEMPTS: int = 3
+    CLS_RETRY_MAX_ATTEMPTS: int = 4
+    EMB_RETRY_MAX_ATTEMPTS: int = 3
+    WORKER_RETRY_BASE_DELAY_S: float = 2.0
+    WORKER_RETRY_MAX_DELAY_S: float = 60.0
+
+    # Queues: "memory" keeps jobs in process, "postgres" persists them and shares them between processes
+    QUEUE_BACKEND: str = "memory"  # memory, postgres
+    # claims are extended while a job runs, so this only bounds how long the jobs of a dead consumer stay hidden
+    QUEUE_VISIBILITY_TIMEOUT_S: float = 600.0
+    QUEUE_POLL_INTERVAL_S: float = 5.0
+    # items waiting longer than this are served before newer work of any priority
+    QUEUE_STARVATION_AFTER_S: float = 60.0
+    # at most one such item in every QUEUE_STARVED_EVERY taken, the rest keep priority and owner turns
+    QUEUE_STARVED_EVERY: int = 4
+    # hard cap of in-memory queues, producers wait once a queue is full
+    QUEUE_MAX_SIZE: int = 5000
+    # merge a job into a waiting duplicate of the same (stage, entity id, version)
+    QUEUE_COALESCE: bool = True
+    # embedding triggers are held this long so bursts of edits collapse into one job
+    QUEUE_DEBOUNCE_S: float = 2.0
+    QUEUE_DEBOUNCE_MAX_DELAY_S: float = 30.0
+    # above these depths bulk ingest is rejected with 503 and a Retry-After hint
+    OCR_QUEUE_HIGH_WATER: int = 500
+    SEG_QUEUE_HIGH_WATER: int = 500
+    CLS_QUEUE_HIGH_WATER: int = 20
+    EMB_QUEUE_HIGH_WATER: int = 2000
 
     # Chat settings
     LLM_API_PROVIDER: str = "mock"  # mock, ollama, mistralai
+    # recipe classifications sent to the provider at the same time, per process;
+    # LLM_<PROVIDER>_CONCURRENCY overrides it for one provider
+    LLM_CONCURRENCY: int = 4
+    LLM_MISTRALAI_CONCURRENCY: Optional[int] = 8
+    LLM_OLLAMA_CONCURRENCY: Optional[int] = 1
+    # reuse classifications of the same text by the same provider, model and prompt
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_MAX_AGE_S: float = 90 * 24 * 3600.0
 
     CHAT_MODEL_MISTRAL: str = "mistral-large-latest"
     MISTRAL_API_KEY: str = "nothing"
@@ -138,6 +245,16 @@ class Settings(BaseSettings):
         model = self.EMBEDDING_MODELS[target]
         return f"recipes__{model['display_name']}__{model['dimensions']}__{version}"
 
+    @property
+    def ocr_backend_list(self) -> List[str]:
+        return [x.strip().lower() for x in self.OCR_BACKEND.split(",") if x.strip()]
+
+    def ocr_timeout(self, backend: str) -> float:
+        return getattr(self, f"OCR_{backend.upper()}_TIMEOUT_S", None) or self.OCR_TIMEOUT_S
+
+    def llm_concurrency(self, provider: str) -> int:
+        return getattr(self, f"LLM_{provider.upper()}_CONCURRENCY", None) or self.LLM_CONCURRENCY
+
     # produce an EmbeddingsConfig view from env strings
     @property
     def target_config_list(self) -> Dict[str, TargetConfig]:
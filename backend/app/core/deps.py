@@ -1,5 +1,6 @@
 import logging
-from typing import Dict
+import os
+from typing import Dict, Optional
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
@@ -14,11 +15,14 @@ from app.experimental.classification_mock import MockClassificationService
 from app.experimental.ocr_mock_0 import SuperSimpleOCRMockService
 from app.experimental.ocr_mock_1 import MockOCRService
 from app.experimental.segmentation_mock import NoSegmentationService
+from app.infra.classification_cache import CACHE_DIR, CachedClassificationService
+from app.infra.classification_limit import LimitedClassificationService
 from app.infra.classification_simple import ClassificationSimple
 from app.infra.ocr_google import GoogleVisionOCRService
 from app.infra.ocr_pytesseract import PytesseractOCRService
 from app.infra.recipe_parser_mistral import MistralParser
 from app.infra.recipe_parser_ollama import OllamaParser
+from app.infra.segmentation_geometry import GeometrySegmentationService
 from app.infra.thumbnail_pillow import PillowThumbnailService
 from app.infra.validation_simple import ValidationSimple
 from app.models.user import User
@@ -30,12 +34,14 @@ from app.ports.storage import StorageService
 from app.ports.validation import ValidationService
 from app.repos.book import BookScanRepository
 from app.repos.classification_record import ClassificationRecordRepository
+from app.repos.dead_letter import DeadLetterRepository
 from app.repos.image_repo import ImageRepository
 from app.repos.meal_plan import MealPlanRepository
 from app.repos.recipe import RecipeRepository
 from app.repos.shopping_list import ShoppingListRepository
 from app.repos.user import UserRepository
 from app.services.image_ingest_service import ImageIngestService
+from app.services.text_or_image_numpy import TextOrImageNumpy
 from app.services.text_or_image_simple import TextOrImageSimple
 from app.workflows.queues.queues import QueueRegistry, get_queue_registry
 
@@ -96,6 +102,10 @@ def get_shopping_list_repo(db: AsyncSession = Depends(get_db)) -> ShoppingListRe
     return new_shopping_list_repo(db)
 
 
+def get_dead_letter_repo(db: AsyncSession = Depends(get_db)) -> DeadLetterRepository:
+    return DeadLetterRepository(db)
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
@@ -166,6 +176,8 @@ def get_segmentation_service() -> SegmentationService:
 
     if seg_type == "mock":
         return NoSegmentationService()
+    if seg_type == "geometry":
+        return GeometrySegmentationService()
     return NoSegmentationService()
 
 
@@ -173,31 +185,60 @@ def get_classification_service() -> ClassificationService:
     provider = settings.LLM_API_PROVIDER
 
     if provider == "mistralai":
-        return ClassificationSimple(
+        service: ClassificationService = ClassificationSimple(
             parser=MistralParser(
                 api_key=settings.MISTRAL_API_KEY,
                 model=settings.CHAT_MODEL_MISTRAL,
             )
         )
-    if provider == "ollama":
-        return ClassificationSimple(
+    elif provider == "ollama":
+        service = ClassificationSimple(
             parser=OllamaParser(
                 base_url=settings.OLLAMA_URL,
                 model=settings.CHAT_MODEL_OLLAMA,
             )
         )
+    else:
+        return MockClassificationService()
+    service = LimitedClassificationService(service, provider, settings.llm_concurrency(provider))
+    if settings.LLM_CACHE_ENABLED:
+        # outside the limit, cache hits do not wait for an LLM slot
+        service = CachedClassificationService(
+            service,
+            os.path.join(settings.LOCAL_STORAGE_PATH, CACHE_DIR),
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            max_age_s=settings.LLM_CACHE_MAX_AGE_S,
+            validator=get_validation_service(),
+        )
+    return service
+
 
-    return MockClassificationService()
+_google_ocr_singleton: Optional[GoogleVisionOCRService] = None
 
 
-def get_ocr_service() -> OCRService:
-    backend = settings.OCR_BACKEND.lower()
+def get_ocr_service(backend: Optional[str] = None) -> OCRService:
+    """One OCR backend, by default the first of the configured chain."""
+    backend = (backend or settings.ocr_backend_list[0]).lower()
 
     if backend == "google":
-        return GoogleVisionOCRService(api_key=settings.GOOGLE_API_KEY)
+        # one service per process, its HTTP client and batches are shared by all callers
+        global _google_ocr_singleton
+        if _google_ocr_singleton is None:
+            _google_ocr_singleton = GoogleVisionOCRService(
+                api_key=settings.GOOGLE_API_KEY,
+                batch_size=settings.GOOGLE_VISION_BATCH_SIZE,
+                batch_wait_ms=settings.GOOGLE_VISION_BATCH_WAIT_MS,
+                timeout_s=settings.ocr_timeout("google"),
+            )
+        return _google_ocr_singleton
 
     elif backend == "tesseract":
-        return PytesseractOCRService()
+        return PytesseractOCRService(
+            lang=settings.TESSERACT_LANG,
+            oem=settings.TESSERACT_OEM,
+            psm=settings.TESSERACT_PSM,
+            threads=settings.TESSERACT_THREADS,
+        )
 
     elif backend == "mock":
         return MockOCRService(mock_response_path=settings.MOCK_RESPONSE_FILE)
@@ -229,14 +270,14 @@ def get_validation_service() -> ValidationService:
 
 
 def get_image_ingest_service(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
     queues: QueueRegistry = Depends(get_queue_registry),
     storage: StorageService = Depends(get_storage),
 ) -> ImageIngestService:
     """
-    Inject an `AsyncSession` into a freshly‑constructed repository.
+    The repository opens a session per call, since pages of documents are stored after the response.
     """
-    return ImageIngestService(storage, get_image_repo(db), queues.ocr)
+    return ImageIngestService(storage, make_scoped_repo(new_image_repo, request.app.state.sessionmaker), queues.ocr)
 
 
 _text_or_image_singleton = None
@@ -245,5 +286,8 @@ _text_or_image_singleton = None
 def get_text_or_image_service() -> TextOrImageService:
     global _text_or_image_singleton
     if _text_or_image_singleton is None:
-        _text_or_image_singleton = TextOrImageSimple()
+        if settings.TEXT_OR_IMAGE.lower() == "simple":
+            _text_or_image_singleton = TextOrImageSimple()
+        else:
+            _text_or_image_singleton = TextOrImageNumpy(threshold=settings.TEXT_PAGE_THRESHOLD)
     return _text_or_image_singleton
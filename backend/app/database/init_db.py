@@ -1,10 +1,13 @@
 import logging
 
-from sqlalchemy import event, text
+from sqlalchemy import event, inspect, select, text
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.database.base import Base
+from app.models.ocr import ClassificationRecordORM, ClassificationRecordPageORM
+from app.repos.classification_record import record_page_links
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -43,5 +46,33 @@ async def get_db():
         yield session
 
 
+def backfill_record_pages(sync_connection) -> int:
+    """Page links of the records stored before `classification_record_pages` existed."""
+    with Session(bind=sync_connection) as session:
+        records = session.scalars(select(ClassificationRecordORM).where(ClassificationRecordORM.pages.isnot(None)))
+        links = [link for record in records for link in record_page_links(record)]
+        session.add_all(links)
+        session.flush()
+    return len(links)
+
+
 def sync_create_tables(sync_connection):
+    has_page_links = inspect(sync_connection).has_table(ClassificationRecordPageORM.__tablename__)
     Base.metadata.create_all(bind=sync_connection)
+    if not has_page_links:
+        logger.info(f"Linked {backfill_record_pages(sync_connection)} page(s) to existing classification records")
+
+
+async def initialize_database(engine=None):
+    """Create extensions, schemas and tables; shared by the API and the worker process."""
+    engine = engine or async_engine
+    # test friendly database connections
+    async with engine.begin() as conn:
+        try:
+            if engine.dialect.name == "postgresql":
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        except Exception:
+            logger.info("Skipping pgvector extension creation")
+        await ensure_schemas_exist()
+        await conn.run_sync(sync_create_tables)
+    logger.info("Database initialized")
@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional, Tuple
+
 import torch
 from langchain_core.embeddings import Embeddings
 from langchain_mistralai import MistralAIEmbeddings
@@ -5,19 +7,49 @@ from langchain_postgres import PGVector
 from sentence_transformers import SentenceTransformer
 
 from app.core.config import get_settings
+from app.infra.process_pool import call_cpu
 
 settings = get_settings()
 
+BGE_MODEL_NAME = "BAAI/bge-small-en-v1.5"
+
+# models loaded in this process, keyed by (name, device)
+_models: Dict[Tuple[str, Optional[str]], SentenceTransformer] = {}
+
+
+def _load_model(model_name: str, device: Optional[str]) -> SentenceTransformer:
+    key = (model_name, device)
+    if key not in _models:
+        _models[key] = SentenceTransformer(
+            model_name, device=device or ("cuda" if torch.cuda.is_available() else "cpu")
+        )
+    return _models[key]
+
+
+def _encode(model_name: str, device: Optional[str], texts: List[str]) -> List[List[float]]:
+    return _load_model(model_name, device).encode(texts, normalize_embeddings=True).tolist()
+
+
+def warm_up_bge() -> None:
+    """CPU pool warm-up: load the BGE model once per process."""
+    _load_model(BGE_MODEL_NAME, None)
+
 
 class LocalBgeEmbeddings(Embeddings):
-    def __init__(self, model_name: str = "BAAI/bge-small-en-v1.5", device: str = None):
-        self.model = SentenceTransformer(model_name, device=device or ("cuda" if torch.cuda.is_available() else "cpu"))
+    """
+    Local BGE embeddings. Encoding runs in the shared CPU pool, where every process keeps
+    the model loaded, so callers should invoke it off the event loop (it blocks until done).
+    """
+
+    def __init__(self, model_name: str = BGE_MODEL_NAME, device: str = None):
+        self.model_name = model_name
+        self.device = device
 
     def embed_documents(self, texts):
-        return self.model.encode(texts, normalize_embeddings=True).tolist()
+        return call_cpu(_encode, self.model_name, self.device, list(texts))
 
     def embed_query(self, text):
-        return self.model.encode([text], normalize_embeddings=True)[0].tolist()
+        return call_cpu(_encode, self.model_name, self.device, [text])[0]
 
 
 def _build_vector_store(target: str, version: str) -> PGVector:
@@ -28,7 +60,7 @@ def _build_vector_store(target: str, version: str) -> PGVector:
 
     # Pick embedding function based on target
     if target == "local_bge":
-        embeddings = LocalBgeEmbeddings(model_name="BAAI/bge-small-en-v1.5")
+        embeddings = LocalBgeEmbeddings(model_name=BGE_MODEL_NAME)
     elif target == "mistralai":
         embeddings = MistralAIEmbeddings(model=settings.EMBEDDING_MODELS[target]["model_name"])
     else:
@@ -1,7 +1,19 @@
+import asyncio
+from datetime import timedelta
+
 import psycopg
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 
 from app.core.config import get_settings
+from app.infra.graph_checkpoints import (
+    GRAPH_CHECKPOINTER,
+    PrunablePostgresSaver,
+    prune_finished_loop,
+    scanner_serializer,
+)
+
+# the scanner graphs keep their checkpoints apart from the chat, so pruning never touches conversations
+SCANNER_CHECKPOINT_SCHEMA = "scanner_checkpoints"
 
 
 async def langgraph_make_saver() -> AsyncPostgresSaver:
@@ -15,3 +27,25 @@ async def langgraph_make_saver() -> AsyncPostgresSaver:
     saver = AsyncPostgresSaver(conn=conn)
     await saver.setup()
     return saver
+
+
+async def langgraph_make_scanner_saver() -> PrunablePostgresSaver:
+    """PostgresSaver for the segmentation and classification graphs, in its own schema."""
+    conn = await psycopg.AsyncConnection.connect(
+        get_settings().sync_db_url, autocommit=True, options=f"-c search_path={SCANNER_CHECKPOINT_SCHEMA}"
+    )
+    await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {SCANNER_CHECKPOINT_SCHEMA}")
+    saver = PrunablePostgresSaver(conn=conn, serde=scanner_serializer())
+    await saver.setup()
+    return saver
+
+
+async def setup_scanner_checkpoints() -> asyncio.Task:
+    """Point the scanner graphs at the configured checkpoint storage and start pruning it."""
+    settings = get_settings()
+    if settings.GRAPH_CHECKPOINTER.lower() == "postgres":
+        GRAPH_CHECKPOINTER.use(await langgraph_make_scanner_saver())
+    retention = timedelta(seconds=settings.GRAPH_THREAD_RETENTION_S)
+    return asyncio.create_task(
+        prune_finished_loop(retention, settings.GRAPH_PRUNE_INTERVAL_S), name="prune-checkpoints"
+    )
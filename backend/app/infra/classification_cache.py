@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+import uuid
+from typing import Any, Dict, Optional
+
+import aiofiles
+
+from app.ports.classification import ClassificationService
+from app.ports.validation import ValidationService
+from app.schemas.ocr import OCRResult
+
+logger = logging.getLogger(__name__)
+
+# next to the OCR cache in the storage
+CACHE_DIR = "classification_cache"
+# eviction runs after this many new entries
+PRUNE_EVERY = 50
+
+
+def normalize_text(text: str) -> str:
+    """OCR text as the LLM reads it: same characters, whitespace and line breaks collapsed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _prune(root: str, max_entries: int, max_age_s: float) -> int:
+    """Remove entries older than `max_age_s`, then the oldest ones beyond `max_entries`."""
+    entries = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                continue
+    entries.sort(reverse=True)
+    cutoff = time.time() - max_age_s
+    stale = [path for i, (mtime, path) in enumerate(entries) if mtime < cutoff or i >= max_entries]
+    for path in stale:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return len(stale)
+
+
+class CachedClassificationService(ClassificationService):
+    """
+    Persistent cache in front of an LLM classification. Results are stored under the SHA-256 of the
+    normalized OCR text and the service's `cache_version()` (provider, model and prompt), so a group
+    classified again with the same text, after a grouping change or a re-trigger, makes no LLM call.
+    Entries expire after `max_age_s`, and the oldest are evicted beyond `max_entries`.
+    With a `validator`, only candidates it accepts are stored, and stored ones it rejects count as a
+    miss: classifying again after the user fixed the grouping must not return the same bad answer.
+    Services without a cache version are called directly.
+    """
+
+    # shared by the instances of the process, so eviction does not depend on how often services are created
+    _writes = 0
+
+    def __init__(
+        self,
+        service: ClassificationService,
+        cache_dir: str,
+        max_entries: int,
+        max_age_s: float,
+        validator: Optional[ValidationService] = None,
+    ):
+        self.service = service
+        self.validator = validator
+        self.root = cache_dir
+        self.max_entries = max_entries
+        self.max_age_s = max_age_s
+        self.version = service.cache_version()
+        if self.version is not None:
+            self.cache_dir = os.path.join(cache_dir, re.sub(r"[^\w.-]+", "_", self.version))
+
+    def cache_version(self) -> Optional[str]:
+        return self.version
+
+    async def classify(self, ocr_blocks: list[Dict[str, Any]], ocr_result: OCRResult | None) -> Dict[str, Any]:
+        if self.version is None or ocr_result is None:
+            return await self.service.classify(ocr_blocks, ocr_result)
+
+        digest = hashlib.sha256(normalize_text(ocr_result.full_text).encode("utf-8")).hexdigest()
+        path = os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+        cached = await self._read(path)
+        if cached is not None and await self._valid(cached):
+            logger.info(f"Classification cache hit for page {ocr_result.page_id}")
+            return cached
+
+        result = await self.service.classify(ocr_blocks, ocr_result)
+        if await self._valid(result):
+            await self._write(path, result)
+        else:
+            logger.info(f"Not caching the invalid classification of page {ocr_result.page_id}")
+        return result
+
+    async def _valid(self, result: Dict[str, Any]) -> bool:
+        if self.validator is None:
+            return True
+        try:
+            # the thumbnail only fills in the image, it does not decide validity
+            await self.validator.validate(result, thumbnail_filename="")
+        except Exception:
+            return False
+        return True
+
+    async def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            if time.time() - os.stat(path).st_mtime > self.max_age_s:
+                return None
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                return json.loads(await f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable classification cache entry {path}: {e}")
+            return None
+
+    async def _write(self, path: str, result: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename, a concurrent reader never sees a partial entry
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(tmp, "w", encoding="utf-8") as f:
+            await f.write(json.dumps(result, ensure_ascii=False))
+        os.replace(tmp, path)
+
+        if CachedClassificationService._writes % PRUNE_EVERY == 0:
+            removed = await asyncio.to_thread(_prune, self.root, self.max_entries, self.max_age_s)
+            if removed:
+                logger.info(f"Evicted {removed} classification cache entries")
+        CachedClassificationService._writes += 1
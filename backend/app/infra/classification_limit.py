@@ -0,0 +1,35 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from app.ports.classification import ClassificationService
+from app.schemas.ocr import OCRResult
+
+# one limit per provider, shared by every service instance of the process (and event loop)
+_limits: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+
+def _semaphore(provider: str, limit: int) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    current = _limits.get(provider)
+    if current is None or current[0] is not loop:
+        current = _limits[provider] = (loop, asyncio.Semaphore(limit))
+    return current[1]
+
+
+class LimitedClassificationService(ClassificationService):
+    """
+    At most `limit` classifications of a provider run at the same time, whether they come from
+    the worker classifying a book or from approvals in the API; further calls wait for a slot.
+    """
+
+    def __init__(self, service: ClassificationService, provider: str, limit: int):
+        self.service = service
+        self.provider = provider
+        self.limit = max(1, limit)
+
+    def cache_version(self) -> Optional[str]:
+        return self.service.cache_version()
+
+    async def classify(self, ocr_blocks: list[Dict[str, Any]], ocr_result: OCRResult | None) -> Dict[str, Any]:
+        async with _semaphore(self.provider, self.limit):
+            return await self.service.classify(ocr_blocks, ocr_result)
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from app.ports.classification import ClassificationService
 from app.ports.recipe_parser_llm import RecipeParserLLM
@@ -11,6 +11,9 @@ class ClassificationSimple(ClassificationService):
     def __init__(self, parser: RecipeParserLLM):
         self.parser: RecipeParserLLM = parser
 
+    def cache_version(self) -> Optional[str]:
+        return self.parser.cache_version()
+
     async def classify(self, ocr_blocks: list[Dict[str, Any]], ocr_result: OCRResult | None) -> Dict[str, Any]:
         if ocr_result:
             full_text = ocr_result.full_text
@@ -0,0 +1,91 @@
+"""
+Page extraction from multi-page uploads: PDFs are rasterized with pdfium, archives yield their
+images in natural name order. Each call handles one page, so the CPU pool can work on several
+pages of a document at once and nothing holds the whole document in memory.
+"""
+
+import os
+import re
+import shutil
+import zipfile
+from io import BytesIO
+from typing import List, Optional, Union
+
+import pypdfium2 as pdfium
+from PIL import Image, ImageOps
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".webp", ".bmp")
+_PDF_TYPES = {"application/pdf"}
+_ZIP_TYPES = {"application/zip", "application/x-zip-compressed"}
+# a single archived page above this is not a scan
+MAX_MEMBER_BYTES = 200 * 1024 * 1024
+
+PageRef = Union[int, str]
+
+
+class UnsupportedDocument(ValueError):
+    """The upload cannot be split into pages."""
+
+
+def document_kind(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """Kind of a multi-page upload, "pdf" or "zip"; None for single images."""
+    name = (filename or "").lower()
+    if content_type in _PDF_TYPES or name.endswith(".pdf"):
+        return "pdf"
+    if content_type in _ZIP_TYPES or name.endswith(".zip"):
+        return "zip"
+    return None
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def list_pages(path: str, kind: str) -> List[PageRef]:
+    """Page references of a document: indexes for PDFs, member names for archives."""
+    try:
+        if kind == "pdf":
+            pdf = pdfium.PdfDocument(path)
+            try:
+                return list(range(len(pdf)))
+            finally:
+                pdf.close()
+        with zipfile.ZipFile(path) as archive:
+            names = [
+                info.filename
+                for info in archive.infolist()
+                if not info.is_dir()
+                and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+                and not os.path.basename(info.filename).startswith(".")
+                and not info.filename.startswith("__MACOSX/")
+            ]
+    except (pdfium.PdfiumError, zipfile.BadZipFile) as e:
+        raise UnsupportedDocument(f"Cannot read {kind} upload: {e}") from e
+    return sorted(names, key=_natural_key)
+
+
+def extract_page(path: str, kind: str, ref: PageRef, out_path: str, dpi: int = 300) -> str:
+    """Write one page of the document to `out_path` as JPEG."""
+    if kind == "pdf":
+        pdf = pdfium.PdfDocument(path)
+        try:
+            page = pdf[ref]
+            image = page.render(scale=dpi / 72).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+        image.convert("RGB").save(out_path, format="JPEG", quality=90, dpi=(dpi, dpi))
+        return out_path
+
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(ref)
+        if info.file_size > MAX_MEMBER_BYTES:
+            raise UnsupportedDocument(f"Archived page {ref} is too large ({info.file_size} bytes)")
+        if ref.lower().endswith((".jpg", ".jpeg")):
+            with archive.open(info) as src, open(out_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            return out_path
+        data = archive.read(info)
+    with Image.open(BytesIO(data)) as img:
+        ImageOps.exif_transpose(img).convert("RGB").save(out_path, format="JPEG", quality=90)
+    return out_path
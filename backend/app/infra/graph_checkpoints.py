@@ -0,0 +1,246 @@
+"""
+Checkpoint storage of the scanner graphs (segmentation and classification).
+
+The graphs are compiled once at import, against `GRAPH_CHECKPOINTER`. It forwards to the saver
+chosen at startup: Postgres, so reviews survive restarts and can be resumed by another process,
+or memory. Checkpoint values are zstd-compressed, and threads that ran to the end are deleted
+once they are older than the retention, interrupted ones are kept until they are resumed.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, AsyncIterator, Collection, Iterator, Optional, Sequence, Set, Tuple, get_args
+
+import zstandard
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from pydantic import BaseModel
+
+from app.schemas.ocr import (
+    ClassificationGraphState,
+    GroupApproval,
+    RecipeApproval,
+    SegmentationApproval,
+    SegmentationGraphState,
+    TaxonomyApproval,
+)
+
+logger = logging.getLogger(__name__)
+
+# values smaller than this are stored as they are
+COMPRESS_FROM = 1024
+_ZSTD = "+zstd"
+INTERRUPT = "__interrupt__"
+
+
+class CompressedSerializer(JsonPlusSerializer):
+    """LangGraph's serializer, with larger values (OCR results, recipe drafts) zstd-compressed."""
+
+    def __init__(self, *args, level: int = 3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.level = level
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = super().dumps_typed(obj)
+        if len(data) < COMPRESS_FROM:
+            return type_, data
+        return type_ + _ZSTD, zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(_ZSTD):
+            return super().loads_typed((type_[: -len(_ZSTD)], zstandard.ZstdDecompressor().decompress(payload)))
+        return super().loads_typed(data)
+
+
+def _expired(ts: str, older_than: timedelta) -> bool:
+    return datetime.fromisoformat(ts) < datetime.now(timezone.utc) - older_than
+
+
+class PrunableMemorySaver(InMemorySaver):
+    async def prune_finished(self, older_than: timedelta) -> int:
+        """Delete the threads whose last checkpoint is older than `older_than` and not waiting on an interrupt."""
+        finished = []
+        for thread_id, namespaces in list(self.storage.items()):
+            checkpoints = namespaces.get("")
+            if not checkpoints:
+                continue
+            checkpoint_id = max(checkpoints)
+            checkpoint = self.serde.loads_typed(checkpoints[checkpoint_id][0])
+            writes = self.writes.get((thread_id, "", checkpoint_id), {}).values()
+            if _expired(checkpoint["ts"], older_than) and not any(write[1] == INTERRUPT for write in writes):
+                finished.append(thread_id)
+        for thread_id in finished:
+            await self.adelete_thread(thread_id)
+        return len(finished)
+
+
+class PrunablePostgresSaver(AsyncPostgresSaver):
+    PRUNE_SQL = """
+        WITH latest AS (
+            SELECT DISTINCT ON (thread_id) thread_id, checkpoint_id, checkpoint ->> 'ts' AS ts
+            FROM checkpoints
+            WHERE checkpoint_ns = ''
+            ORDER BY thread_id, checkpoint_id DESC
+        )
+        SELECT thread_id FROM latest
+        WHERE ts::timestamptz < now() - make_interval(secs => %s)
+        AND NOT EXISTS (
+            SELECT 1 FROM checkpoint_writes w
+            WHERE w.thread_id = latest.thread_id AND w.checkpoint_ns = ''
+            AND w.checkpoint_id = latest.checkpoint_id AND w.channel = %s
+        )
+    """
+
+    async def prune_finished(self, older_than: timedelta) -> int:
+        """Delete the threads whose last checkpoint is older than `older_than` and not waiting on an interrupt."""
+        async with self._cursor() as cur:
+            await cur.execute(self.PRUNE_SQL, (older_than.total_seconds(), INTERRUPT))
+            finished = [row["thread_id"] for row in await cur.fetchall()]
+            for table in ("checkpoint_writes", "checkpoint_blobs", "checkpoints"):
+                await cur.execute(f"DELETE FROM {table} WHERE thread_id = ANY(%s)", (finished,))
+        return len(finished)
+
+
+class GraphCheckpointer(BaseCheckpointSaver):
+    """
+    Checkpointer whose storage is chosen after the graphs are compiled. The serializer allowlist
+    the graphs register at compile time is kept and applied to every saver set with `use`.
+    """
+
+    def __init__(self, saver: BaseCheckpointSaver):
+        self.allowlist: set = set()
+        self.saver = saver
+
+    @property
+    def serde(self):
+        return self.saver.serde
+
+    def use(self, saver: BaseCheckpointSaver) -> None:
+        self.saver = saver.with_allowlist(self.allowlist) if self.allowlist else saver
+        logger.info(f"Scanner graphs keep their checkpoints in {type(saver).__name__}")
+
+    def with_allowlist(self, extra_allowlist: Collection[Tuple[str, ...]]) -> "GraphCheckpointer":
+        self.allowlist |= set(extra_allowlist)
+        self.saver = self.saver.with_allowlist(self.allowlist)
+        return self
+
+    @property
+    def config_specs(self) -> list:
+        return self.saver.config_specs
+
+    async def prune_finished(self, older_than: timedelta) -> int:
+        prune = getattr(self.saver, "prune_finished", None)
+        return await prune(older_than) if prune else 0
+
+    def get_next_version(self, current, channel=None):
+        return self.saver.get_next_version(current, channel)
+
+    def get_tuple(self, config: RunnableConfig):
+        return self.saver.get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs) -> Iterator:
+        return self.saver.list(config, **kwargs)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.saver.put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""):
+        return self.saver.put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        return self.saver.delete_thread(thread_id)
+
+    async def aget_tuple(self, config: RunnableConfig):
+        return await self.saver.aget_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], **kwargs) -> AsyncIterator:
+        async for item in self.saver.alist(config, **kwargs):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        return await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await self.saver.adelete_thread(thread_id)
+
+    def get_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]):
+        return self.saver.get_delta_channel_history(config=config, channels=channels)
+
+    async def aget_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]):
+        return await self.saver.aget_delta_channel_history(config=config, channels=channels)
+
+
+def _schema_types(*roots: type) -> Set[type]:
+    """The models and enums reachable from the fields of `roots`."""
+    found: Set[type] = set()
+    pending = list(roots)
+    while pending:
+        annotation = pending.pop()
+        if isinstance(annotation, type) and issubclass(annotation, (BaseModel, Enum)):
+            if annotation in found:
+                continue
+            found.add(annotation)
+            if issubclass(annotation, BaseModel):
+                pending.extend(field.annotation for field in annotation.model_fields.values())
+        else:
+            pending.extend(get_args(annotation))
+    return found
+
+
+def scanner_serializer() -> CompressedSerializer:
+    # only the app's own types are read back from stored checkpoints; the approvals arrive as resume
+    # values, which are not part of the state schemas
+    return CompressedSerializer(
+        allowed_msgpack_modules=_schema_types(
+            SegmentationGraphState,
+            ClassificationGraphState,
+            SegmentationApproval,
+            GroupApproval,
+            RecipeApproval,
+            TaxonomyApproval,
+        )
+    )
+
+
+# the scanner graphs are compiled against this one; main and the worker process pick the storage
+GRAPH_CHECKPOINTER = GraphCheckpointer(PrunableMemorySaver(serde=scanner_serializer()))
+
+
+async def prune_finished_threads(older_than: timedelta) -> int:
+    removed = await GRAPH_CHECKPOINTER.prune_finished(older_than)
+    if removed:
+        logger.info(f"Removed {removed} finished graph thread(s) from the checkpoints")
+    return removed
+
+
+async def prune_finished_loop(retention: timedelta, interval_s: float) -> None:
+    """Runs with the workers: removes finished threads every `interval_s`."""
+    while True:
+        try:
+            await prune_finished_threads(retention)
+        except Exception:
+            logger.exception("Pruning graph checkpoints failed")
+        await asyncio.sleep(interval_s)
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from typing import Dict, List, Optional
+
+import aiofiles
+
+from app.ports.ocr import OCRService
+from app.ports.storage import StorageService
+from app.schemas.ocr import OCRCacheStatus, OCRResult
+
+logger = logging.getLogger(__name__)
+
+# next to the per-page OCR json of the storage
+CACHE_DIR = "ocr_cache"
+
+
+class OCRCacheStats:
+    """Hits are OCR calls that were not made, for paid backends each one is a saved API call."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def snapshot(self, backend: Optional[str]) -> OCRCacheStatus:
+        return OCRCacheStatus(backend=backend, hits=self.hits, misses=self.misses, hit_rate=round(self.hit_rate(), 3))
+
+
+# by cache version, services of the same backend configuration share their counts
+_stats: Dict[str, OCRCacheStats] = {}
+
+
+def get_ocr_cache_stats() -> List[OCRCacheStatus]:
+    """Cache statistics of this process, one entry per cached backend."""
+    return [stats.snapshot(backend) for backend, stats in _stats.items()]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachedOCRService(OCRService):
+    """
+    Content-addressed cache in front of an OCR backend. Results are stored under the SHA-256 of
+    the image bytes and the backend's `cache_version()`, so a byte-identical page, re-uploaded or
+    re-triggered, reuses the stored result instead of running OCR again.
+    Backends without a cache version are called directly.
+    """
+
+    def __init__(self, ocr: OCRService, storage: StorageService):
+        self.ocr = ocr
+        self.storage = storage
+        self.version = ocr.cache_version()
+        if self.version is not None:
+            self.stats = _stats.setdefault(self.version, OCRCacheStats())
+            self.cache_dir = storage.get_file_path(os.path.join(CACHE_DIR, re.sub(r"[^\w.-]+", "_", self.version)))
+
+    def cache_version(self) -> Optional[str]:
+        return self.version
+
+    async def extract(self, image_path: str, image_id: str) -> OCRResult:
+        if self.version is None:
+            return await self.ocr.extract(image_path, image_id)
+
+        digest = await asyncio.to_thread(_sha256, image_path)
+        path = os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+        cached = await self._read(path)
+        if cached is not None:
+            self.stats.hits += 1
+            logger.info(f"OCR cache hit for {image_id} ({self.version}), hit rate {self.stats.hit_rate():.0%}")
+            # the stored result may belong to another page with the same image
+            return cached.model_copy(update={"page_id": image_id})
+
+        self.stats.misses += 1
+        result = await self.ocr.extract(image_path, image_id)
+        await self._write(path, result)
+        return result
+
+    async def _read(self, path: str) -> Optional[OCRResult]:
+        if not os.path.exists(path):
+            return None
+        try:
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                return OCRResult.model_validate_json(await f.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable OCR cache entry {path}: {e}")
+            return None
+
+    async def _write(self, path: str, result: OCRResult) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename, a concurrent reader never sees a partial entry
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(tmp, "w", encoding="utf-8") as f:
+            await f.write(json.dumps(result.model_dump(), ensure_ascii=False))
+        os.replace(tmp, path)
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence
+
+from app.ports.errors import TRANSIENT_ERRORS, TransientServiceError
+from app.ports.ocr import OCRService
+from app.schemas.ocr import OCRBackendStatus, OCRResult
+
+logger = logging.getLogger(__name__)
+
+# latencies kept per backend for the percentiles
+LATENCY_WINDOW = 200
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for `reset_s`.
+    Then a single trial call is let through (half-open): success closes it, failure opens it again,
+    and a trial that ends either way (cancelled, or rejected for its input) lets the next call try.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_s: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_s:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def end_trial(self) -> None:
+        self._trial = False
+
+
+class BackendStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.short_circuits = 0
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self, name: str, breaker: CircuitBreaker) -> OCRBackendStatus:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> float:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1) if latencies else 0.0
+
+        return OCRBackendStatus(
+            name=name,
+            state=breaker.state,
+            calls=self.calls,
+            failures=self.failures,
+            timeouts=self.timeouts,
+            short_circuits=self.short_circuits,
+            error_rate=round(self.failures / self.calls, 3) if self.calls else 0.0,
+            latency_p50_ms=percentile(0.5),
+            latency_p95_ms=percentile(0.95),
+        )
+
+
+@dataclass
+class OCRBackend:
+    name: str
+    service: OCRService
+    timeout_s: float
+    breaker: CircuitBreaker
+    stats: BackendStats
+
+
+# backends of this process, for the status endpoint; breakers and stats are not shared between processes
+_backends: Dict[str, OCRBackend] = {}
+
+
+def get_ocr_backend_stats() -> List[OCRBackendStatus]:
+    return [backend.stats.snapshot(name, backend.breaker) for name, backend in _backends.items()]
+
+
+class FallbackOCRService(OCRService):
+    """
+    Tries the OCR backends in order, e.g. Google Vision then Tesseract. Every backend call has
+    its own timeout, and a backend whose circuit breaker is open is skipped without waiting.
+    When all fail, the error is a `TransientServiceError` if any backend may recover, so the worker retries later.
+    """
+
+    def __init__(self, backends: Sequence[OCRBackend]):
+        if not backends:
+            raise ValueError("At least one OCR backend is required")
+        self.backends = list(backends)
+        for backend in self.backends:
+            _backends[backend.name] = backend
+
+    async def extract(self, image_path: str, image_id: str) -> OCRResult:
+        errors: List[Exception] = []
+        for backend in self.backends:
+            trial = backend.breaker.state == CircuitBreaker.HALF_OPEN
+            if not backend.breaker.allow():
+                backend.stats.short_circuits += 1
+                continue
+            backend.stats.calls += 1
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(backend.service.extract(image_path, image_id), backend.timeout_s)
+            except asyncio.TimeoutError:
+                backend.stats.timeouts += 1
+                error: Exception = TransientServiceError(f"{backend.name} timed out after {backend.timeout_s}s")
+            except Exception as e:
+                error = e
+            else:
+                backend.stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+                backend.breaker.record_success()
+                return result
+            finally:
+                if trial:
+                    backend.breaker.end_trial()
+
+            backend.stats.failures += 1
+            # a page the backend rejects says nothing about its health
+            if isinstance(error, TRANSIENT_ERRORS):
+                backend.breaker.record_failure()
+            errors.append(error)
+            logger.warning(f"OCR backend {backend.name} failed for {image_id}: {error}")
+
+        if not errors:
+            raise TransientServiceError("All OCR backends are unavailable (circuits open)")
+        if len(errors) == 1:
+            raise errors[0]
+        message = "All OCR backends failed: " + "; ".join(str(e) for e in errors)
+        # worth a retry if any backend may recover
+        if any(isinstance(e, TransientServiceError) for e in errors):
+            raise TransientServiceError(message)
+        raise RuntimeError(message)
@@ -0,0 +1,89 @@
+"""
+Compact on-disk format for OCR results.
+
+    magic "OCRZ" | version (1 byte) | index length (uint32 LE) | index | sections
+
+The index is a msgpack map of section name to (offset, length) after the index. Every section
+is a zstd-compressed msgpack value, so a reader seeks to and decodes only what it needs:
+
+- meta:     {"page_id": ...}
+- text:     the full text
+- geometry: block types and boxes as columns, the vertex coordinates packed as int32
+- blocks:   the complete block trees (Google Vision words and symbols included)
+"""
+
+import struct
+from array import array
+from typing import IO, Any, Dict, Iterable, List, Tuple
+
+import msgpack
+import zstandard
+
+from app.schemas.ocr import OCRResult
+
+MAGIC = b"OCRZ"
+VERSION = 1
+EXTENSION = ".ocrz"
+SECTIONS = ("meta", "text", "geometry", "blocks")
+
+_HEADER = struct.Struct("<4sBI")
+_LEVEL = 10
+
+
+def encode(result: OCRResult) -> bytes:
+    blocks = result.blocks
+    types: List[Any] = []
+    counts: List[int] = []
+    coords = array("i")
+    for block in blocks:
+        vertices = (block.get("boundingBox") or {}).get("vertices") or []
+        types.append(block.get("blockType"))
+        counts.append(len(vertices))
+        for vertex in vertices:
+            # Vision leaves out zero coordinates
+            coords.extend((int(vertex.get("x", 0)), int(vertex.get("y", 0))))
+
+    values = {
+        "meta": {"page_id": result.page_id},
+        "text": result.full_text,
+        "geometry": {"types": types, "counts": counts, "coords": coords.tobytes()},
+        "blocks": blocks,
+    }
+    compressor = zstandard.ZstdCompressor(level=_LEVEL)
+    sections = {name: compressor.compress(msgpack.packb(values[name], use_bin_type=True)) for name in SECTIONS}
+
+    index, offset = {}, 0
+    for name in SECTIONS:
+        index[name] = (offset, len(sections[name]))
+        offset += len(sections[name])
+    packed_index = msgpack.packb(index)
+    return b"".join([_HEADER.pack(MAGIC, VERSION, len(packed_index)), packed_index, *sections.values()])
+
+
+def read_sections(f: IO[bytes], names: Iterable[str]) -> Dict[str, Any]:
+    """Decode the named sections of an open file, without reading the others."""
+    magic, version, index_length = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not an OCR result file (magic {magic!r}, version {version})")
+    index: Dict[str, Tuple[int, int]] = msgpack.unpackb(f.read(index_length), strict_map_key=False)
+    start = _HEADER.size + index_length
+
+    decompressor = zstandard.ZstdDecompressor()
+    values = {}
+    for name in names:
+        offset, length = index[name]
+        f.seek(start + offset)
+        values[name] = msgpack.unpackb(decompressor.decompress(f.read(length)), raw=False)
+    return values
+
+
+def geometry_blocks(geometry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Blocks with only their type and bounding box, rebuilt from the geometry columns."""
+    coords = array("i")
+    coords.frombytes(geometry["coords"])
+    blocks, i = [], 0
+    for block_type, count in zip(geometry["types"], geometry["counts"]):
+        vertices = [{"x": coords[i + 2 * k], "y": coords[i + 2 * k + 1]} for k in range(count)]
+        i += 2 * count
+        blocks.append({"blockType": block_type, "boundingBox": {"vertices": vertices}})
+    return blocks
@@ -1,49 +1,203 @@
-import json
+import asyncio
+import importlib.util
+import logging
 from base64 import b64encode
+from dataclasses import dataclass
 from io import BytesIO
+from typing import List, Optional, Sequence, Tuple, Union
 
-import requests
+import httpx
 from PIL import Image, ImageOps
 
+from app.infra.process_pool import run_cpu
+from app.ports.errors import TransientServiceError
 from app.ports.ocr import OCRService
 from app.schemas.ocr import OCRResult
 
+logger = logging.getLogger(__name__)
+
+# images:annotate accepts at most 16 images per request
+MAX_BATCH_SIZE = 16
+# and JSON bodies of at most 10 MB; a batch is closed before its base64 images reach this budget
+MAX_REQUEST_BYTES = 8 * 1024 * 1024
+# per-image gRPC status codes worth retrying: DEADLINE_EXCEEDED, RESOURCE_EXHAUSTED, UNAVAILABLE
+_TRANSIENT_CODES = {4, 8, 14}
+
+
+def _encode_image(image_path: str) -> str:
+    with Image.open(image_path) as img:
+        img = ImageOps.exif_transpose(img).copy()
+    buf = BytesIO()
+    img.save(buf, format="JPEG")
+    return b64encode(buf.getvalue()).decode()
+
+
+@dataclass
+class _Request:
+    image_path: str
+    image_id: str
+    future: asyncio.Future
+
 
 class GoogleVisionOCRService(OCRService):
-    def __init__(self, api_key: str):
+    """
+    Google Vision DOCUMENT_TEXT_DETECTION over one shared `httpx.AsyncClient`
+    (keep-alive, HTTP/2 when `h2` is installed, timeouts).
+
+    Concurrent `extract()` calls are collected for up to `batch_wait_ms` and sent together
+    through the batch form of `images:annotate`, up to `batch_size` images and
+    `max_request_bytes` of encoded images per request; a larger batch is split over several
+    requests, and an image above the budget goes alone. A failure of one image, or of one
+    request, only fails its own callers.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        endpoint_url: str = "https://vision.googleapis.com/v1/images:annotate",
+        batch_size: int = MAX_BATCH_SIZE,
+        batch_wait_ms: float = 50.0,
+        timeout_s: float = 60.0,
+        client: Optional[httpx.AsyncClient] = None,
+        max_request_bytes: int = MAX_REQUEST_BYTES,
+    ):
         self.api_key = api_key
-        self.endpoint_url = "https://vision.googleapis.com/v1/images:annotate"
+        self.endpoint_url = endpoint_url
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.batch_wait_ms = batch_wait_ms
+        self.timeout_s = timeout_s
+        self.max_request_bytes = max_request_bytes
+        self._client = client
+        self._pending: List[_Request] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    # --- OCRService ---
 
     async def extract(self, image_path: str, image_id: str) -> OCRResult:
-        with Image.open(image_path) as img:
-            img = ImageOps.exif_transpose(img).copy()
-        buf = BytesIO()
-        img.save(buf, format="JPEG")
-        image_bytes = buf.getvalue()
-        image_content = b64encode(image_bytes).decode()
-
-        # Build the request
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_Request(image_path, image_id, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_wait_ms / 1000, self._flush)
+        return await future
+
+    def cache_version(self) -> str:
+        return "google-vision:DOCUMENT_TEXT_DETECTION:v1"
+
+    async def extract_many(self, pages: Sequence[Tuple[str, str]]) -> List[Union[OCRResult, Exception]]:
+        """OCR (image_path, image_id) pairs, `batch_size` per request; failed pages yield their exception."""
+        results: List[Union[OCRResult, Exception]] = []
+        for start in range(0, len(pages), self.batch_size):
+            chunk = pages[start : start + self.batch_size]
+            try:
+                results.extend(await self._annotate(chunk))
+            except Exception as e:
+                results.extend([e] * len(chunk))
+        return results
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # --- batching ---
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch), name="google-vision-batch")
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: List[_Request]) -> None:
+        try:
+            results = await self._annotate([(r.image_path, r.image_id) for r in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for request, result in zip(batch, results):
+            if request.future.done():  # the caller gave up
+                continue
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+
+    # --- HTTP ---
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=importlib.util.find_spec("h2") is not None,
+                timeout=httpx.Timeout(self.timeout_s, connect=10.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def _annotate(self, pages: Sequence[Tuple[str, str]]) -> List[Union[OCRResult, Exception]]:
+        # encoding is CPU bound, run it off the event loop; an unreadable image only fails its own page
+        contents = await asyncio.gather(*(run_cpu(_encode_image, path) for path, _ in pages), return_exceptions=True)
+        results: List[Union[OCRResult, Exception, None]] = [
+            content if isinstance(content, Exception) else None for content in contents
+        ]
+        sent = [i for i, content in enumerate(contents) if not isinstance(content, Exception)]
+        requests = self._split_by_size(sent, contents)
+        outcomes = await asyncio.gather(
+            *(self._post([contents[i] for i in request]) for request in requests), return_exceptions=True
+        )
+        for request, outcome in zip(requests, outcomes):
+            for i, response in zip(request, outcome if isinstance(outcome, list) else [outcome] * len(request)):
+                results[i] = response if isinstance(response, Exception) else _to_result(pages[i][1], response)
+        return results
+
+    def _split_by_size(self, sent: List[int], contents: Sequence[Union[str, BaseException]]) -> List[List[int]]:
+        """Group the encoded images into requests that stay within `max_request_bytes`."""
+        requests: List[List[int]] = []
+        size = 0
+        for i in sent:
+            length = len(contents[i])
+            if not requests or size + length > self.max_request_bytes:
+                requests.append([])
+                size = 0
+            requests[-1].append(i)
+            size += length
+        return requests
+
+    async def _post(self, contents: List[str]) -> List[dict]:
         request_body = {
-            "requests": [{"image": {"content": image_content}, "features": [{"type": "DOCUMENT_TEXT_DETECTION"}]}]
+            "requests": [
+                {"image": {"content": content}, "features": [{"type": "DOCUMENT_TEXT_DETECTION"}]}
+                for content in contents
+            ]
         }
 
-        response = requests.post(
-            self.endpoint_url,
-            data=json.dumps(request_body),
-            params={"key": self.api_key},
-            headers={"Content-Type": "application/json"},
-        )
+        response = await self._get_client().post(self.endpoint_url, json=request_body, params={"key": self.api_key})
 
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientServiceError(f"Google Vision API error: {response.status_code}, {response.text}")
         if response.status_code != 200:
             raise RuntimeError(f"Google Vision API error: {response.status_code}, {response.text}")
 
-        result = response.json()
-        if "error" in result.get("responses", [{}])[0]:
-            raise RuntimeError(f"Google Vision API returned error: {result['responses'][0]['error']}")
+        responses = response.json().get("responses", [])
+        if len(responses) != len(contents):
+            raise RuntimeError(f"Google Vision API returned {len(responses)} responses for {len(contents)} images")
+        logger.debug(f"Google Vision annotated {len(contents)} image(s) in one request")
+        return responses
+
+
+def _to_result(image_id: str, response: dict) -> Union[OCRResult, Exception]:
+    if "error" in response:
+        error = response["error"]
+        if error.get("code") in _TRANSIENT_CODES:
+            return TransientServiceError(f"Google Vision API returned error: {error}")
+        return RuntimeError(f"Google Vision API returned error: {error}")
 
-        if "fullTextAnnotation" in result["responses"][0]:
-            full_text = result["responses"][0]["fullTextAnnotation"]["text"]
-            blocks = result["responses"][0]["fullTextAnnotation"]["pages"][0]["blocks"]
-            return OCRResult(page_id=image_id, blocks=blocks, full_text=full_text)
-        else:
-            return OCRResult(page_id=image_id, blocks=[], full_text="")
+    if "fullTextAnnotation" in response:
+        full_text = response["fullTextAnnotation"]["text"]
+        blocks = response["fullTextAnnotation"]["pages"][0]["blocks"]
+        return OCRResult(page_id=image_id, blocks=blocks, full_text=full_text)
+    return OCRResult(page_id=image_id, blocks=[], full_text="")
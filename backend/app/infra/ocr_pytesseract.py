@@ -1,40 +1,113 @@
+import os
+from typing import Any, Dict, List, Optional
+
 import pytesseract
 from PIL import Image, ImageOps
 
+from app.infra.process_pool import run_cpu
 from app.ports.ocr import OCRService
 from app.schemas.ocr import OCRResult
 
+# levels of the Tesseract layout hierarchy in image_to_data
+BLOCK, PARAGRAPH, LINE, WORD = 2, 3, 4, 5
+
+# OMP_THREAD_LIMIT last set by this process
+_thread_limit: Optional[int] = None
+
+
+def _limit_threads(threads: int) -> None:
+    # read by every tesseract subprocess started from this process; set once, not on every page
+    global _thread_limit
+    if _thread_limit != threads:
+        os.environ["OMP_THREAD_LIMIT"] = str(threads)
+        _thread_limit = threads
+
+
+def warm_up() -> None:
+    """CPU pool warm-up: resolve the tesseract binary and load its language data once per process."""
+    pytesseract.get_tesseract_version()
+    pytesseract.image_to_string(Image.new("L", (32, 32), color=255))
+
 
 class PytesseractOCRService(OCRService):
-    def __init__(self):
-        pass
+    """
+    Tesseract OCR in a single `image_to_data` pass, which yields the words with their layout;
+    full text and block, line and word structure are all built from it.
+
+    Pages run in the shared CPU pool, one Tesseract per pool process. `threads` caps the
+    OpenMP threads of each Tesseract, so parallel pages do not oversubscribe the cores; every
+    process applies the cap with its first page, whatever warm-ups it ran.
+    """
+
+    def __init__(self, lang: str = "eng", oem: int = 1, psm: int = 3, threads: int = 1):
+        self.lang = lang
+        self.config = f"--oem {oem} --psm {psm}"
+        self.threads = threads
+
+    def cache_version(self) -> str:
+        version = pytesseract.get_tesseract_version()
+        return f"tesseract-{version}:{self.lang}:{self.config}:single-pass"
 
     async def extract(self, image_path: str, image_id: str) -> OCRResult:
-        with Image.open(image_path) as img:
-            image = ImageOps.exif_transpose(img).copy()
-
-        # Full text content
-        full_text = pytesseract.image_to_string(image)
-
-        # Word-level and block-level data
-        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-
-        # Convert pytesseract blocks into a compatible structure
-        blocks = []
-        for i in range(len(data["level"])):
-            if data["level"][i] == 2:  # 2 = block level in Tesseract hierarchy
-                block = {
-                    "blockType": "TEXT",
-                    "boundingBox": {
-                        "vertices": [
-                            {"x": data["left"][i], "y": data["top"][i]},
-                            {"x": data["left"][i] + data["width"][i], "y": data["top"][i]},
-                            {"x": data["left"][i] + data["width"][i], "y": data["top"][i] + data["height"][i]},
-                            {"x": data["left"][i], "y": data["top"][i] + data["height"][i]},
-                        ]
-                    },
-                    "text": "",  # Tesseract does not group text by block in this API
-                }
-                blocks.append(block)
-
-        return OCRResult(page_id=image_id, blocks=blocks, full_text=full_text)
+        # tesseract is CPU bound, it runs in the shared process pool
+        return await run_cpu(_extract_sync, image_path, image_id, self.lang, self.config, self.threads)
+
+
+def _extract_sync(image_path: str, image_id: str, lang: str = "eng", config: str = "", threads: int = 1) -> OCRResult:
+    _limit_threads(threads)
+
+    with Image.open(image_path) as img:
+        image = ImageOps.exif_transpose(img).copy()
+
+    data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+    blocks = _layout(data)
+    full_text = "\n\n".join(block["text"] for block in blocks if block["text"])
+    return OCRResult(page_id=image_id, blocks=blocks, full_text=full_text)
+
+
+def _bounding_box(data: Dict[str, List[Any]], i: int) -> Dict[str, Any]:
+    left, top, width, height = data["left"][i], data["top"][i], data["width"][i], data["height"][i]
+    return {
+        "vertices": [
+            {"x": left, "y": top},
+            {"x": left + width, "y": top},
+            {"x": left + width, "y": top + height},
+            {"x": left, "y": top + height},
+        ]
+    }
+
+
+def _layout(data: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Convert image_to_data rows into blocks with lines and words, in a structure compatible
+    with the Google Vision blocks. Lines of a paragraph are joined with newlines, paragraphs
+    of a block with a blank line, like `image_to_string` does.
+    """
+    blocks: List[Dict[str, Any]] = []
+    paragraphs: List[List[Dict[str, Any]]] = []
+    for i, level in enumerate(data["level"]):
+        if level == BLOCK:
+            blocks.append({"blockType": "TEXT", "boundingBox": _bounding_box(data, i), "text": "", "lines": []})
+            paragraphs.append([])
+        elif level == PARAGRAPH and blocks:
+            paragraphs[-1].append({"lines": []})
+        elif level == LINE and blocks:
+            line = {"boundingBox": _bounding_box(data, i), "text": "", "words": []}
+            blocks[-1]["lines"].append(line)
+            if not paragraphs[-1]:
+                paragraphs[-1].append({"lines": []})
+            paragraphs[-1][-1]["lines"].append(line)
+        elif level == WORD and blocks and blocks[-1]["lines"]:
+            text = (data["text"][i] or "").strip()
+            if not text:
+                continue
+            blocks[-1]["lines"][-1]["words"].append(
+                {"text": text, "boundingBox": _bounding_box(data, i), "confidence": float(data["conf"][i])}
+            )
+
+    for block, block_paragraphs in zip(blocks, paragraphs):
+        for line in block["lines"]:
+            line["text"] = " ".join(word["text"] for word in line["words"])
+        texts = ["\n".join(line["text"] for line in p["lines"] if line["text"]) for p in block_paragraphs]
+        block["text"] = "\n\n".join(t for t in texts if t)
+    return blocks
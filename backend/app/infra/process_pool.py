@@ -0,0 +1,120 @@
+"""
+Shared process pool for CPU-bound pipeline work (OCR, thumbnails, local embeddings).
+
+Work submitted through `run_cpu` (async) or `call_cpu` (sync) runs in a `ProcessPoolExecutor`
+sized to the core count, so it neither blocks the event loop nor contends for the GIL.
+Each pool process runs the warm-ups named in `CPU_POOL_WARMUP` once at start, so Tesseract and
+the BGE model are loaded before the first job arrives instead of on every call.
+
+With `CPU_POOL_WORKERS=0` the pool is disabled and the same functions run on threads in-process.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# warm-ups by name: "module:function" loading a resource into the calling process, imported lazily
+# so a pool process only pulls in the heavy libraries it is asked to warm up
+WARMUPS: Dict[str, str] = {
+    "tesseract": "app.infra.ocr_pytesseract:warm_up",
+    "bge": "app.database.init_embedding_db:warm_up_bge",
+}
+
+
+def _warm_worker(names: List[str]) -> None:
+    # runs once in every pool process before it accepts work
+    for name in names:
+        target = WARMUPS.get(name)
+        if target is None:
+            logger.warning(f"Unknown CPU pool warm-up: {name}")
+            continue
+        module, func = target.split(":")
+        try:
+            getattr(importlib.import_module(module), func)()
+        except Exception:
+            # a failed warm-up only costs the first job its load time
+            logger.exception(f"CPU pool warm-up {name} failed")
+
+
+def warmups() -> List[str]:
+    """Warm-ups for the pool processes; "auto" loads what the configured OCR and embedding backends need."""
+    settings = get_settings()
+    spec = settings.CPU_POOL_WARMUP.strip().lower()
+    if spec != "auto":
+        return [w.strip() for w in spec.split(",") if w.strip()]
+    names = []
+    if "tesseract" in settings.ocr_backend_list:
+        names.append("tesseract")
+    if "local_bge" in settings.target_config_list:
+        names.append("bge")
+    return names
+
+
+def pool_size() -> int:
+    """Number of pool processes, 0 when CPU work runs in-process."""
+    workers = get_settings().CPU_POOL_WORKERS
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(0, workers)
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared pool, created on first use; None if it is disabled."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    size = pool_size()
+    if size == 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            names = warmups()
+            # spawn: forking a process that runs an event loop, db pools and torch threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+                initargs=(names,),
+            )
+            logger.info(f"Started CPU pool with {size} processes, warm-ups: {', '.join(names) or 'none'}")
+    return _pool
+
+
+async def run_cpu(fn: Callable[..., R], *args: Any) -> R:
+    """Run a picklable, module level function in the pool without blocking the event loop."""
+    pool = get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+def call_cpu(fn: Callable[..., R], *args: Any) -> R:
+    """Blocking variant of `run_cpu` for synchronous interfaces, call it off the event loop."""
+    pool = get_process_pool()
+    if pool is None:
+        return fn(*args)
+    return pool.submit(fn, *args).result()
+
+
+async def shutdown_process_pool() -> None:
+    """Stop the pool; waiting for its processes to exit happens off the event loop."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+        logger.info("CPU pool stopped")
@@ -2,7 +2,7 @@ from typing import Any, Dict
 
 from mistralai import Mistral
 
-from app.ports.recipe_parser_llm import RecipeParserLLM
+from app.ports.recipe_parser_llm import PROMPT_VERSION, RecipeParserLLM
 
 
 class MistralParser(RecipeParserLLM):
@@ -10,6 +10,9 @@ class MistralParser(RecipeParserLLM):
         self.client = Mistral(api_key=api_key)
         self.model = model
 
+    def cache_version(self) -> str:
+        return f"mistralai:{self.model}:{PROMPT_VERSION}"
+
     async def call_model(self, input_text: str, instruction: str, output_type) -> Dict[str, Any]:
         chat_response = await self.client.chat.parse_async(
             model=self.model,
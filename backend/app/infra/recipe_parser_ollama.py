@@ -3,7 +3,7 @@ from typing import Any, Dict
 
 import httpx
 
-from app.ports.recipe_parser_llm import RecipeParserLLM
+from app.ports.recipe_parser_llm import PROMPT_VERSION, RecipeParserLLM
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,9 @@ class OllamaParser(RecipeParserLLM):
         self.base_url = base_url.rstrip("/")
         self.model = model
 
+    def cache_version(self) -> str:
+        return f"ollama:{self.model}:{PROMPT_VERSION}"
+
     async def call_model(self, input_text: str, instruction: str, output_type) -> Dict[str, Any]:
         schema = output_type.model_json_schema()
 
@@ -0,0 +1,244 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.ports.segmentation import SegmentationService
+from app.schemas.ocr import OCRResult, SegmentationResult, SegmentationSegment
+from app.schemas.ocr_blocks import block_words
+
+logger = logging.getLogger(__name__)
+
+# a block starts a recipe when its first line is this much taller than the page's typical glyphs
+TITLE_HEIGHT_RATIO = 1.35
+# titles are short; longer first lines are headings inside a recipe at most
+MAX_TITLE_WORDS = 10
+# blocks wider than this share of the text area span the columns (headers, full-width titles)
+SPANNING_WIDTH = 0.6
+# whitespace above a title, in line heights, from which the gap counts as a full section break
+SECTION_GAP_LINES = 2.0
+# segments with fewer words than this are suspiciously short for a recipe
+MIN_SEGMENT_WORDS = 30
+# text above the first title shorter than this is page furniture, not the end of the previous recipe
+MIN_CARRYOVER_WORDS = 10
+
+
+@dataclass
+class _Line:
+    words: List[str]
+    height: float
+
+
+def _vertices(box: Optional[Dict[str, Any]]) -> List[Dict[str, int]]:
+    # Vision leaves out zero coordinates
+    return [{"x": int(v.get("x", 0)), "y": int(v.get("y", 0))} for v in (box or {}).get("vertices") or []]
+
+
+def _height(box: Optional[Dict[str, Any]]) -> float:
+    vertices = _vertices(box)
+    if len(vertices) == 4:
+        # mean of the left and right edge, so skewed long words do not count as tall ones
+        return ((vertices[3]["y"] - vertices[0]["y"]) + (vertices[2]["y"] - vertices[1]["y"])) / 2
+    ys = [v["y"] for v in vertices]
+    return float(max(ys) - min(ys)) if ys else 0.0
+
+
+def _first_line(block: Dict[str, Any]) -> Optional[_Line]:
+    """The top line of a block, from the words whose centre lies within half a glyph of the topmost one."""
+    words = [(text, box, _height(box)) for text, box in block_words(block) if text.strip()]
+    if not words:
+        return None
+    centres = [sum(v["y"] for v in _vertices(box)) / max(1, len(_vertices(box))) for _, box, _ in words]
+    top = min(centres)
+    line_height = float(np.median([h for _, _, h in words]))
+    line = [(text, h) for (text, _, h), c in zip(words, centres) if c - top <= line_height / 2]
+    return _Line(words=[text for text, _ in line], height=float(np.median([h for _, h in line])))
+
+
+def _columns(x0: np.ndarray, x1: np.ndarray, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Left and right edges of the columns, the union of the blocks' horizontal extents."""
+    order = np.argsort(x0)
+    starts, ends = [x0[order[0]]], [x1[order[0]]]
+    for i in order[1:]:
+        if x0[i] > ends[-1] + tolerance:
+            starts.append(x0[i])
+            ends.append(x1[i])
+        else:
+            ends[-1] = max(ends[-1], x1[i])
+    return np.array(starts), np.array(ends)
+
+
+class GeometrySegmentationService(SegmentationService):
+    """
+    Splits a page into recipes from the layout of its OCR blocks. Blocks are put in reading order
+    (bands between full-width blocks, then columns, then top to bottom) and a new recipe starts at
+    every block whose first line is set in a clearly larger type than the body text. Blocks before
+    the first title continue the recipe of the previous page.
+
+    Every segment carries a confidence from the title's size margin, the whitespace above it and the
+    amount of text that follows. A page without any title is left whole, its confidence being how
+    clearly nothing on it looked like one.
+    """
+
+    def __init__(self, title_height_ratio: float = TITLE_HEIGHT_RATIO):
+        self.title_height_ratio = title_height_ratio
+
+    async def segment(self, ocr_json: OCRResult, enable_segmentation: bool = False) -> SegmentationResult:
+        blocks = ocr_json.blocks
+        if not enable_segmentation or not blocks:
+            return self._whole_page(blocks, None if not enable_segmentation else 1.0)
+
+        boxes = np.array([self._box(block) for block in blocks], dtype=float)
+        word_heights = np.array(
+            [h for block in blocks for text, box in block_words(block) if text.strip() for h in [_height(box)] if h > 0]
+        )
+        if not word_heights.size:
+            return self._whole_page(blocks, 1.0)
+        body_height = float(np.median(word_heights))
+
+        lines = [_first_line(block) for block in blocks]
+        ratios = np.array([line.height / body_height if line else 0.0 for line in lines])
+        is_title = (ratios >= self.title_height_ratio) & np.array([self._title_like(line) for line in lines])
+
+        if not is_title.any():
+            # the closer a block came to a title, the less sure we are there is none
+            ambiguity = np.clip((ratios.max() - 1) / (self.title_height_ratio - 1), 0, 1)
+            return self._whole_page(blocks, round(float(1 - 0.5 * ambiguity), 3))
+
+        order, regions = self._reading_order(boxes, is_title, body_height)
+        word_counts = np.array([len(block_words(block)) for block in blocks])
+
+        segments: List[List[int]] = []
+        titles: List[List[int]] = []
+        for i in order:
+            i = int(i)
+            # a title broken over several blocks stays one title
+            continued = bool(segments) and bool(titles[-1]) and set(segments[-1]) == set(titles[-1])
+            if is_title[i] and continued:
+                titles[-1].append(i)
+            elif is_title[i] or not segments:
+                segments.append([])
+                titles.append([i] if is_title[i] else [])
+            segments[-1].append(i)
+
+        # a few stray blocks above the first title (page header, margin notes) belong to it
+        if not titles[0] and word_counts[segments[0]].sum() < MIN_CARRYOVER_WORDS:
+            carry = segments.pop(0)
+            titles.pop(0)
+            segments[0][:0] = carry
+
+        page_segments = []
+        for segment_id, (members, title) in enumerate(zip(segments, titles)):
+            if not title:
+                # carried over from the previous page, only as certain as the title that ends it
+                name, confidence = "previous_page", None
+            else:
+                name = self._title_text(title, lines, boxes, body_height)
+                confidence = self._title_confidence(
+                    ratios[title].max(),
+                    self._gap_above(title[0], order, boxes, regions),
+                    word_counts[members].sum(),
+                    body_height,
+                )
+            page_segments.append(
+                SegmentationSegment(
+                    id=segment_id,
+                    title=name,
+                    bounding_boxes=self._region_boxes(members, boxes, regions),
+                    associated_ocr_blocks=members,
+                    confidence=confidence,
+                )
+            )
+        if page_segments[0].confidence is None:
+            page_segments[0].confidence = page_segments[1].confidence
+
+        confidence = min(segment.confidence for segment in page_segments)
+        logger.info(f"Segmented page {ocr_json.page_id} into {len(page_segments)} part(s), confidence {confidence}")
+        return SegmentationResult(segmentation_done=True, page_segments=page_segments, confidence=confidence)
+
+    @staticmethod
+    def _title_like(line: Optional[_Line]) -> bool:
+        # short, and real words rather than an icon or a drop cap
+        return (
+            line is not None and len(line.words) <= MAX_TITLE_WORDS and sum(map(str.isalpha, "".join(line.words))) >= 3
+        )
+
+    @staticmethod
+    def _title_text(title: List[int], lines: List[Optional[_Line]], boxes: np.ndarray, body_height: float) -> str:
+        # pieces of a title in text order: by line, then left to right
+        pieces = sorted(title, key=lambda i: (boxes[i, 1] // body_height, boxes[i, 0]))
+        return " ".join(" ".join(lines[i].words) for i in pieces)
+
+    @staticmethod
+    def _box(block: Dict[str, Any]) -> Tuple[int, int, int, int]:
+        vertices = _vertices(block.get("boundingBox"))
+        if not vertices:
+            return 0, 0, 0, 0
+        xs, ys = [v["x"] for v in vertices], [v["y"] for v in vertices]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    @staticmethod
+    def _reading_order(boxes: np.ndarray, is_title: np.ndarray, body_height: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Block indexes in reading order, and the (band, column) region of every block."""
+        x0, y0, x1, y1 = boxes.T
+        wide = (x1 - x0) >= SPANNING_WIDTH * max(x1.max() - x0.min(), 1.0)
+        # columns come from the body text, titles often run across them
+        body = ~wide & ~is_title
+        if not body.any():
+            body = np.ones_like(wide)
+        starts, ends = _columns(x0[body], x1[body], tolerance=body_height)
+
+        overlap = np.minimum(x1[:, None], ends[None, :]) - np.maximum(x0[:, None], starts[None, :])
+        spanning = (wide | ((overlap > body_height).sum(axis=1) > 1)) & (len(starts) > 1)
+        column = np.where(spanning, -1, np.argmax(overlap, axis=1))
+
+        # a spanning block opens a band; blocks level with its top already belong to that band
+        band = np.searchsorted(np.sort(y0[spanning]), y0 + body_height, side="right")
+        order = np.lexsort((y0, column, band))
+        return order, np.stack([band, column], axis=1)
+
+    @staticmethod
+    def _gap_above(title: int, order: np.ndarray, boxes: np.ndarray, regions: np.ndarray) -> float:
+        """Whitespace between the title and the block above it in its column, inf at the column top."""
+        position = int(np.where(order == title)[0][0])
+        if position == 0 or (regions[order[position - 1]] != regions[title]).any():
+            return float("inf")
+        return float(boxes[title, 1] - boxes[order[position - 1], 3])
+
+    @staticmethod
+    def _title_confidence(ratio: float, gap: float, words: int, body_height: float) -> float:
+        size = np.clip((ratio - 1) / (2 * (TITLE_HEIGHT_RATIO - 1)), 0, 1)
+        spacing = np.clip(gap / (SECTION_GAP_LINES * body_height), 0, 1)
+        length = np.clip(words / MIN_SEGMENT_WORDS, 0, 1)
+        return round(float(0.5 * size + 0.3 * spacing + 0.2 * length), 3)
+
+    @staticmethod
+    def _region_boxes(members: List[int], boxes: np.ndarray, regions: np.ndarray) -> List[List[Dict[str, int]]]:
+        """One rectangle per band and column the segment runs through."""
+        rectangles = []
+        member_regions = regions[members]
+        for region in np.unique(member_regions, axis=0):
+            part = boxes[np.array(members)[(member_regions == region).all(axis=1)]]
+            left, top = part[:, :2].min(axis=0).astype(int)
+            right, bottom = part[:, 2:].max(axis=0).astype(int)
+            rectangles.append(
+                [
+                    {"x": int(left), "y": int(top)},
+                    {"x": int(right), "y": int(top)},
+                    {"x": int(right), "y": int(bottom)},
+                    {"x": int(left), "y": int(bottom)},
+                ]
+            )
+        return rectangles
+
+    @staticmethod
+    def _whole_page(blocks: List[Dict[str, Any]], confidence: Optional[float]) -> SegmentationResult:
+        segment = SegmentationSegment(
+            id=0,
+            title="",
+            bounding_boxes=[_vertices(block.get("boundingBox")) for block in blocks],
+            associated_ocr_blocks=list(range(len(blocks))),
+            confidence=confidence,
+        )
+        return SegmentationResult(segmentation_done=False, page_segments=[segment], confidence=confidence)
@@ -1,14 +1,18 @@
+import asyncio
+import glob
 import json
 import os
 import shutil
 from io import BytesIO
-from typing import Any
+from typing import Any, Dict, Iterable
 
 import aiofiles
 from fastapi import UploadFile
 from PIL import Image
 
+from app.infra import ocr_format
 from app.ports.storage import StorageService
+from app.schemas.ocr import OCRResult
 
 
 class LocalStorageService(StorageService):
@@ -49,6 +53,10 @@ class LocalStorageService(StorageService):
             path = os.path.join(folder, filename)
             if os.path.exists(path):
                 os.remove(path)
+        # images prepared for OCR next to the original
+        stem, _ = os.path.splitext(filename)
+        for path in glob.glob(os.path.join(glob.escape(self._get_dir(kind)), f"{glob.escape(stem)}.ocr-*")):
+            os.remove(path)
 
     async def rename(self, storage_path: str, filename: str, kind: str = "recipe") -> str:
         new_path = os.path.join(self._get_dir(kind), filename)
@@ -94,6 +102,40 @@ class LocalStorageService(StorageService):
             contents = await f.read()
         return json.loads(contents)
 
+    # --- OCR results ---
+    # compact sectioned files (see ocr_format), pages stored earlier as JSON are still read
+
+    def _ocr_path(self, image_id: str) -> str:
+        return os.path.join(self.json_dir, f"{image_id}{ocr_format.EXTENSION}")
+
+    async def save_ocr(self, result: OCRResult, image_id: str) -> str:
+        path = self._ocr_path(image_id)
+        data = await asyncio.to_thread(ocr_format.encode, result)
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(data)
+        return path
+
+    def _read_sections(self, image_id: str, names: Iterable[str]) -> Dict[str, Any]:
+        with open(self._ocr_path(image_id), "rb") as f:
+            return ocr_format.read_sections(f, names)
+
+    async def read_ocr(self, image_id: str) -> Dict[str, Any]:
+        if not os.path.exists(self._ocr_path(image_id)):
+            return await super().read_ocr(image_id)
+        sections = await asyncio.to_thread(self._read_sections, image_id, ("meta", "text", "blocks"))
+        return {"page_id": sections["meta"]["page_id"], "full_text": sections["text"], "blocks": sections["blocks"]}
+
+    async def read_ocr_text(self, image_id: str) -> str:
+        if not os.path.exists(self._ocr_path(image_id)):
+            return await super().read_ocr_text(image_id)
+        return (await asyncio.to_thread(self._read_sections, image_id, ("text",)))["text"]
+
+    async def read_ocr_geometry(self, image_id: str) -> Dict[str, Any]:
+        if not os.path.exists(self._ocr_path(image_id)):
+            return await super().read_ocr_geometry(image_id)
+        sections = await asyncio.to_thread(self._read_sections, image_id, ("meta", "geometry"))
+        return {"page_id": sections["meta"]["page_id"], "blocks": ocr_format.geometry_blocks(sections["geometry"])}
+
     # --- Generic files / models ---
 
     def get_file_path(self, rel_path: str) -> str:
@@ -1,12 +1,12 @@
 # services/thumbnail_service.py
 from __future__ import annotations
 
-import asyncio
 from io import BytesIO
 from typing import Tuple
 
 from PIL import Image, ImageOps
 
+from app.infra.process_pool import run_cpu
 from app.ports.thumbnail import ThumbnailService
 
 
@@ -15,8 +15,8 @@ class PillowThumbnailService(ThumbnailService):
     Local thumbnail generator that down‑sizes the longest edge to *size*
     (default 300 px) and encodes as JPEG.
 
-    Running the Pillow work inside `run_in_executor()` keeps your async
-    event‑loop unblocked.
+    The Pillow work runs in the shared CPU pool, which keeps the async
+    event‑loop unblocked and is not limited by the GIL.
     """
 
     def __init__(self, size: Tuple[int, int] = (800, 800), fmt: str = "JPEG"):
@@ -25,20 +25,20 @@ class PillowThumbnailService(ThumbnailService):
 
     # public async API -------------------------------------------------------
     async def generate_thumbnail(self, src_path: str) -> bytes:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self._sync_make_thumb, src_path)
+        return await run_cpu(_sync_make_thumb, src_path, self.size, self.fmt)
 
-    # -----------------------------------------------------------------------
-    def _sync_make_thumb(self, src_path: str) -> bytes:
-        with Image.open(src_path) as img:
-            img = ImageOps.exif_transpose(img)
 
-            img.thumbnail(self.size)
+# ---------------------------------------------------------------------------
+def _sync_make_thumb(src_path: str, size: Tuple[int, int], fmt: str) -> bytes:
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
 
-            # Ensure JPEG-compatible mode
-            if self.fmt.upper() == "JPEG" and img.mode not in ("RGB", "L"):
-                img = img.convert("RGB")
+        img.thumbnail(size)
 
-            buf = BytesIO()
-            img.save(buf, self.fmt, quality=85)
-            return buf.getvalue()
+        # Ensure JPEG-compatible mode
+        if fmt.upper() == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        buf = BytesIO()
+        img.save(buf, fmt, quality=85)
+        return buf.getvalue()
@@ -9,36 +9,21 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
 
 from app.core.config import get_settings
-from app.core.deps import (
-    get_classification_service,
-    get_ocr_service,
-    get_segmentation_service,
-    get_text_or_image_service,
-    get_thumbnail_service,
-    get_validation_service,
-    make_scoped_repo,
-    new_classification_repo,
-    new_image_repo,
-    new_recipe_repo,
-)
+from app.core.deps import get_thumbnail_service
 from app.database import init_db as dbmod
-from app.database.init_db import ensure_schemas_exist
-from app.database.init_embedding_db import build_store_registry
-from app.database.init_langgraph_db import langgraph_make_saver
-from app.infra.embedding_chunker_langchain import RecursiveChunker
-from app.infra.embeding_vectorstore_langchain import PGVectorEmbeddingStore
+from app.database.init_langgraph_db import langgraph_make_saver, setup_scanner_checkpoints
+from app.infra.process_pool import shutdown_process_pool
 from app.infra.storage_local import LocalStorageService
 from app.routes.api import api_router
-from app.services.embedding_service import EmbeddingService
-from app.workflows.classification.classification_worker import ClassificationWorker
-from app.workflows.ocr.ocr_worker import OCRWorker
+from app.routes.status import listen_for_relayed_status
+from app.workflows.pipeline import STAGES, build_embedding_runtime, build_workers, drain_workers, parse_stages
+from app.workflows.queues.admission import QueueSaturated
+from app.workflows.queues.debounce import get_debouncer
 from app.workflows.queues.queues import QueueRegistry, get_queue_registry
+from app.workflows.queues.spill import persist_queues, restore_queues
 from app.workflows.recipeassistant.chat_graph_definition import build_simple_rag_graph
-from app.workflows.recipeassistant.embedding_worker import EmbeddingWorker
-from app.workflows.segmentation.segmentation_worker import SegmentationWorker
 
 # Configure logging
 logging.basicConfig(
@@ -63,17 +48,8 @@ async def lifespan(myapp: FastAPI):
     engine = dbmod.async_engine  # always take it from dbmod
     session_maker = dbmod.SessionMaker  # always take it from dbmod
 
-    # test friendly database connections
-    async with engine.begin() as conn:
-        try:
-            if engine.dialect.name == "postgresql":
-                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        except Exception:
-            logger.info("Skipping pgvector extension creation")
-        await ensure_schemas_exist()
-        await conn.run_sync(dbmod.sync_create_tables)
-
-    logger.info("Database initialized")
+    await dbmod.initialize_database(engine)
+
     myapp.state.engine = engine
     myapp.state.sessionmaker = session_maker
     if not hasattr(myapp.state, "storage"):
@@ -91,84 +67,60 @@ async def lifespan(myapp: FastAPI):
         name="scanner_images",
     )
 
-    image_repo = make_scoped_repo(new_image_repo, session_maker)
-    classification_repo = make_scoped_repo(new_classification_repo, session_maker)
-    recipe_repository = make_scoped_repo(new_recipe_repo, session_maker)
-
-    ocr_service = get_ocr_service()
-    segmentation_service = get_segmentation_service()
-    classification_service = get_classification_service()
-
-    validation_service = get_validation_service()
-
     dep_thumb = myapp.dependency_overrides.get(get_thumbnail_service, get_thumbnail_service)
-    thumbnail_service = dep_thumb
+    thumbnail_service = dep_thumb()
 
     dep = myapp.dependency_overrides.get(get_queue_registry, get_queue_registry)
     queues: QueueRegistry = dep()
 
-    text_or_imgage_service = get_text_or_image_service()
-    ocr_worker = OCRWorker(
-        ocr_queue=queues.ocr,
-        seg_queue=queues.seg,
-        image_repo=image_repo,
-        storage=myapp.state.storage,
-        ocr_service=ocr_service,
-        text_or_image=text_or_imgage_service,
-    )
-
-    seg_worker = SegmentationWorker(
-        seg_queue=queues.seg,
-        image_repo=image_repo,
-        segmentation_service=segmentation_service,
-        storage=myapp.state.storage,
-    )
-    class_worker = ClassificationWorker(
-        class_queue=queues.cls,
-        image_repo=image_repo,
-        classification_service=classification_service,
-        storage=myapp.state.storage,
-        thumbnail_service=thumbnail_service,
-        validation_service=validation_service,
-        classification_repo=classification_repo,
-        recipe_repo=recipe_repository,
-    )
-
     # Embedding fiels
-    myapp.state.embedding_service = EmbeddingService(
-        repo=recipe_repository, chunker=RecursiveChunker(size=800, overlap=100)
-    )
-
-    myapp.state.embedding_stores = {k: PGVectorEmbeddingStore(v) for k, v in build_store_registry().items()}
-
-    myapp.state.embedding_active_version = next(
-        iter({t.active_version for t in settings.target_config_list.values()}), "v1"
-    )
-
-    worker = EmbeddingWorker(
-        entry_queue=queues.emb,
-        service=myapp.state.embedding_service,
-        stores=myapp.state.embedding_stores,
-        current_version=myapp.state.embedding_active_version,
-    )
+    embedding = build_embedding_runtime(session_maker)
+    myapp.state.embedding_service = embedding.service
+    myapp.state.embedding_stores = embedding.stores
+    myapp.state.embedding_active_version = embedding.active_version
 
     saver = await langgraph_make_saver()
     myapp.state.recipe_assistant_graph = build_simple_rag_graph(saver)
-
-    worker_tasks = [
-        asyncio.create_task(ocr_worker.run(), name="ocr"),
-        asyncio.create_task(seg_worker.run(), name="seg"),
-        asyncio.create_task(class_worker.run(), name="cls"),
-        asyncio.create_task(worker.run(), name="embed"),
-    ]
+    prune_checkpoints = await setup_scanner_checkpoints()
+
+    # stages left out here are served by `python -m app.worker`, which needs a shared queue backend
+    stages = parse_stages(settings.API_WORKER_STAGES)
+    skipped = [stage for stage in STAGES if stage not in stages]
+    if skipped and settings.QUEUE_BACKEND.lower() == "memory":
+        logger.warning(
+            f"Stages {', '.join(skipped)} do not run in the API, but the in-memory queues cannot be "
+            "consumed by another process. Set QUEUE_BACKEND=postgres to run them in `app.worker`."
+        )
+
+    workers = build_workers(
+        stages,
+        queues=queues,
+        storage=myapp.state.storage,
+        session_maker=session_maker,
+        thumbnail_service=thumbnail_service,
+        embedding=embedding,
+    )
+    # items left in the in-memory queues by the last shutdown
+    await restore_queues(queues, session_maker)
+    worker_tasks = [asyncio.create_task(worker.run(), name=stage) for stage, worker in workers.items()]
+    # status updates of workers in other processes
+    status_listener = None
+    if settings.QUEUE_BACKEND.lower() == "postgres":
+        status_listener = asyncio.create_task(listen_for_relayed_status(settings.sync_db_url), name="status-relay")
 
     try:
         yield  # the app runs here
     finally:
-        # Cancel all running workers
-        for task in worker_tasks:
-            task.cancel()
-        await asyncio.gather(*worker_tasks, return_exceptions=True)
+        if status_listener:
+            status_listener.cancel()
+        # Drain the workers, in-flight items finish or go back to their queue
+        await drain_workers(workers, worker_tasks, settings.WORKER_DRAIN_TIMEOUT_S)
+        prune_checkpoints.cancel()
+        # held back jobs are enqueued, durable queues keep them for the next start
+        await get_debouncer().close()
+        await persist_queues(queues, session_maker)
+        await queues.close()
+        await shutdown_process_pool()
 
         logger.info("Shutting down application...")
         await engine.dispose()
@@ -226,6 +178,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
+@app.exception_handler(QueueSaturated)
+async def queue_saturated_handler(request: Request, exc: QueueSaturated):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc), "stage": exc.stage, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Meal Planner API"}
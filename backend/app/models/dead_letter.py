@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, DateTime, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.base import Base
+from app.models.model_helper import generate_uuid
+
+
+class DeadLetterORM(Base):
+    """A pipeline item that failed for good, kept for inspection and requeueing."""
+
+    __tablename__ = "dead_letters"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
+    # queue the item came from: ocr, seg, cls, emb
+    stage: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    worker: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    error: Mapped[str] = mapped_column(Text, nullable=False)
+    traceback: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+    requeued_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
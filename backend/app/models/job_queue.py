@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.base import Base
+
+
+class QueuedJobORM(Base):
+    """One pending item of a durable pipeline queue (see `PostgresQueue`)."""
+
+    __tablename__ = "job_queue"
+
+    # monotonically increasing id doubles as FIFO order
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    queue: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # see app.workflows.queues.priority.Priority, lower is served first
+    priority: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    # fair-share key, owners take turns within a priority class
+    owner: Mapped[str | None] = mapped_column(String, nullable=True)
+    # round-robin position within the priority class, assigned on enqueue
+    turn: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # (stage, entity id, version) of the work, a waiting job absorbs duplicates with the same key
+    dedupe_key: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # a claimed job is hidden until its visibility timeout expires
+    visible_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_job_queue_claim", "queue", "visible_at", "id"),
+        # claim order, see JobQueueRepository.claim()
+        Index("ix_job_queue_turn_order", "queue", "priority", "turn", "id"),
+        # an owner's last turn in a class, see JobQueueRepository._next_turn()
+        Index("ix_job_queue_owner_turn", "queue", "priority", "owner", "turn"),
+        Index("ix_job_queue_dedupe", "queue", "dedupe_key"),
+    )
+
+
+class JobQueueAckORM(Base):
+    """A job that was processed and deleted; recent rows give the drain rate of a queue across processes."""
+
+    __tablename__ = "job_queue_acks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    queue: Mapped[str] = mapped_column(String, nullable=False)
+    acked_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_job_queue_acks_queue_acked_at", "queue", "acked_at"),)
@@ -79,6 +79,23 @@ class ClassificationRecordORM(Base):
     __table_args__ = (Index("ix_scan_records_book_status", "book_scan_id", "status"),)
 
 
+class ClassificationRecordPageORM(Base):
+    """
+    Pages used by a record, one row per page. Mirrors the ids in `ClassificationRecordORM.pages` so
+    the used pages of a book come from one indexed query instead of reading every record.
+    """
+
+    __tablename__ = "classification_record_pages"
+
+    record_id: Mapped[str] = mapped_column(
+        String, ForeignKey("classification_records.id", ondelete="CASCADE"), primary_key=True
+    )
+    page_id: Mapped[str] = mapped_column(String, primary_key=True)
+    book_scan_id: Mapped[str] = mapped_column(String, ForeignKey("book_scans.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (Index("ix_record_pages_book_page", "book_scan_id", "page_id"),)
+
+
 class BookScanORM(Base):
     __tablename__ = "book_scans"
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from app.schemas.ocr import OCRResult
 
@@ -14,3 +14,10 @@ class ClassificationService(ABC):
         describing the recipe.
         """
         ...
+
+    def cache_version(self) -> Optional[str]:
+        """
+        Provider, model and prompt that produced a classification, part of the classification cache key.
+        Change it whenever the output for the same text would change. None disables caching.
+        """
+        return None
@@ -0,0 +1,19 @@
+from typing import Tuple, Type
+
+import httpx
+import requests
+
+
+class TransientServiceError(RuntimeError):
+    """An external backend failed in a way that may succeed on retry (5xx, rate limit, timeout)."""
+
+
+# failures of remote backends that are worth another attempt
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    TransientServiceError,
+    TimeoutError,
+    ConnectionError,
+    httpx.TransportError,
+    requests.ConnectionError,
+    requests.Timeout,
+)
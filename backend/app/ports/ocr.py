@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 from app.schemas.ocr import OCRResult
 
@@ -9,6 +10,13 @@ class OCRService(ABC):
         """Runs OCR and returns a list of OCRBlock-like dictionaries."""
         ...
 
+    def cache_version(self) -> Optional[str]:
+        """
+        Backend and configuration that produced a result, part of the OCR cache key.
+        Change it whenever the output for the same image would change. None disables caching.
+        """
+        return None
+
 
 class TextOrImageService(ABC):
     @abstractmethod
@@ -1,6 +1,7 @@
+import hashlib
 import json
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from app.schemas.ocr import RecipeLLMOut
 
@@ -54,6 +55,9 @@ Rules:
 - Do not include fields not shown in the schema.
 """
 
+# part of the classification cache key, parses made with an older prompt are not reused
+PROMPT_VERSION = hashlib.sha256(INSTRUCTION_PROMPT_LONG.encode()).hexdigest()[:12]
+
 INSTRUCTION_PROMPT_SHORT = (
     'Users provides recipe. Convert the recipe to JSON using the "https://schema.org/Recipe" format.'
     " Only return the JSON."
@@ -77,6 +81,13 @@ class RecipeParserLLM(ABC):
     @abstractmethod
     async def call_model(self, input_text: str, instruction: str, output_type) -> str: ...
 
+    def cache_version(self) -> Optional[str]:
+        """
+        Provider, model and prompt behind a parse, part of the classification cache key.
+        None disables caching.
+        """
+        return None
+
     async def parse(self, recipe_text: str) -> Dict[str, Any]:
         reply = await self.call_model(
             input_text=recipe_text, instruction=INSTRUCTION_PROMPT_LONG, output_type=RecipeLLMOut
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Dict
 
 from fastapi import UploadFile
 from PIL import Image
 
+from app.schemas.ocr import OCRResult
+
 
 class StorageService(ABC):
     @abstractmethod
@@ -57,6 +59,27 @@ class StorageService(ABC):
         """Read a JSON file and return its contents."""
         ...
 
+    # --- OCR results, stored as JSON unless a storage overrides these ---
+
+    async def save_ocr(self, result: OCRResult, image_id: str) -> str:
+        """Store the OCR result of a page. Returns its full path or URI."""
+        await self.save_json(result.model_dump(), image_id)
+        return await self.get_json_path(image_id)
+
+    async def read_ocr(self, image_id: str) -> Dict[str, Any]:
+        """Read the complete OCR result of a page, as `OCRResult` fields."""
+        return await self.read_json(image_id)
+
+    async def read_ocr_text(self, image_id: str) -> str:
+        """Read only the full text of a page."""
+        return (await self.read_ocr(image_id))["full_text"]
+
+    async def read_ocr_geometry(self, image_id: str) -> Dict[str, Any]:
+        """Read the page id and the blocks with only their type and bounding box."""
+        data = await self.read_ocr(image_id)
+        blocks = [{"blockType": b.get("blockType"), "boundingBox": b.get("boundingBox")} for b in data["blocks"]]
+        return {"page_id": data["page_id"], "blocks": blocks}
+
     @abstractmethod
     def get_file_path(self, rel_path: str) -> str:
         """
@@ -1,10 +1,10 @@
-from typing import List, Optional
+from typing import List, Optional, Set
 
 from sqlalchemy import delete, select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.ocr import BookScanORM, ClassificationRecordORM
+from app.models.ocr import BookScanORM, ClassificationRecordORM, ClassificationRecordPageORM
 from app.schemas.ocr import (
     ClassificationRecordCreate,
     ClassificationRecordRead,
@@ -19,6 +19,14 @@ def _select_record(record_id: str, owner_id: Optional[str] = None):
     return stmt
 
 
+def record_page_links(record: ClassificationRecordORM) -> List[ClassificationRecordPageORM]:
+    page_ids = dict.fromkeys(page["id"] for page in (record.text_pages or []) + (record.image_pages or []))
+    return [
+        ClassificationRecordPageORM(record_id=record.id, page_id=page_id, book_scan_id=record.book_scan_id)
+        for page_id in page_ids
+    ]
+
+
 class ClassificationRecordRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -65,6 +73,14 @@ class ClassificationRecordRepository:
 
         return [ClassificationRecordRead.model_validate(r) for r in records]
 
+    async def get_used_page_ids(self, book_id: str, owner_id: Optional[str] = None) -> Set[str]:
+        """Ids of the pages of a book that belong to a record."""
+        if owner_id is not None:
+            await self._ensure_book_owned(book_id, owner_id)
+        stmt = select(ClassificationRecordPageORM.page_id).where(ClassificationRecordPageORM.book_scan_id == book_id)
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
     async def get_all_owned_by_book_id(self, book_id: str, owner_id: str) -> List[ClassificationRecordRead]:
         stmt = (
             select(ClassificationRecordORM)
@@ -112,6 +128,11 @@ class ClassificationRecordRepository:
             update_data["validation_result"] = update_data["validation_result"]
         for field, value in update_data.items():
             setattr(db_obj, field, value)
+        if "text_pages" in update_data or "image_pages" in update_data:
+            await self.session.execute(
+                delete(ClassificationRecordPageORM).where(ClassificationRecordPageORM.record_id == db_obj.id)
+            )
+            self.session.add_all(record_page_links(db_obj))
 
         await self.session.commit()
         await self.session.refresh(db_obj)
@@ -125,11 +146,18 @@ class ClassificationRecordRepository:
         if db_obj is None:
             raise NoResultFound(f"ClassificationRecord with id {record_id} not found")
 
+        # not left to the foreign key, sqlite does not enforce it
+        await self.session.execute(
+            delete(ClassificationRecordPageORM).where(ClassificationRecordPageORM.record_id == record_id)
+        )
         await self.session.delete(db_obj)
         await self.session.commit()
 
     async def delete_by_book_id(self, book_id: str, owner_id: Optional[str] = None) -> None:
         await self._ensure_book_owned(book_id, owner_id)
+        await self.session.execute(
+            delete(ClassificationRecordPageORM).where(ClassificationRecordPageORM.book_scan_id == book_id)
+        )
         stmt = delete(ClassificationRecordORM).where(ClassificationRecordORM.book_scan_id == book_id)
         if owner_id is not None:
             stmt = stmt.where(
@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.dead_letter import DeadLetterORM
+from app.repos.job_queue import utcnow
+from app.schemas.queue import DeadLetterRead
+
+
+class DeadLetterRepository:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    async def add(
+        self, stage: str, worker: str, payload: Dict[str, Any], error: str, traceback: str, attempts: int
+    ) -> DeadLetterRead:
+        row = DeadLetterORM(
+            stage=stage,
+            worker=worker,
+            payload=payload,
+            error=error,
+            traceback=traceback,
+            attempts=attempts,
+            created_at=utcnow(),
+        )
+        self.s.add(row)
+        await self.s.commit()
+        return DeadLetterRead.model_validate(row)
+
+    async def get(self, dead_letter_id: str) -> Optional[DeadLetterRead]:
+        row = await self.s.get(DeadLetterORM, dead_letter_id)
+        return DeadLetterRead.model_validate(row) if row else None
+
+    async def list(
+        self, stage: Optional[str] = None, include_requeued: bool = False, limit: int = 100
+    ) -> List[DeadLetterRead]:
+        stmt = select(DeadLetterORM).order_by(DeadLetterORM.created_at.desc()).limit(limit)
+        if stage is not None:
+            stmt = stmt.where(DeadLetterORM.stage == stage)
+        if not include_requeued:
+            stmt = stmt.where(DeadLetterORM.requeued_at.is_(None))
+        rows = (await self.s.execute(stmt)).scalars().all()
+        return [DeadLetterRead.model_validate(r) for r in rows]
+
+    async def mark_requeued(self, dead_letter_id: str) -> Optional[DeadLetterRead]:
+        row = await self.s.get(DeadLetterORM, dead_letter_id)
+        if row is None:
+            return None
+        row.requeued_at = utcnow()
+        await self.s.commit()
+        return DeadLetterRead.model_validate(row)
+
+    async def delete(self, dead_letter_id: str) -> bool:
+        result = await self.s.execute(delete(DeadLetterORM).where(DeadLetterORM.id == dead_letter_id))
+        await self.s.commit()
+        return result.rowcount > 0
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job_queue import JobQueueAckORM, QueuedJobORM
+from app.schemas.queue import QueuedJobRead
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobQueueRepository:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    def _is_postgres(self) -> bool:
+        return self.s.get_bind().dialect.name == "postgresql"
+
+    async def enqueue(
+        self,
+        queue: str,
+        payload: Dict[str, Any],
+        priority: int = 1,
+        owner: Optional[str] = None,
+        notify_channel: Optional[str] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> int:
+        """
+        Insert a job that is immediately visible.
+        On Postgres, listeners of `notify_channel` are woken up once the insert commits.
+        """
+        now = utcnow()
+        row = QueuedJobORM(
+            queue=queue,
+            payload=payload,
+            priority=priority,
+            owner=owner,
+            turn=await self._next_turn(queue, priority, owner, now),
+            dedupe_key=dedupe_key,
+            enqueued_at=now,
+            visible_at=now,
+            attempts=0,
+        )
+        self.s.add(row)
+        await self.s.flush()
+        if notify_channel and self._is_postgres():
+            await self.s.execute(select(func.pg_notify(notify_channel, "")))
+        await self.s.commit()
+        return row.id
+
+    async def merge_pending(
+        self,
+        queue: str,
+        dedupe_key: str,
+        payload: Dict[str, Any],
+        priority: int,
+        merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+    ) -> Optional[int]:
+        """
+        Fold `payload` into a waiting job with the same `dedupe_key` and return its id,
+        or None if there is no such job. A job that is being claimed right now is locked
+        and skipped, so the duplicate is enqueued as new work instead.
+        The merged job keeps its place, or moves up to the higher of both priorities.
+        """
+        now = utcnow()
+        stmt = (
+            select(QueuedJobORM)
+            .where(
+                QueuedJobORM.queue == queue,
+                QueuedJobORM.dedupe_key == dedupe_key,
+                QueuedJobORM.visible_at <= now,
+            )
+            .order_by(QueuedJobORM.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        row = (await self.s.execute(stmt)).scalar_one_or_none()
+        if row is None:
+            await self.s.rollback()
+            return None
+
+        row.payload = merge(row.payload, payload)
+        if priority < row.priority:
+            row.turn = await self._next_turn(queue, priority, row.owner, now)
+            row.priority = priority
+        await self.s.commit()
+        return row.id
+
+    async def _next_turn(self, queue: str, priority: int, owner: Optional[str], now: datetime) -> int:
+        """
+        Round-robin position of a new job (start-time fair queuing).
+        An owner's jobs take consecutive turns, but never one earlier than the turn being served,
+        so a newcomer is scheduled right after the current round instead of behind a backlog.
+        """
+        same_class = (QueuedJobORM.queue == queue, QueuedJobORM.priority == priority)
+        owner_last = (
+            await self.s.execute(select(func.max(QueuedJobORM.turn)).where(*same_class, QueuedJobORM.owner == owner))
+        ).scalar_one_or_none()
+        current = (
+            await self.s.execute(select(func.min(QueuedJobORM.turn)).where(*same_class, QueuedJobORM.visible_at <= now))
+        ).scalar_one_or_none()
+        return max(owner_last + 1 if owner_last is not None else 0, current or 0)
+
+    async def claim(
+        self, queue: str, visibility_timeout: float, starvation_after: float = 60.0, serve_starved: bool = True
+    ) -> Optional[QueuedJobRead]:
+        """
+        Claim the next visible job of `queue` and hide it for `visibility_timeout` seconds.
+
+        Jobs are served by priority, and within a priority by their round-robin turn, so owners
+        take turns. With `serve_starved`, the oldest job enqueued more than `starvation_after`
+        seconds ago goes first, so bulk work keeps moving; the caller decides how often.
+        Rows locked by a concurrent claim are skipped (`FOR UPDATE SKIP LOCKED`), so any number
+        of consumers can claim from the same queue without handing out a job twice.
+        """
+        now = utcnow()
+        visible = (QueuedJobORM.queue == queue, QueuedJobORM.visible_at <= now)
+        row = None
+        if serve_starved:
+            cutoff = now - timedelta(seconds=starvation_after)
+            row = await self._first_unlocked(
+                select(QueuedJobORM).where(*visible, QueuedJobORM.enqueued_at <= cutoff).order_by(QueuedJobORM.id)
+            )
+        if row is None:
+            # plain columns in index order, so the planner can walk ix_job_queue_turn_order
+            row = await self._first_unlocked(
+                select(QueuedJobORM).where(*visible).order_by(QueuedJobORM.priority, QueuedJobORM.turn, QueuedJobORM.id)
+            )
+        if row is None:
+            await self.s.rollback()
+            return None
+
+        row.visible_at = now + timedelta(seconds=visibility_timeout)
+        row.attempts = row.attempts + 1
+        await self.s.commit()
+        return QueuedJobRead.model_validate(row)
+
+    async def _first_unlocked(self, stmt) -> Optional[QueuedJobORM]:
+        return (await self.s.execute(stmt.limit(1).with_for_update(skip_locked=True))).scalar_one_or_none()
+
+    async def ack(self, queue: str, job_id: int, window_s: float) -> None:
+        """
+        Delete a processed job and log the acknowledgement for `drain_rate()`.
+        Log entries older than `window_s` are pruned on the way.
+        """
+        now = utcnow()
+        result = await self.s.execute(delete(QueuedJobORM).where(QueuedJobORM.id == job_id))
+        # a job finished twice, after its visibility timeout expired, drains once
+        if result.rowcount:
+            self.s.add(JobQueueAckORM(queue=queue, acked_at=now))
+        await self.s.execute(
+            delete(JobQueueAckORM).where(
+                JobQueueAckORM.queue == queue, JobQueueAckORM.acked_at < now - timedelta(seconds=window_s)
+            )
+        )
+        await self.s.commit()
+
+    async def drain_rate(self, queue: str, window_s: float) -> float:
+        """Jobs of `queue` acknowledged per second over the last `window_s`, by all consumers."""
+        now = utcnow()
+        count, oldest = (
+            await self.s.execute(
+                select(func.count(JobQueueAckORM.id), func.min(JobQueueAckORM.acked_at)).where(
+                    JobQueueAckORM.queue == queue, JobQueueAckORM.acked_at >= now - timedelta(seconds=window_s)
+                )
+            )
+        ).one()
+        if not count:
+            return 0.0
+        # a young window is measured over its actual span, at least one second
+        return count / max(1.0, min(window_s, (now - oldest).total_seconds()))
+
+    async def release(self, job_id: int, delay: float = 0.0) -> None:
+        """Make a claimed job visible again after `delay` seconds."""
+        stmt = (
+            update(QueuedJobORM).where(QueuedJobORM.id == job_id).values(visible_at=utcnow() + timedelta(seconds=delay))
+        )
+        await self.s.execute(stmt)
+        await self.s.commit()
+
+    async def count_ready(self, queue: str) -> int:
+        stmt = select(func.count(QueuedJobORM.id)).where(
+            QueuedJobORM.queue == queue, QueuedJobORM.visible_at <= utcnow()
+        )
+        return (await self.s.execute(stmt)).scalar_one()
+
+    async def list_all(self, queue: str) -> List[QueuedJobRead]:
+        """Every job of `queue` in FIFO order, left in place."""
+        rows = (
+            (await self.s.execute(select(QueuedJobORM).where(QueuedJobORM.queue == queue).order_by(QueuedJobORM.id)))
+            .scalars()
+            .all()
+        )
+        return [QueuedJobRead.model_validate(row) for row in rows]
+
+    async def discard(self, job_id: int) -> None:
+        """Delete a job without counting it as processed."""
+        await self.s.execute(delete(QueuedJobORM).where(QueuedJobORM.id == job_id))
+        await self.s.commit()
@@ -0,0 +1,64 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import TypeAdapter
+
+from app.core.deps import get_current_active_admin, get_dead_letter_repo
+from app.models.user import User
+from app.repos.dead_letter import DeadLetterRepository
+from app.schemas.queue import DeadLetterRead
+from app.workflows.queues.queues import STAGE_ITEM_TYPES, QueueRegistry, enqueue, get_queue_registry
+
+router = APIRouter()
+
+
+@router.get("/dead_letters", response_model=List[DeadLetterRead])
+async def list_dead_letters(
+    stage: Optional[str] = None,
+    include_requeued: bool = False,
+    limit: int = Query(default=100, ge=1, le=1000),
+    dead_letter_repo: DeadLetterRepository = Depends(get_dead_letter_repo),
+    current_user: User = Depends(get_current_active_admin),
+):
+    return await dead_letter_repo.list(stage=stage, include_requeued=include_requeued, limit=limit)
+
+
+@router.get("/dead_letters/{dead_letter_id}", response_model=DeadLetterRead)
+async def get_dead_letter(
+    dead_letter_id: str,
+    dead_letter_repo: DeadLetterRepository = Depends(get_dead_letter_repo),
+    current_user: User = Depends(get_current_active_admin),
+):
+    dead_letter = await dead_letter_repo.get(dead_letter_id)
+    if not dead_letter:
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    return dead_letter
+
+
+@router.post("/dead_letters/{dead_letter_id}/requeue", response_model=DeadLetterRead)
+async def requeue_dead_letter(
+    dead_letter_id: str,
+    dead_letter_repo: DeadLetterRepository = Depends(get_dead_letter_repo),
+    queue_reqistry: QueueRegistry = Depends(get_queue_registry),
+    current_user: User = Depends(get_current_active_admin),
+):
+    dead_letter = await dead_letter_repo.get(dead_letter_id)
+    if not dead_letter:
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    if dead_letter.stage not in STAGE_ITEM_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown stage: {dead_letter.stage}")
+
+    item = TypeAdapter(STAGE_ITEM_TYPES[dead_letter.stage]).validate_python(dead_letter.payload)
+    await enqueue(getattr(queue_reqistry, dead_letter.stage), item)
+    return await dead_letter_repo.mark_requeued(dead_letter_id)
+
+
+@router.delete("/dead_letters/{dead_letter_id}")
+async def delete_dead_letter(
+    dead_letter_id: str,
+    dead_letter_repo: DeadLetterRepository = Depends(get_dead_letter_repo),
+    current_user: User = Depends(get_current_active_admin),
+):
+    if not await dead_letter_repo.delete(dead_letter_id):
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    return {"message": f"Dead letter {dead_letter_id} deleted"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.routes import auth, chat, embeddings, meal_plans, recipes, recipescanner, shopping_list, status, users
+from app.routes import admin, auth, chat, embeddings, meal_plans, recipes, recipescanner, shopping_list, status, users
 
 api_router = APIRouter()
 
@@ -12,5 +12,6 @@ api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(shopping_list.router, prefix="/shoppinglist", tags=["shoppinglist"])
 api_router.include_router(recipescanner.router, prefix="/recipescanner", tags=["recipescanner"])
 api_router.include_router(embeddings.router, prefix="/embeddings", tags=["embeddings"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 api_router.include_router(status.router, prefix="", tags=["ws"])
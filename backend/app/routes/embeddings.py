@@ -4,7 +4,9 @@ from app.core.deps import get_current_user, get_recipe_repo
 from app.models.user import User
 from app.repos.recipe import RecipeRepository
 from app.schemas.embeddings import EmbeddingJob
-from app.workflows.queues.queues import QueueRegistry, get_queue_registry
+from app.workflows.queues.admission import admit
+from app.workflows.queues.debounce import Debouncer, get_debouncer
+from app.workflows.queues.queues import Priority, QueueRegistry, enqueue, get_queue_registry
 
 router = APIRouter()
 
@@ -16,6 +18,7 @@ async def trigger_embedding(
     targets: list[str] | None = Query(default=None),
     current_user: User = Depends(get_current_user),
     queue_reqistry: QueueRegistry = Depends(get_queue_registry),
+    debouncer: Debouncer = Depends(get_debouncer),
 ):
     # Backward-compatible logic:
     if targets is None:
@@ -39,7 +42,8 @@ async def trigger_embedding(
         targets=parsed_targets,
     )
 
-    await queue_reqistry.emb.put(job)
+    # repeated triggers within the debounce window become one job
+    await debouncer.submit("emb", queue_reqistry.emb, job)
     return {"status": "queued", "recipe_id": recipe_id}
 
 
@@ -56,5 +60,6 @@ async def reindex_all(
         for recipe_id in all_recipes
     ]
 
+    await admit("emb", emb_queue, incoming=len(jobs))
     for job in jobs:
-        await emb_queue.put(job)
+        await enqueue(emb_queue, job, Priority.BULK)
@@ -1,8 +1,9 @@
 import logging
+from dataclasses import fields
 from math import inf
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile
 from sqlalchemy.exc import NoResultFound
 
 from app.core.deps import (
@@ -17,6 +18,9 @@ from app.core.deps import (
     get_thumbnail_service,
     get_validation_service,
 )
+from app.infra.document_pages import UnsupportedDocument
+from app.infra.ocr_cache import get_ocr_cache_stats
+from app.infra.ocr_fallback import get_ocr_backend_stats
 from app.models.user import User
 from app.schemas.ocr import (
     ApprovalBody,
@@ -25,15 +29,19 @@ from app.schemas.ocr import (
     ClassificationRecordRead,
     ClassificationRecordUpdate,
     GroupApproval,
+    OCRBackendStatus,
+    OCRCacheStatus,
     Page,
     PageScanRead,
     RecipeApproval,
     SegmentationApproval,
     TaxonomyApproval,
 )
+from app.schemas.queue import QueueStageStatus
 from app.services.image_ingest_service import ImageIngestService
 from app.workflows.classification.resume_graph_execution import resume_classification_graph
-from app.workflows.queues.queues import ClassificationJob, QueueRegistry, get_queue_registry
+from app.workflows.queues.admission import admit, stage_status
+from app.workflows.queues.queues import ClassificationJob, Priority, QueueRegistry, enqueue, get_queue_registry
 from app.workflows.segmentation.resume_graph_execution import approve_segments
 
 logger = logging.getLogger(__name__)
@@ -84,7 +92,7 @@ async def trigger_ocr(
 ):
     ocr_queue = queue_reqistry.ocr
     image: PageScanRead = await ensure_image_access(image_id, current_user.id, image_repo)
-    await ocr_queue.put(image)
+    await enqueue(ocr_queue, image, Priority.INTERACTIVE)
     return {"message": f"OCR triggered for {image_id}"}
 
 
@@ -98,7 +106,7 @@ async def trigger_seg(
 ):
     seg_queue = queue_reqistry.seg
     image: PageScanRead = await ensure_image_access(image_id, current_user.id, image_repo)
-    await seg_queue.put(image)
+    await enqueue(seg_queue, image, Priority.INTERACTIVE)
     return {"message": f"Segmentation triggered for {image_id}"}
 
 
@@ -140,28 +148,68 @@ async def trigger_classification(
         # rerun classification with only these pages
         cls_queue = queue_reqistry.cls
 
-        await cls_queue.put(ClassificationJob(pages=pagescans, owner_id=current_user.id))
+        await enqueue(cls_queue, ClassificationJob(pages=pagescans, owner_id=current_user.id), Priority.INTERACTIVE)
     except Exception as e:
         logger.info(e)
     return {"message": f"Re-classification triggered for {record_id}"}
 
 
-# Upload images to a scan
+# Upload images to a scan, PDFs and ZIP archives are split into their pages
 @router.post("/upload/{book_scan_id}", response_model=List[str])
 async def upload_pages(
     book_scan_id: str,
     files: list[UploadFile],
+    background_tasks: BackgroundTasks,
     image_service: ImageIngestService = Depends(get_image_ingest_service),
     book_repo=Depends(get_book_repo),
+    queue_reqistry: QueueRegistry = Depends(get_queue_registry),
     current_user: User = Depends(get_current_user),
 ):
     if not files:
         raise HTTPException(400, "No files uploaded")
     await ensure_book_access(book_scan_id, current_user.id, book_repo)
-    page_ids = await image_service.ingest_pages(book_scan_id, files, current_user.id)
+    # one page per file; documents are admitted again once their page count is known
+    await admit("ocr", queue_reqistry.ocr, incoming=len(files))
+    try:
+        # pages of PDFs and archives are extracted after the response, their ids are returned right away
+        page_ids = await image_service.ingest_pages(book_scan_id, files, current_user.id, background=background_tasks)
+    except UnsupportedDocument as e:
+        raise HTTPException(400, str(e)) from e
     return page_ids
 
 
+# Queue depths, so the frontend can throttle its uploads
+@router.get("/queues", response_model=List[QueueStageStatus])
+async def get_queue_status(
+    queue_reqistry: QueueRegistry = Depends(get_queue_registry),
+    current_user: User = Depends(get_current_user),
+):
+    stages = [(f.name, getattr(queue_reqistry, f.name)) for f in fields(queue_reqistry)]
+    return [await stage_status(stage, queue) for stage, queue in stages if queue is not None]
+
+
+# OCR calls saved by the content-hash cache
+@router.get("/ocr_cache", response_model=List[OCRCacheStatus])
+async def get_ocr_cache_status(current_user: User = Depends(get_current_user)):
+    """
+    Hits and misses of the OCR cache per cached backend since this API process started, counted by the OCR workers
+    running inside it. OCR workers of `python -m app.worker` keep their own counts and are not included,
+    so with `API_WORKER_STAGES` without "ocr" the list stays empty.
+    """
+    return get_ocr_cache_stats()
+
+
+# latency, errors and circuit state of each OCR backend
+@router.get("/ocr_backends", response_model=List[OCRBackendStatus])
+async def get_ocr_backend_status(current_user: User = Depends(get_current_user)):
+    """
+    Calls, latency and circuit breaker state of the OCR backends used by the OCR workers of this
+    API process. Every process has its own breakers; those of `python -m app.worker` are not shown,
+    so with `API_WORKER_STAGES` without "ocr" the list is empty.
+    """
+    return get_ocr_backend_stats()
+
+
 # change page number, page should be deleted before changing
 @router.post("/update_page_number/{page_id}")
 async def update_page_number(
@@ -275,7 +323,9 @@ async def classify_complete_book_scan(
     await ensure_book_access(book_scan_id, current_user.id, book_repo)
     pages = await image_repo.list_by_book(book_scan_id, current_user.id)
     classification_queue = queue_reqistry.cls
-    await classification_queue.put(ClassificationJob(pages=pages, owner_id=current_user.id))
+    await admit("cls", classification_queue)
+    # whole-book runs are bulk work, single records re-triggered by the user go first
+    await enqueue(classification_queue, ClassificationJob(pages=pages, owner_id=current_user.id), Priority.BULK)
     return {"message": f"Classification triggered for {book_scan_id}"}
 
 
@@ -351,13 +401,17 @@ async def delete_record(
 @router.get("/ocr_data/{image_id}")
 async def get_ocr_data(
     image_id: str,
+    geometry: bool = False,
     storage=Depends(get_storage),
     image_repo=Depends(get_image_repo),
     book_repo=Depends(get_book_repo),
     current_user: User = Depends(get_current_user),
 ):
     await ensure_image_access(image_id, current_user.id, image_repo)
-    return await storage.read_json(image_id)
+    # the segment editor only draws the block boxes
+    if geometry:
+        return await storage.read_ocr_geometry(image_id)
+    return await storage.read_ocr(image_id)
 
 
 @router.get("/classification_records/{record_id}", response_model=ClassificationRecordRead)
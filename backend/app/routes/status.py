@@ -1,7 +1,10 @@
 import asyncio
 import logging
+from typing import Any, Callable, Optional
 
+import psycopg
 from fastapi import APIRouter
+from sqlalchemy import func, select
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
 from app.schemas.ocr import GraphBroadCast, PageStatus
@@ -10,6 +13,11 @@ router = APIRouter()
 
 active_clients: set[WebSocket] = set()
 
+# broadcasts of standalone workers (`python -m app.worker`) reach the API processes through this channel
+STATUS_CHANNEL = "status_broadcast"
+# set in processes without websockets, see `relay_status()`
+_relay_session_maker: Optional[Callable[[], Any]] = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,8 +48,47 @@ async def status_ws(ws: WebSocket):
 
 async def broadcast_status(message: GraphBroadCast):
     data = message.model_dump_json()
+    if _relay_session_maker is not None:
+        await _notify(data)
+        return
+    await _send(data)
+
+
+async def _send(data: str):
     for ws in list(active_clients):  # copy to avoid mutation issues
         try:
             await ws.send_text(data)
         except RuntimeError:
             active_clients.discard(ws)
+
+
+def relay_status(session_maker: Optional[Callable[[], Any]]) -> None:
+    """Send the broadcasts of this process as Postgres NOTIFY on `STATUS_CHANNEL` (None: to local websockets)."""
+    global _relay_session_maker
+    _relay_session_maker = session_maker
+
+
+async def _notify(data: str):
+    try:
+        async with _relay_session_maker() as session:
+            await session.execute(select(func.pg_notify(STATUS_CHANNEL, data)))
+            await session.commit()
+    except Exception as e:
+        # a missed update only delays the UI until its next refresh
+        logger.warning(f"Failed to relay status broadcast: {e}")
+
+
+async def listen_for_relayed_status(dsn: str, retry_s: float = 5.0):
+    """Forward broadcasts relayed by standalone workers to the websockets of this process, until cancelled."""
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+                await conn.execute(f'LISTEN "{STATUS_CHANNEL}"')
+                logger.info(f"Listening for worker status on {STATUS_CHANNEL}")
+                async for notify in conn.notifies():
+                    await _send(notify.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{STATUS_CHANNEL} listener failed, reconnecting: {e}")
+            await asyncio.sleep(retry_s)
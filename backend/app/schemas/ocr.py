@@ -34,17 +34,42 @@ class OCRResult(BaseModel):
     blocks: List[Dict[str, Any]]
 
 
+class OCRCacheStatus(BaseModel):
+    # backend and configuration of the cached results
+    backend: Optional[str] = None
+    # every hit is an OCR call that was not made
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class OCRBackendStatus(BaseModel):
+    name: str
+    # circuit breaker: closed, open or half_open
+    state: str
+    calls: int
+    failures: int
+    timeouts: int
+    # calls skipped while the circuit was open
+    short_circuits: int
+    error_rate: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+
+
 class SegmentationSegment(BaseModel):
     id: int
     title: str
     bounding_boxes: List[List[Dict[str, int]]]
     associated_ocr_blocks: List[int]
+    confidence: Optional[float] = None
 
 
 # not used for database
 class SegmentationResult(BaseModel):
     segmentation_done: bool = False  # means we always take the entire page
     page_segments: Optional[list[SegmentationSegment]] = None  # we will only use this field in the database
+    confidence: Optional[float] = None  # lowest segment confidence, decides on automatic approval
 
 
 class SegmentationApproval(BaseModel):
@@ -221,6 +246,9 @@ class ClassificationGraphState(BaseModel):
     taxonomy_user_approved: Optional[dict] = None
     # taxonomy_error: Optional[str]= None
 
+    # why a record of the unattended mode was handed to the user, who then reviews every step
+    review_reason: Optional[str] = None
+
 
 class ClassificationGraphPatch(TypedDict, total=False):
     # assigned on create
@@ -242,6 +270,8 @@ class ClassificationGraphPatch(TypedDict, total=False):
 
     taxonomy_user_approved: Optional[dict]
 
+    review_reason: Optional[str]
+
 
 class BookScanCreate(BaseModel):
     title: str
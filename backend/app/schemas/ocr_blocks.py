@@ -0,0 +1,22 @@
+"""Readers for the raw OCR blocks stored in `OCRResult.blocks` (Google Vision or Tesseract layout)."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def block_words(block: Dict[str, Any]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """(text, bounding box) of the words of a Google Vision or Tesseract block, in order."""
+    if "paragraphs" in block:
+        return [
+            ("".join(s.get("text", "") for s in word.get("symbols", [])), word.get("boundingBox"))
+            for paragraph in block["paragraphs"]
+            for word in paragraph.get("words", [])
+        ]
+    return [
+        (word.get("text", ""), word.get("boundingBox")) for line in block.get("lines", []) for word in line["words"]
+    ]
+
+
+def block_text(block: Dict[str, Any]) -> str:
+    if block.get("text"):
+        return block["text"]
+    return " ".join(text for text, _ in block_words(block))
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class QueuedJobRead(BaseModel):
+    id: int
+    queue: str
+    payload: Dict[str, Any]
+    priority: int = 1
+    owner: Optional[str] = None
+    turn: int = 0
+    dedupe_key: Optional[str] = None
+    enqueued_at: datetime
+    visible_at: datetime
+    attempts: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class QueueStageStatus(BaseModel):
+    stage: str
+    depth: int
+    high_water: int
+    saturated: bool
+    drain_rate_per_s: float
+    # queue wait per priority class, as seen by this process
+    wait_by_priority: Dict[str, Dict[str, float]] = {}
+
+
+class DeadLetterRead(BaseModel):
+    id: str
+    stage: str
+    worker: str
+    payload: Dict[str, Any]
+    error: str
+    traceback: str
+    attempts: int
+    created_at: datetime
+    requeued_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
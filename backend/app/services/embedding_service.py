@@ -1,3 +1,6 @@
+import asyncio
+from typing import Sequence, Tuple
+
 from app.models.recipe import Recipe
 from app.ports.chunker import IChunker
 from app.ports.embedding_store import IEmbeddingStore, RecipeDocs
@@ -60,8 +63,36 @@ class EmbeddingService:
         recipe_doc_chunks = await self._build_docs(recipe_id, user_id)
         if not recipe_doc_chunks:
             return 0
+        # stores are synchronous and embed while adding, keep them off the event loop
         if reindex:
-            store.delete(recipe_doc_chunks.ids)
+            await asyncio.to_thread(store.delete, recipe_doc_chunks.ids)
 
-        store.add(recipe_doc_chunks)
+        await asyncio.to_thread(store.add, recipe_doc_chunks)
         return len(recipe_doc_chunks.texts)
+
+    async def index_many(self, store: IEmbeddingStore, recipes: Sequence[Tuple[str, str, bool]]) -> int:
+        """Index several (recipe_id, user_id, reindex) at once: one delete and one add, so one encode call.
+        Returns the number of chunks stored.
+        """
+        # a recipe listed twice is indexed once, its chunk ids must be unique within one add
+        unique: dict[str, Tuple[str, bool]] = {}
+        for recipe_id, user_id, reindex in recipes:
+            unique[recipe_id] = (user_id, reindex or unique.get(recipe_id, (user_id, False))[1])
+
+        batch = RecipeDocs([], [], [])
+        stale: list[str] = []
+        for recipe_id, (user_id, reindex) in unique.items():
+            docs = await self._build_docs(recipe_id, user_id)
+            if not docs:
+                continue
+            if reindex:
+                stale.extend(docs.ids)
+            for text, meta, doc_id in zip(*docs.as_args()):
+                batch.add(text, meta, doc_id)
+        if not batch.ids:
+            return 0
+        if stale:
+            await asyncio.to_thread(store.delete, stale)
+
+        await asyncio.to_thread(store.add, batch)
+        return len(batch.texts)
@@ -1,11 +1,25 @@
 import asyncio
+import logging
+import os
+import uuid
+from collections import deque
+from contextlib import aclosing, suppress
 from datetime import datetime
+from typing import AsyncIterator, Deque, Optional, Tuple
 
-from fastapi import UploadFile
+from fastapi import BackgroundTasks, UploadFile
+from sqlalchemy.exc import NoResultFound
 
+from app.core.config import get_settings
+from app.infra.document_pages import PageRef, UnsupportedDocument, document_kind, extract_page, list_pages
+from app.infra.process_pool import pool_size, run_cpu
 from app.ports.storage import StorageService
 from app.repos.image_repo import ImageRepository
 from app.schemas.ocr import PageScanCreate, PageScanRead, PageScanUpdate
+from app.workflows.queues.admission import admit
+from app.workflows.queues.queues import Priority, WorkQueue, enqueue
+
+logger = logging.getLogger(__name__)
 
 
 class ImageIngestService:
@@ -13,24 +27,137 @@ class ImageIngestService:
         self,
         storage: StorageService,
         image_repo: ImageRepository,
-        queue: asyncio.Queue[PageScanRead],
+        queue: WorkQueue[PageScanRead],
     ):
         self.storage = storage
         self.image_repo = image_repo
         self.queue = queue
 
-    async def ingest_pages(self, scan_id: str, files: list[UploadFile], owner_id: str) -> list[str]:
+    async def ingest_pages(
+        self, scan_id: str, files: list[UploadFile], owner_id: str, background: Optional[BackgroundTasks] = None
+    ) -> list[str]:
         page_ids = []
         for file in files:
+            kind = document_kind(file.filename, file.content_type)
+            if kind is not None:
+                page_ids.extend(await self.ingest_document(scan_id, file, kind, owner_id, background))
+                continue
             tmp_filename = f"tmp-{datetime.now().timestamp():.0f}.jpg"
             tmp = await self.storage.save_image(file, tmp_filename, "scanner")
-            image_row = await self.image_repo.save(PageScanCreate(filename=tmp, bookScanID=scan_id), owner_id)
-            final_name = f"{image_row.id}.jpg"
+            page_ids.append(await self._add_page(scan_id, tmp, owner_id))
+        return page_ids
 
-            await self.storage.rename(tmp, final_name, "scanner")
+    async def ingest_document(
+        self, scan_id: str, file: UploadFile, kind: str, owner_id: str, background: Optional[BackgroundTasks] = None
+    ) -> list[str]:
+        """
+        Split a PDF or ZIP upload into pages. The upload is streamed to disk and a page row is created
+        for every page, in document order. The pages are then extracted in the CPU pool, after the
+        response if `background` is given, and each one is queued for OCR as soon as it is ready.
+        """
+        upload = await self.storage.save_image(file, f"upload-{uuid.uuid4().hex}.{kind}", "scanner")
+        pages: list[PageScanRead] = []
+        try:
+            refs = await run_cpu(list_pages, upload, kind)
+            max_pages = get_settings().INGEST_MAX_PAGES
+            if len(refs) > max_pages:
+                raise UnsupportedDocument(f"{file.filename} has {len(refs)} pages, at most {max_pages} are accepted")
+            # the route admitted one page per file
+            await admit("ocr", self.queue, incoming=len(refs))
+            batch = uuid.uuid4().hex
+            for i in range(len(refs)):
+                pages.append(
+                    await self.image_repo.save(
+                        PageScanCreate(filename=f"tmp-{batch}-{i}.jpg", bookScanID=scan_id), owner_id
+                    )
+                )
+        except BaseException:
+            await self._discard(pages, owner_id)
+            await self.storage.delete(os.path.basename(upload), "scanner")
+            raise
+        logger.info(f"Ingesting {len(refs)} page(s) from {file.filename}")
 
-            dto = await self.image_repo.update(PageScanUpdate(id=image_row.id, filename=final_name), owner_id)
+        if background is None:
+            await self._extract_document(upload, kind, list(zip(refs, pages)), owner_id)
+        else:
+            background.add_task(self._extract_document, upload, kind, list(zip(refs, pages)), owner_id)
+        return [page.id for page in pages]
 
-            await self.queue.put(dto)
-            page_ids.append(image_row.id)
-        return page_ids
+    async def _extract_document(
+        self, upload: str, kind: str, pages: list[Tuple[PageRef, PageScanRead]], owner_id: str
+    ) -> None:
+        """Extract and queue the pages of a stored upload; pages that cannot be read are dropped."""
+        unfinished = {page.id: page for _, page in pages}
+        try:
+            # closed right away on errors, so the pages still in the pool are cleaned up before the upload
+            async with aclosing(self._extracted_pages(upload, kind, pages)) as extracted:
+                async for page, tmp in extracted:
+                    if tmp is not None:
+                        await self._finish_page(page, tmp, owner_id)
+                    else:
+                        await self.image_repo.delete(page.id, owner_id)
+                    unfinished.pop(page.id)
+        finally:
+            await self._discard(list(unfinished.values()), owner_id)
+            await self.storage.delete(os.path.basename(upload), "scanner")
+
+    async def _extracted_pages(
+        self, upload: str, kind: str, pages: list[Tuple[PageRef, PageScanRead]]
+    ) -> AsyncIterator[Tuple[PageScanRead, Optional[str]]]:
+        """
+        Pages with the path of their extracted image, None for a page that could not be read.
+        Pages are extracted in parallel, a few ahead, but handed out in document order.
+        """
+        dpi = get_settings().INGEST_PDF_DPI
+        window = max(1, pool_size())
+        pending: Deque[Tuple[PageScanRead, str, asyncio.Future]] = deque()
+        try:
+            for ref, page in pages:
+                out_path = await self.storage.get_image_path(os.path.splitext(page.filename)[0], "scanner")
+                pending.append(
+                    (page, out_path, asyncio.ensure_future(run_cpu(extract_page, upload, kind, ref, out_path, dpi)))
+                )
+                if len(pending) >= window:
+                    yield await self._next_extracted(pending)
+            while pending:
+                yield await self._next_extracted(pending)
+        finally:
+            # a page already in the pool cannot be stopped, let it finish and drop what it wrote
+            await asyncio.gather(*(future for _, _, future in pending), return_exceptions=True)
+            for _, out_path, _ in pending:
+                await self.storage.delete(os.path.basename(out_path), "scanner")
+
+    async def _next_extracted(
+        self, pending: Deque[Tuple[PageScanRead, str, asyncio.Future]]
+    ) -> Tuple[PageScanRead, Optional[str]]:
+        # the page leaves `pending` only once it is done, so an interrupted wait still cleans it up
+        page, out_path, future = pending[0]
+        try:
+            await future
+        except Exception as e:
+            logger.warning(f"Skipping unreadable page {page.page_number} of book scan {page.bookScanID}: {e}")
+            await self.storage.delete(os.path.basename(out_path), "scanner")
+            out_path = None
+        pending.popleft()
+        return page, out_path
+
+    async def _add_page(self, scan_id: str, tmp: str, owner_id: str) -> str:
+        image_row = await self.image_repo.save(PageScanCreate(filename=tmp, bookScanID=scan_id), owner_id)
+        await self._finish_page(image_row, tmp, owner_id)
+        return image_row.id
+
+    async def _finish_page(self, image_row: PageScanRead, tmp: str, owner_id: str) -> None:
+        final_name = f"{image_row.id}.jpg"
+
+        await self.storage.rename(tmp, final_name, "scanner")
+
+        dto = await self.image_repo.update(PageScanUpdate(id=image_row.id, filename=final_name), owner_id)
+
+        await enqueue(self.queue, dto, Priority.BULK)
+
+    async def _discard(self, pages: list[PageScanRead], owner_id: str) -> None:
+        """Remove pages that were not queued, with an image that was already renamed."""
+        for page in pages:
+            with suppress(NoResultFound):
+                await self.image_repo.delete(page.id, owner_id)
+            await self.storage.delete(f"{page.id}.jpg", "scanner")
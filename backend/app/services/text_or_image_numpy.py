@@ -0,0 +1,93 @@
+import logging
+import math
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from app.ports.ocr import TextOrImageService
+
+logger = logging.getLogger(__name__)
+
+# features are measured on the page shrunk to this longest side
+ANALYSIS_SIDE = 512
+# line spacing searched in the row profile, in pixels of the shrunk page
+MIN_LINE_PERIOD, MAX_LINE_PERIOD = 4, 40
+# logistic model over the features, tuned on book scans and food photos
+BIAS = -4.0
+WEIGHTS = {"paper": 6.0, "edges": 15.0, "lines": 20.0, "ink": -4.0}
+
+
+@dataclass(frozen=True)
+class PageClassification:
+    is_text: bool
+    # probability of the chosen class, 0.5 means a coin flip
+    confidence: float
+    features: Dict[str, float]
+
+
+def page_features(gray: np.ndarray) -> Dict[str, float]:
+    """
+    Vectorized features of a grayscale page scaled to [0, 1]:
+
+    - paper: share of pixels close to the paper tone, text pages are mostly blank paper
+    - ink: share of pixels clearly darker than the paper, photos are dark almost everywhere
+    - edges: share of sharp horizontal and vertical steps, glyph strokes produce many
+    - lines: strength of the strongest line-spacing frequency in the row profile of the ink
+    """
+    paper_tone = float(np.percentile(gray, 90))
+    ink = gray < paper_tone - 0.25
+    paper = float((np.abs(gray - paper_tone) < 0.08).mean())
+    edges = float((np.abs(np.diff(gray, axis=1)) > 0.2).mean() + (np.abs(np.diff(gray, axis=0)) > 0.2).mean())
+
+    profile = ink.sum(axis=1).astype(np.float64)
+    profile -= profile.mean()
+    spectrum = np.abs(np.fft.rfft(profile)) ** 2
+    freqs = np.fft.rfftfreq(len(profile))
+    band = (freqs >= 1 / MAX_LINE_PERIOD) & (freqs <= 1 / MIN_LINE_PERIOD)
+    total = spectrum[1:].sum()
+    lines = float(spectrum[band].max() / total) if band.any() and total > 0 else 0.0
+
+    return {"paper": paper, "ink": float(ink.mean()), "edges": edges, "lines": lines}
+
+
+def text_probability(features: Dict[str, float]) -> float:
+    z = BIAS + sum(WEIGHTS[name] * features[name] for name in WEIGHTS)
+    return 1 / (1 + math.exp(-z))
+
+
+class TextOrImageNumpy(TextOrImageService):
+    """
+    Deterministic text-vs-photo classifier on a downsampled grayscale page.
+    A page is sent to OCR when its text probability reaches `threshold`; the default is below
+    0.5 because skipping a text page loses a recipe, while OCR of a photo only costs time.
+    """
+
+    def __init__(self, threshold: float = 0.35):
+        self.threshold = threshold
+
+    def is_text_page(self, filename: str) -> bool:
+        return self.classify(filename).is_text
+
+    def classify(self, filename: str) -> PageClassification:
+        try:
+            with Image.open(filename) as img:
+                # JPEG decodes straight at a reduced scale
+                img.draft("L", (ANALYSIS_SIDE, ANALYSIS_SIDE))
+                page = img.convert("L")
+        except (UnidentifiedImageError, OSError) as e:
+            logger.warning(f"Cannot classify {filename}, treating it as text: {e}")
+            return PageClassification(is_text=True, confidence=0.0, features={})
+
+        page.thumbnail((ANALYSIS_SIDE, ANALYSIS_SIDE))
+        features = page_features(np.asarray(page, dtype=np.float32) / 255)
+        probability = text_probability(features)
+        is_text = probability >= self.threshold
+        result = PageClassification(
+            is_text=is_text,
+            confidence=round(probability if is_text else 1 - probability, 3),
+            features={name: round(value, 4) for name, value in features.items()},
+        )
+        logger.debug(f"{filename}: text={result.is_text} confidence={result.confidence} {result.features}")
+        return result
@@ -0,0 +1,108 @@
+"""
+Standalone pipeline worker.
+
+Runs the workers of the selected stages out of the API process, against the shared postgres queues:
+
+    python -m app.worker --stages ocr,embed
+
+Start the API with `API_WORKER_STAGES=none` (or without the stages served here) so it only enqueues.
+Status updates of the workers reach the UI through Postgres NOTIFY, relayed by the API.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+from typing import List, Optional
+
+from app.core.config import get_settings
+from app.database import init_db as dbmod
+from app.database.init_langgraph_db import setup_scanner_checkpoints
+from app.infra.process_pool import shutdown_process_pool
+from app.infra.storage_local import LocalStorageService
+from app.routes.status import relay_status
+from app.workflows.pipeline import STAGES, build_workers, drain_workers, parse_stages
+from app.workflows.queues.queues import get_queue_registry
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Run pipeline workers")
+    parser.add_argument(
+        "--stages",
+        default="all",
+        help=f"comma separated stages to run, of {', '.join(STAGES)} (or 'all'); 'embed' is an alias of 'emb'",
+    )
+    return parser.parse_args(argv)
+
+
+async def run(stages: List[str]) -> None:
+    settings = get_settings()
+    if settings.QUEUE_BACKEND.lower() != "postgres":
+        raise SystemExit("The worker process needs QUEUE_BACKEND=postgres, in-memory queues are not shared.")
+    if not stages:
+        raise SystemExit("No stages selected.")
+    if settings.LOCAL_STORAGE_PATH == "":
+        raise SystemExit("Define a storage location in you env file.")
+
+    logger.info(f"Starting worker for stages {', '.join(stages)} with database {settings.async_db_url}")
+    await dbmod.initialize_database()
+
+    # the graphs resume reviews started or approved in the API, so they need the shared checkpoints
+    prune_checkpoints = await setup_scanner_checkpoints() if {"seg", "cls"} & set(stages) else None
+
+    # no websockets here, the API processes pass the updates on to the UI
+    relay_status(dbmod.SessionMaker)
+
+    queues = get_queue_registry()
+    workers = build_workers(
+        stages,
+        queues=queues,
+        storage=LocalStorageService(base_path=settings.LOCAL_STORAGE_PATH),
+        session_maker=dbmod.SessionMaker,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker_tasks = [asyncio.create_task(worker.run(), name=stage) for stage, worker in workers.items()]
+    stopped = asyncio.create_task(stop.wait(), name="stop")
+    try:
+        # a worker task only ends if it crashed, then stop the whole process so it gets restarted
+        done, _ = await asyncio.wait(
+            [*worker_tasks, stopped],
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        for task in done:
+            if task in worker_tasks and not task.cancelled() and task.exception():
+                logger.error(f"Worker {task.get_name()} crashed", exc_info=task.exception())
+    finally:
+        logger.info("Shutting down workers...")
+        stopped.cancel()
+        # unfinished jobs are released, so another worker picks them up right away
+        await drain_workers(workers, worker_tasks, settings.WORKER_DRAIN_TIMEOUT_S)
+        if prune_checkpoints:
+            prune_checkpoints.cancel()
+        await queues.close()
+        await shutdown_process_pool()
+        await dbmod.async_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    try:
+        stages = parse_stages(args.stages)
+    except ValueError as e:
+        raise SystemExit(str(e)) from None
+    asyncio.run(run(stages))
+
+
+if __name__ == "__main__":
+    main()
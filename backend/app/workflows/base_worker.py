@@ -2,7 +2,11 @@ import asyncio
 import logging
 from abc import ABC, abstractmethod
 from contextlib import suppress
-from typing import Generic, Optional, TypeVar
+from typing import Dict, Generic, List, Optional, TypeVar
+
+from app.workflows.queues.dead_letters import DeadLetterStore
+from app.workflows.queues.queues import AcknowledgingQueue, PrioritizedQueue, WorkQueue
+from app.workflows.retry import NO_RETRY, RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -10,40 +14,278 @@ T = TypeVar("T")
 
 
 class BaseWorker(ABC, Generic[T]):  # pragma: no cover
-    def __init__(self, entry_queue: asyncio.Queue[T], worker_name: Optional[str] = None):
+    """
+    Pulls items from `entry_queue` and runs `handle()` on them.
+
+    Up to `concurrency` items are handled at the same time. Every item is
+    acknowledged with `task_done()` exactly once, whether it succeeded, failed or
+    was cancelled during shutdown. Durable queues additionally get an `ack()` for
+    items that were handled; cancelled items stay in the queue and are retried, and
+    items that are neither acknowledged nor handed back are `abandon()`ed.
+
+    Failures listed in `retry_policy` are retried with backoff. An item that
+    fails for good is stored in `dead_letters` under `stage` and passed to
+    `on_dead_letter()`.
+
+    With `batch_size > 1` the worker takes up to `batch_size` items, waiting at most
+    `batch_wait_ms` for the batch to fill, and passes them to `handle_batch()`; `concurrency`
+    then counts batches. Items the batch reports as failed, or all items of a batch that
+    raised, go through `handle()` one by one with the usual retries, so one bad item
+    cannot fail its neighbours. `task_done()` and `ack()` stay per item.
+
+    `shutdown()` drains the worker: it stops taking items, gives in-flight work a grace
+    period to finish and hands whatever did not finish back to the queue.
+    """
+
+    def __init__(
+        self,
+        entry_queue: WorkQueue[T],
+        worker_name: Optional[str] = None,
+        concurrency: int = 1,
+        stage: Optional[str] = None,
+        retry_policy: RetryPolicy = NO_RETRY,
+        dead_letters: Optional[DeadLetterStore] = None,
+        batch_size: int = 1,
+        batch_wait_ms: float = 0.0,
+    ):
         self.entry_queue = entry_queue
         self._hb: Optional[asyncio.Task] = None
         self.worker_name = worker_name or self.__class__.__name__
+        self.concurrency = max(1, concurrency)
+        self.stage = stage or self.worker_name
+        self.retry_policy = retry_policy
+        self.dead_letters = dead_letters
+        self.batch_size = max(1, batch_size)
+        self.batch_wait_ms = max(0.0, batch_wait_ms)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._draining = False
+        self._grace_s = 0.0
 
     async def _heartbeat(self):
         try:
             while True:
                 await asyncio.sleep(2)
-                logger.debug(f"{self.worker_name} - heartbeat: qsize={self.entry_queue.qsize()}")
+                logger.debug(
+                    f"{self.worker_name} - heartbeat: qsize={self.entry_queue.qsize()} "
+                    f"in_flight={len(self._in_flight)}/{self.concurrency}"
+                )
+                if isinstance(self.entry_queue, PrioritizedQueue):
+                    logger.debug(
+                        f"{self.worker_name} - queue wait by priority: {self.entry_queue.wait_stats.snapshot()}"
+                    )
         except asyncio.CancelledError:
             logger.info(f"{self.worker_name} - heartbeat cancelled")
 
     async def run(self):
         self._hb = asyncio.create_task(self._heartbeat())
-        logger.info(f"{self.worker_name} - Starting run loop")
+        self._slots = asyncio.Semaphore(self.concurrency)
+        logger.info(
+            f"{self.worker_name} - Starting run loop with concurrency {self.concurrency}, batch size {self.batch_size}"
+        )
         try:
             while True:
+                # only take an item from the queue once a handler slot is free
+                await self._slots.acquire()
                 logger.info(f"{self.worker_name} - Waiting for next task")
-                task = await self.entry_queue.get()
-                try:
-                    await self.handle(task)
-                except Exception as e:
-                    logger.exception(f"{self.worker_name} - Failed to process task: {e}")
-                finally:
-                    self.entry_queue.task_done()
+                if self.batch_size > 1:
+                    batch = await self._get_batch()
+                    handler = asyncio.create_task(self._process_batch(batch), name=f"{self.worker_name}-batch")
+                else:
+                    try:
+                        task = await self.entry_queue.get()
+                    except BaseException:
+                        self._slots.release()
+                        raise
+                    handler = asyncio.create_task(self._process(task), name=f"{self.worker_name}-handler")
+                self._in_flight.add(handler)
+                handler.add_done_callback(self._in_flight.discard)
         except asyncio.CancelledError:
             logger.info(f"{self.worker_name} - Shutdown signal received")
             raise
         finally:
+            in_flight = set(self._in_flight)
+            if in_flight and self._draining and self._grace_s > 0:
+                logger.info(f"{self.worker_name} - Draining {len(in_flight)} in-flight task(s) for {self._grace_s}s")
+                _, in_flight = await asyncio.wait(in_flight, timeout=self._grace_s)
+            for handler in in_flight:
+                handler.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
             if self._hb:
                 self._hb.cancel()
                 with suppress(asyncio.CancelledError):
                     await self._hb
 
+    async def shutdown(self, runner: asyncio.Task, grace_s: float = 0.0) -> None:
+        """
+        Drain the worker running as `runner`: stop taking items, wait up to `grace_s` for
+        in-flight items, then cancel the rest and return them to the queue.
+        """
+        self._draining = True
+        self._grace_s = grace_s
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+
+    async def _process(self, task: T):
+        settled = False
+        try:
+            if await self._handle_with_retries(task):
+                await self._ack(task)
+                settled = True
+        except asyncio.CancelledError:
+            if self._draining:
+                await self._return(task)
+                settled = True
+            raise
+        finally:
+            if not settled:
+                self._abandon(task)
+            self._task_done(task)
+            self._slots.release()
+
+    async def _get_batch(self) -> List[T]:
+        """Wait for one item, then collect more until the batch is full or `batch_wait_ms` passed."""
+        batch: List[T] = []
+        try:
+            batch.append(await self.entry_queue.get())
+            deadline = asyncio.get_running_loop().time() + self.batch_wait_ms / 1000
+            while len(batch) < self.batch_size:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.entry_queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+        except BaseException:
+            # items taken so far are handed back through the normal accounting
+            for item in batch:
+                if self._draining:
+                    await self._return(item)
+                else:
+                    self._abandon(item)
+                self._task_done(item)
+            self._slots.release()
+            raise
+        return batch
+
+    async def _process_batch(self, batch: List[T]):
+        # items before this index are finished
+        done = 0
+        settled: set[int] = set()
+        try:
+            try:
+                failures = await self.handle_batch(batch) or {}
+            except Exception as e:
+                logger.warning(f"{self.worker_name} - Batch of {len(batch)} failed, handling items one by one: {e}")
+                failures = {i: None for i in range(len(batch))}
+            for i, item in enumerate(batch):
+                if i not in failures or await self._handle_with_retries(item, failures[i]):
+                    await self._ack(item)
+                    settled.add(i)
+                done = i + 1
+        except asyncio.CancelledError:
+            if self._draining:
+                for i in range(done, len(batch)):
+                    await self._return(batch[i])
+                    settled.add(i)
+            raise
+        finally:
+            for i, item in enumerate(batch):
+                if i not in settled:
+                    self._abandon(item)
+                self._task_done(item)
+            self._slots.release()
+
+    async def _handle_with_retries(self, task: T, error: Optional[Exception] = None) -> bool:
+        """
+        Run `handle()` until it succeeds or gives up; False if the item must stay in a durable queue.
+        `error` is the failure of a first attempt made elsewhere, by `handle_batch()`.
+        """
+        attempt = 1
+        while True:
+            if error is None:
+                try:
+                    await self.handle(task)
+                    return True
+                except Exception as e:
+                    error = e
+            if not self.retry_policy.should_retry(error, attempt):
+                logger.error(
+                    f"{self.worker_name} - Failed to process task after {attempt} attempt(s): {error}",
+                    exc_info=error,
+                )
+                return await self._dead_letter(task, error, attempt)
+            delay = self.retry_policy.delay(attempt)
+            logger.warning(f"{self.worker_name} - Attempt {attempt} failed, retrying in {delay:.1f}s: {error}")
+            await asyncio.sleep(delay)
+            attempt += 1
+            error = None
+
+    async def _dead_letter(self, task: T, exc: Exception, attempts: int) -> bool:
+        try:
+            if self.dead_letters is not None:
+                await self.dead_letters.record(self.stage, self.worker_name, task, exc, attempts)
+        except Exception as e:
+            # a durable queue hands the item out again once its visibility timeout expires
+            logger.exception(f"{self.worker_name} - Failed to store dead letter: {e}")
+            return False
+        try:
+            await self.on_dead_letter(task, exc)
+        except Exception as e:
+            logger.exception(f"{self.worker_name} - Dead letter hook failed: {e}")
+        return True
+
+    async def on_dead_letter(self, item: T, exc: Exception):
+        """Called once an item has failed for good, e.g. to flag the affected page."""
+
+    async def _return(self, task: T):
+        """Give an unfinished item back so it survives the shutdown."""
+        try:
+            release = getattr(self.entry_queue, "release", None)
+            if release is not None:
+                # durable queues make it visible again right away
+                await release(task)
+            else:
+                # in-memory queues are persisted once all workers stopped; the item keeps its priority and age
+                requeue = getattr(self.entry_queue, "requeue_nowait", self.entry_queue.put_nowait)
+                requeue(task)
+        except Exception as e:
+            logger.exception(f"{self.worker_name} - Failed to return unfinished task to the queue: {e}")
+
+    def _abandon(self, task: T):
+        """Let a durable queue forget an unsettled item; its job comes back after the visibility timeout."""
+        abandon = getattr(self.entry_queue, "abandon", None)
+        if abandon is not None:
+            abandon(task)
+
+    def _task_done(self, task: T):
+        forget = getattr(self.entry_queue, "forget", None)
+        if forget is not None:
+            forget(task)
+        self.entry_queue.task_done()
+
+    async def _ack(self, task: T):
+        if not isinstance(self.entry_queue, AcknowledgingQueue):
+            return
+        try:
+            await self.entry_queue.ack(task)
+        except Exception as e:
+            logger.exception(f"{self.worker_name} - Failed to acknowledge task: {e}")
+
     @abstractmethod
     async def handle(self, item: T): ...
+
+    async def handle_batch(self, items: List[T]) -> Optional[Dict[int, Exception]]:
+        """
+        Handle a batch at once (only called with `batch_size > 1`).
+        Returns the failures by position in `items`; those items are retried through `handle()`.
+        Raising fails the whole batch. By default, items are handled one by one.
+        """
+        failures: Dict[int, Exception] = {}
+        for i, item in enumerate(items):
+            try:
+                await self.handle(item)
+            except Exception as e:
+                failures[i] = e
+        return failures
@@ -0,0 +1,46 @@
+"""
+Unattended mode of the classification graph. A record whose grouping and recipe pass these checks
+is saved without stopping at the grouping, recipe and taxonomy reviews. Each check returns why the
+record needs the user instead, or None.
+"""
+
+from typing import List, Optional
+
+from app.schemas.ocr import ClassificationGraphState, ClassificationRecordInputPage, PageType
+from app.schemas.recipe import RecipeCreate
+
+# a recipe rarely runs over more pages; longer groups usually merged two recipes
+MAX_TEXT_PAGES = 3
+MIN_INGREDIENTS = 2
+MAX_TITLE_WORDS = 12
+# longer "ingredients" are method text the LLM put in the wrong list
+MAX_INGREDIENT_CHARS = 80
+
+
+def auto_approve_enabled(config) -> bool:
+    # only the worker enables the mode; records resumed from the API are reviewed step by step
+    return bool(config and config.get("configurable", {}).get("auto_approve"))
+
+
+def auto_approving(state: ClassificationGraphState, config) -> bool:
+    return auto_approve_enabled(config) and state.review_reason is None
+
+
+def grouping_review_reason(pages: List[ClassificationRecordInputPage]) -> Optional[str]:
+    text_pages = [p for p in pages or [] if p.page_type == PageType.TEXT]
+    if not text_pages:
+        return "no text page in the group"
+    if len(text_pages) > MAX_TEXT_PAGES:
+        return f"{len(text_pages)} text pages in the group"
+    return None
+
+
+def recipe_review_reason(recipe: RecipeCreate) -> Optional[str]:
+    if len(recipe.title.split()) > MAX_TITLE_WORDS:
+        return f"title of {len(recipe.title.split())} words"
+    ingredients = recipe.ingredients or []
+    if len(ingredients) < MIN_INGREDIENTS:
+        return f"{len(ingredients)} ingredient(s)"
+    if any(len(i.name) > MAX_INGREDIENT_CHARS for i in ingredients):
+        return "ingredient longer than a line"
+    return None
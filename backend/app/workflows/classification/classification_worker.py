@@ -7,6 +7,7 @@ from app.ports.classification import ClassificationService
 from app.ports.storage import StorageService
 from app.ports.thumbnail import ThumbnailService
 from app.ports.validation import ValidationService
+from app.repos.book import BookScanRepository
 from app.repos.classification_record import ClassificationRecordRepository
 from app.repos.image_repo import ImageRepository
 from app.repos.recipe import RecipeRepository
@@ -25,7 +26,9 @@ from app.schemas.ocr import (
 )
 from app.workflows.base_worker import BaseWorker
 from app.workflows.classification.graph_builder import build_classification_graph
-from app.workflows.queues.queues import ClassificationJob
+from app.workflows.queues.dead_letters import DeadLetterStore
+from app.workflows.queues.queues import ClassificationJob, WorkQueue
+from app.workflows.retry import NO_RETRY, RetryPolicy
 
 logger = logging.getLogger(__name__)
 CLASS_GRAPH = build_classification_graph()
@@ -56,7 +59,7 @@ def infer_global_motif(pages: List[PageScanRead]) -> MotifType:
 class ClassificationWorker(BaseWorker[ClassificationJob]):
     def __init__(
         self,
-        class_queue: asyncio.Queue[ClassificationJob],
+        class_queue: WorkQueue[ClassificationJob],
         image_repo: ImageRepository,
         classification_service: ClassificationService,
         validation_service: ValidationService,
@@ -64,8 +67,22 @@ class ClassificationWorker(BaseWorker[ClassificationJob]):
         storage: StorageService,
         classification_repo: ClassificationRecordRepository,
         recipe_repo: RecipeRepository,
+        book_repo: BookScanRepository,
+        concurrency: int = 1,
+        group_concurrency: int = 1,
+        auto_approve: bool = False,
+        retry_policy: RetryPolicy = NO_RETRY,
+        dead_letters: Optional[DeadLetterStore] = None,
     ):
-        (super().__init__(entry_queue=class_queue),)
+        (
+            super().__init__(
+                entry_queue=class_queue,
+                concurrency=concurrency,
+                stage="cls",
+                retry_policy=retry_policy,
+                dead_letters=dead_letters,
+            ),
+        )
         self.class_service = classification_service
 
         self.page_repo = image_repo
@@ -74,15 +91,15 @@ class ClassificationWorker(BaseWorker[ClassificationJob]):
         self.thumb_service = thumbnail_service
         self.classification_repo = classification_repo
         self.recipe_repo = recipe_repo
+        # the taxonomy step names the book as the recipe's source
+        self.book_repo = book_repo
+        self.group_concurrency = max(1, group_concurrency)
+        # unattended mode: records passing the checks of `auto_approve` are saved without reviews
+        self.auto_approve = auto_approve
 
     async def collect_used_pages_for_book(self, book_id: str, owner_id: Optional[str]) -> set[str]:
         """Return IDs of pages already used in existing records."""
-        used: set[str] = set()
-        records = await self.classification_repo.get_all_by_book_id(book_id, owner_id=owner_id)
-        for r in records:
-            for p in r.text_pages + r.image_pages:
-                used.add(p.id)
-        return used
+        return await self.classification_repo.get_used_page_ids(book_id, owner_id=owner_id)
 
     @staticmethod
     def is_start_of_new_record(motif: MotifType, new_page: PageScanRead, prev_page: Optional[PageScanRead]) -> bool:
@@ -194,23 +211,49 @@ class ClassificationWorker(BaseWorker[ClassificationJob]):
                 "image_repo": self.page_repo,
                 "classification_repo": self.classification_repo,
                 "recipe_repo": self.recipe_repo,
+                "book_repo": self.book_repo,
                 "owner_id": owner_id,
                 "thread_id": saved.id,
+                "auto_approve": self.auto_approve,
             }
         }
 
         logger.info(f"Invoking classification graph for record {saved.id}")
-        result = await CLASS_GRAPH.ainvoke(state, config=config)
-
-        if result.get("__interrupt__"):
-            logger.info(f"Updating record {saved.id} (needs review)")
+        try:
+            result = await CLASS_GRAPH.ainvoke(state, config=config)
+        except Exception:
+            # no half-made record: its pages stay free for the next attempt
+            await self.classification_repo.delete(saved.id, owner_id=owner_id)
+            raise
+
+        text_pages = [Page(id=p.original_id, page_number=p.page_number) for p in input_pages]
+        recipe = result.get("current_recipe_state")
+        if result.get("__interrupt__") and self.auto_approve and recipe is not None:
+            # unattended grouping passed, the recipe was flagged and waits at its review
+            logger.info(f"Updating record {saved.id} (recipe needs review: {result.get('review_reason')})")
+            updated = ClassificationRecordUpdate(
+                id=saved.id,
+                status=RecordStatus.NEEDS_REVIEW,
+                text_pages=text_pages,
+                validation_result=recipe,
+                title=recipe.title,
+                thumbnail_path=result.get("thumbnail_path"),
+            )
+            await self.classification_repo.update(updated)
+            await broadcast_status(GraphBroadCast(type="record", id=saved.id, status=RecordStatus.NEEDS_REVIEW))
+        elif result.get("__interrupt__"):
+            logger.info(f"Updating record {saved.id} (needs review: {result.get('review_reason')})")
             updated = ClassificationRecordUpdate(
                 id=saved.id,
                 status=RecordStatus.REVIEW_GROUPING,
-                text_pages=[Page(id=p.original_id, page_number=p.page_number) for p in input_pages],
+                text_pages=text_pages,
             )
             await self.classification_repo.update(updated)
             await broadcast_status(GraphBroadCast(type="record", id=saved.id, status=RecordStatus.REVIEW_GROUPING))
+        elif self.auto_approve:
+            # saved by the graph; the pages are marked as used for later runs of the book
+            await self.classification_repo.update(ClassificationRecordUpdate(id=saved.id, text_pages=text_pages))
+            logger.info(f"Record {saved.id} classified and saved without review")
         else:
             logger.info(f"Record {saved.id} classified successfully")
 
@@ -236,9 +279,20 @@ class ClassificationWorker(BaseWorker[ClassificationJob]):
 
         logger.info(f"Prepared {len(groups)} group(s) for classification")
 
-        for group in groups:
-            await self.run_classification_graph(
-                book_scan_id=book_id,
-                input_pages=group,
-                owner_id=owner_id,
-            )
+        # groups run side by side, each record is broadcast as soon as it is ready
+        limit = asyncio.Semaphore(self.group_concurrency)
+
+        async def classify(group: List[ClassificationRecordInputPage]):
+            async with limit:
+                await self.run_classification_graph(book_scan_id=book_id, input_pages=group, owner_id=owner_id)
+
+        results = await asyncio.gather(*(classify(group) for group in groups), return_exceptions=True)
+        failures = [r for r in results if isinstance(r, Exception)]
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                pages = ", ".join(p.original_id for p in group)
+                logger.error(f"Classification of group [{pages}] failed: {result}", exc_info=result)
+        if failures:
+            # the finished groups own their pages now, a retry only redoes the failed ones
+            logger.warning(f"{len(failures)} of {len(groups)} group(s) of book {book_id} failed")
+            raise failures[0]
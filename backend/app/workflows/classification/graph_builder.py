@@ -1,21 +1,22 @@
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
+from app.infra.graph_checkpoints import GRAPH_CHECKPOINTER
 from app.schemas.ocr import ClassificationGraphState
 from app.workflows.classification.nodes.add_categories_tags import enrich_categories_tags
 from app.workflows.classification.nodes.approve_classification import approve_classification
 from app.workflows.classification.nodes.check_grouping import check_grouping
 from app.workflows.classification.nodes.interrupt_classification import interrupt_classification
 from app.workflows.classification.nodes.interrupt_taxonomy import interrupt_taxonomy
-from app.workflows.classification.nodes.routers import route_after_validate
+from app.workflows.classification.nodes.routers import route_after_grouping, route_after_validate
 from app.workflows.classification.nodes.start_classification import start_classification
 from app.workflows.classification.nodes.thumbnail import thumbnail_node
 from app.workflows.classification.nodes.validate import validation_node
 from app.workflows.classification.nodes.validate_or_merge_taxonomy import validate_or_merge_taxonomy
 
 
-def build_classification_graph(checkpointer: InMemorySaver = InMemorySaver()):
+def build_classification_graph(checkpointer: BaseCheckpointSaver = GRAPH_CHECKPOINTER):
     builder = StateGraph(ClassificationGraphState)
 
     builder.add_node("check_grouping", check_grouping)
@@ -30,8 +31,11 @@ def build_classification_graph(checkpointer: InMemorySaver = InMemorySaver()):
 
     builder.add_edge(START, "check_grouping")
 
-    builder.add_edge("check_grouping", "thumbnail")
-    builder.add_edge("check_grouping", "start_classification")
+    builder.add_conditional_edges(
+        "check_grouping",
+        route_after_grouping,
+        ["check_grouping", "thumbnail", "start_classification"],
+    )
 
     builder.add_edge("start_classification", "validate")
     builder.add_edge("thumbnail", "validate")
@@ -42,6 +46,7 @@ def build_classification_graph(checkpointer: InMemorySaver = InMemorySaver()):
         {
             "to_user_confirmation": "interrupt_classification",
             "to_taxonomy": "enrich_categories_tags",
+            "to_grouping_review": "check_grouping",
         },
     )
 
@@ -8,11 +8,21 @@ from app.schemas.ocr import (
     ClassificationRecordInputPage,
     GroupApproval,
 )
+from app.workflows.classification.auto_approve import auto_approving, grouping_review_reason
 
 logger = logging.getLogger(__name__)
 
 
 async def check_grouping(state: ClassificationGraphState, config) -> ClassificationGraphPatch:
+    if auto_approving(state, config):
+        review_reason = grouping_review_reason(state.input_pages)
+        if review_reason is None:
+            logger.info(f"Grouping of record {state.classification_record_id} approved automatically")
+            return ClassificationGraphPatch(input_pages=state.input_pages)
+        logger.info(f"Record {state.classification_record_id} needs a grouping review: {review_reason}")
+        # saved first, the graph comes back here and waits for the user with the reason in the state
+        return ClassificationGraphPatch(review_reason=review_reason)
+
     # Pause graph, return payload
     interrupt_result = interrupt({"request_to_approve_grouping": "payload in state"})
     logger.info(interrupt_result)
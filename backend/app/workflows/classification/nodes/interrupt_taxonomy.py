@@ -3,14 +3,19 @@ import logging
 from langgraph.types import interrupt
 
 from app.schemas.ocr import ApprovedTaxonomyResult, ClassificationGraphPatch, ClassificationGraphState
+from app.workflows.classification.auto_approve import auto_approving
 
 logger = logging.getLogger(__name__)
 
 
-async def interrupt_taxonomy(state: ClassificationGraphState) -> ClassificationGraphPatch:
+async def interrupt_taxonomy(state: ClassificationGraphState, config=None) -> ClassificationGraphPatch:
     """
     Show suggested categories/tags; capture user’s confirmation/edits.
     """
+    if auto_approving(state, config):
+        recipe = state.current_recipe_state
+        return {"taxonomy_user_approved": {"categories": recipe.categories, "tags": recipe.tags}}
+
     logger.info("Interrupt taxonomy")
     interrupt_result = interrupt({"request_to_approve_taxonomy": "payload in state"})
     logger.info(f"User categories{interrupt_result}")
@@ -1,9 +1,22 @@
 from app.schemas.ocr import ClassificationGraphState
+from app.workflows.classification.auto_approve import auto_approve_enabled, auto_approving
 
 
-def route_after_validate(state: ClassificationGraphState) -> str:
+def route_after_grouping(state: ClassificationGraphState, config=None) -> str | list[str]:
+    if auto_approve_enabled(config) and state.review_reason:
+        # flagged by the unattended check: back to the node, which now waits for the user
+        return "check_grouping"
+    return ["thumbnail", "start_classification"]
+
+
+def route_after_validate(state: ClassificationGraphState, config=None) -> str:
     # simple routing, no error handling if the user send bad data to validation
 
     if state.first_pass_validation:
+        if state.current_recipe_state is None and state.review_reason:
+            # unattended candidate that did not validate: the user starts over from the grouping
+            return "to_grouping_review"
+        if auto_approving(state, config):
+            return "to_taxonomy"
         return "to_user_confirmation"
     return "to_taxonomy"
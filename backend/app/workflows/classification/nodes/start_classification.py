@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from app.ports.classification import ClassificationService
 from app.ports.storage import StorageService
@@ -10,6 +10,7 @@ from app.schemas.ocr import (
     OCRResult,
     PageType,
 )
+from app.schemas.ocr_blocks import block_text
 
 logger = logging.getLogger(__name__)
 
@@ -25,24 +26,29 @@ async def start_classification(
 
     ocr_blocks: list[Dict[str, Any]] = []
     full_text_parts: list[str] = []
-    base_result: OCRResult | None = None
+    first_page_id: Optional[str] = None
     for page in text_pages:
         if page.page_type != PageType.TEXT:
             continue
-        raw_data = await storage.read_json(page.original_id)
-        parsed: OCRResult = OCRResult.model_validate(raw_data)
-        if base_result is None:
-            base_result = parsed
-        page_blocks = parsed.blocks
-        if page.segmentation_done:
-            ocr_blocks.extend(page_blocks)
-            full_text_parts.append(parsed.full_text)
-        else:
-            logger.warning(f"Using all blocks of page {page.original_id}")
-            ocr_blocks.extend(page_blocks)
-            full_text_parts.append(parsed.full_text)
+        if first_page_id is None:
+            first_page_id = page.original_id
+        if page.segmentation_done and page.relevant_segment is not None:
+            # only the blocks of this page's recipe, other recipes on the page get their own records
+            page_blocks = OCRResult.model_validate(await storage.read_ocr(page.original_id)).blocks
+            segment_blocks = [
+                page_blocks[i] for i in page.relevant_segment.associated_ocr_blocks if i < len(page_blocks)
+            ]
+            ocr_blocks.extend(segment_blocks)
+            full_text_parts.append("\n\n".join(block_text(block) for block in segment_blocks))
+            continue
+        if not page.segmentation_done:
+            logger.warning(f"Using the whole text of page {page.original_id}")
+        # the whole page is classified from its text, its blocks are not loaded
+        full_text_parts.append(await storage.read_ocr_text(page.original_id))
+    if first_page_id is None:
+        raise ValueError("No text page to classify")
     classified_json = await svc.classify(
-        ocr_blocks, OCRResult(full_text="\n\n".join(full_text_parts), page_id=base_result.page_id, blocks=ocr_blocks)
+        ocr_blocks, OCRResult(full_text="\n\n".join(full_text_parts), page_id=first_page_id, blocks=ocr_blocks)
     )
 
     return {"llm_candidate": classified_json}
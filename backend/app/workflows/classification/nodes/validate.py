@@ -3,6 +3,7 @@ import logging
 from app.ports.validation import ValidationService
 from app.schemas.ocr import ClassificationGraphPatch, ClassificationGraphState
 from app.schemas.recipe import RecipeCreate
+from app.workflows.classification.auto_approve import auto_approving, recipe_review_reason
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,18 @@ async def validation_node(state: ClassificationGraphState, config) -> Classifica
     else:
         logger.info(f"Validating user edits for {candidate['title']}")
 
-    dto: RecipeCreate = await validation_service.validate(candidate, thumbnail_filename=state.thumbnail_path)
-    logger.info("Validation finished")
-    return {"current_recipe_state": dto, "first_pass_validation": first_pass}
+    if not (first_pass and auto_approving(state, config)):
+        dto: RecipeCreate = await validation_service.validate(candidate, thumbnail_filename=state.thumbnail_path)
+        logger.info("Validation finished")
+        return {"current_recipe_state": dto, "first_pass_validation": first_pass}
+
+    # unattended: a candidate that fails or looks doubtful goes to the user instead of failing the job
+    try:
+        dto = await validation_service.validate(candidate, thumbnail_filename=state.thumbnail_path)
+    except Exception as e:
+        logger.info(f"Record {state.classification_record_id} needs a review, validation failed: {e}")
+        return {"current_recipe_state": None, "first_pass_validation": True, "review_reason": f"invalid recipe: {e}"}
+    review_reason = recipe_review_reason(dto)
+    if review_reason:
+        logger.info(f"Record {state.classification_record_id} needs a review: {review_reason}")
+    return {"current_recipe_state": dto, "first_pass_validation": True, "review_reason": review_reason}
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from typing import Optional
 
 from app.ports.ocr import OCRService, TextOrImageService
 from app.ports.storage import StorageService
@@ -7,6 +8,9 @@ from app.repos.image_repo import ImageRepository
 from app.routes.status import broadcast_status
 from app.schemas.ocr import GraphBroadCast, OCRResult, PageScanRead, PageScanUpdate, PageStatus, PageType
 from app.workflows.base_worker import BaseWorker
+from app.workflows.queues.dead_letters import DeadLetterStore
+from app.workflows.queues.queues import WorkQueue
+from app.workflows.retry import NO_RETRY, RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -14,14 +18,26 @@ logger = logging.getLogger(__name__)
 class OCRWorker(BaseWorker[PageScanRead]):
     def __init__(
         self,
-        ocr_queue: asyncio.Queue[PageScanRead],
-        seg_queue: asyncio.Queue[PageScanRead],
+        ocr_queue: WorkQueue[PageScanRead],
+        seg_queue: WorkQueue[PageScanRead],
         image_repo: ImageRepository,
         ocr_service: OCRService,
         storage: StorageService,
         text_or_image: TextOrImageService,
+        concurrency: int = 1,
+        retry_policy: RetryPolicy = NO_RETRY,
+        dead_letters: Optional[DeadLetterStore] = None,
     ):
-        (super().__init__(entry_queue=ocr_queue, worker_name="OCRWorker"),)
+        (
+            super().__init__(
+                entry_queue=ocr_queue,
+                worker_name="OCRWorker",
+                concurrency=concurrency,
+                stage="ocr",
+                retry_policy=retry_policy,
+                dead_letters=dead_letters,
+            ),
+        )
         self.entry_queue = ocr_queue
         self.exit_queue = seg_queue
 
@@ -37,7 +53,8 @@ class OCRWorker(BaseWorker[PageScanRead]):
         image_path = await self.storage.get_image_path(image_id, "scanner")
         logger.debug(f"Image path: {image_path}")
 
-        should_ocr = self.page_classifier.is_text_page(image_path)
+        # reads and measures the image, keep it off the event loop
+        should_ocr = await asyncio.to_thread(self.page_classifier.is_text_page, image_path)
         logger.info(f"{image_id} is text page: {should_ocr}")
 
         if should_ocr:
@@ -45,9 +62,7 @@ class OCRWorker(BaseWorker[PageScanRead]):
             page_type = PageType.TEXT
             status = PageStatus.OCR_DONE
 
-            await self.storage.save_json(ocr_result.model_dump(), image_id)
-
-            json_path = await self.storage.get_json_path(image_id)
+            json_path = await self.storage.save_ocr(ocr_result, image_id)
 
         else:
             page_type = PageType.IMAGE
@@ -64,6 +79,10 @@ class OCRWorker(BaseWorker[PageScanRead]):
 
         # send text images to segmentation
         if page_type == PageType.TEXT:
-            self.exit_queue.put_nowait(dto)
+            await self.exit_queue.put(dto)
 
         logger.info(f"Finished OCR for {image_id} → {json_path}")
+
+    async def on_dead_letter(self, item: PageScanRead, exc: Exception):
+        await self.image_repo.update(PageScanUpdate(id=item.id, status=PageStatus.FAILED))
+        await broadcast_status(GraphBroadCast(type="image", id=item.id, status=PageStatus.FAILED))
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.core.deps import (
+    get_classification_service,
+    get_ocr_service,
+    get_segmentation_service,
+    get_text_or_image_service,
+    get_thumbnail_service,
+    get_validation_service,
+    make_scoped_repo,
+    new_book_scan_repo,
+    new_classification_repo,
+    new_image_repo,
+    new_recipe_repo,
+)
+from app.database.init_embedding_db import build_store_registry
+from app.infra.embedding_chunker_langchain import RecursiveChunker
+from app.infra.embeding_vectorstore_langchain import PGVectorEmbeddingStore
+from app.infra.ocr_cache import CachedOCRService
+from app.infra.ocr_fallback import BackendStats, CircuitBreaker, FallbackOCRService, OCRBackend
+from app.infra.ocr_preprocessing import PreprocessingOCRService
+from app.ports.embedding_store import IEmbeddingStore
+from app.ports.ocr import OCRService
+from app.ports.storage import StorageService
+from app.ports.thumbnail import ThumbnailService
+from app.services.embedding_service import EmbeddingService
+from app.workflows.base_worker import BaseWorker
+from app.workflows.classification.classification_worker import ClassificationWorker
+from app.workflows.ocr.ocr_worker import OCRWorker
+from app.workflows.queues.dead_letters import DeadLetterStore
+from app.workflows.queues.queues import QueueRegistry
+from app.workflows.recipeassistant.embedding_worker import EmbeddingWorker
+from app.workflows.retry import RetryPolicy
+from app.workflows.segmentation.segmentation_worker import SegmentationWorker
+
+logger = logging.getLogger(__name__)
+
+# pipeline stages, named like the queues they consume
+STAGES = ("ocr", "seg", "cls", "emb")
+_STAGE_ALIASES = {"embed": "emb", "segmentation": "seg", "classification": "cls"}
+
+
+def parse_stages(spec: str) -> List[str]:
+    """
+    Parse a comma separated stage list such as "ocr,embed".
+    "all" selects every stage, "none" or an empty string selects none (API-only mode).
+    """
+    spec = spec.strip().lower()
+    if spec == "all":
+        return list(STAGES)
+    if spec in ("", "none"):
+        return []
+
+    stages = []
+    for name in (s.strip() for s in spec.split(",")):
+        stage = _STAGE_ALIASES.get(name, name)
+        if stage not in STAGES:
+            raise ValueError(f"Unknown worker stage: {name} (expected one of {', '.join(STAGES)})")
+        if stage not in stages:
+            stages.append(stage)
+    return stages
+
+
+@dataclass
+class EmbeddingRuntime:
+    service: EmbeddingService
+    stores: Dict[str, IEmbeddingStore]
+    active_version: str
+
+
+def build_embedding_runtime(session_maker: Callable[[], Any]) -> EmbeddingRuntime:
+    settings = get_settings()
+    recipe_repository = make_scoped_repo(new_recipe_repo, session_maker)
+    return EmbeddingRuntime(
+        service=EmbeddingService(repo=recipe_repository, chunker=RecursiveChunker(size=800, overlap=100)),
+        stores={k: PGVectorEmbeddingStore(v) for k, v in build_store_registry().items()},
+        active_version=next(iter({t.active_version for t in settings.target_config_list.values()}), "v1"),
+    )
+
+
+def build_ocr_service(storage: StorageService) -> OCRService:
+    """
+    The configured OCR backends as a fallback chain with timeouts and circuit breakers.
+    Each backend gets its own preprocessing and result cache, so results of a fallback are
+    never served as results of the primary backend.
+    """
+    settings = get_settings()
+    backends = []
+    for name in settings.ocr_backend_list:
+        ocr = get_ocr_service(name)
+        if settings.OCR_PREPROCESS:
+            ocr = PreprocessingOCRService(
+                ocr,
+                target_dpi=settings.OCR_PREPROCESS_DPI,
+                deskew=settings.OCR_PREPROCESS_DESKEW,
+                binarize=settings.OCR_PREPROCESS_BINARIZE,
+            )
+        if settings.OCR_CACHE_ENABLED:
+            ocr = CachedOCRService(ocr, storage)
+        breaker = CircuitBreaker(settings.OCR_BREAKER_FAILURES, settings.OCR_BREAKER_RESET_S)
+        backends.append(OCRBackend(name, ocr, settings.ocr_timeout(name), breaker, BackendStats()))
+    return FallbackOCRService(backends)
+
+
+def build_workers(
+    stages: List[str],
+    queues: QueueRegistry,
+    storage: StorageService,
+    session_maker: Callable[[], Any],
+    thumbnail_service: Optional[ThumbnailService] = None,
+    embedding: Optional[EmbeddingRuntime] = None,
+) -> Dict[str, BaseWorker]:
+    """
+    Construct the workers of the given pipeline stages.
+    Used by the API process and by the standalone worker process (`python -m app.worker`).
+    """
+    settings = get_settings()
+
+    image_repo = make_scoped_repo(new_image_repo, session_maker)
+    dead_letters = DeadLetterStore(session_maker)
+
+    def retry_policy(max_attempts: int) -> RetryPolicy:
+        return RetryPolicy(
+            max_attempts=max_attempts,
+            base_delay=settings.WORKER_RETRY_BASE_DELAY_S,
+            max_delay=settings.WORKER_RETRY_MAX_DELAY_S,
+        )
+
+    workers: Dict[str, BaseWorker] = {}
+
+    if "ocr" in stages:
+        workers["ocr"] = OCRWorker(
+            ocr_queue=queues.ocr,
+            seg_queue=queues.seg,
+            image_repo=image_repo,
+            storage=storage,
+            ocr_service=build_ocr_service(storage),
+            text_or_image=get_text_or_image_service(),
+            concurrency=settings.OCR_WORKER_CONCURRENCY,
+            retry_policy=retry_policy(settings.OCR_RETRY_MAX_ATTEMPTS),
+            dead_letters=dead_letters,
+        )
+
+    if "seg" in stages:
+        workers["seg"] = SegmentationWorker(
+            seg_queue=queues.seg,
+            image_repo=image_repo,
+            segmentation_service=get_segmentation_service(),
+            storage=storage,
+            concurrency=settings.SEG_WORKER_CONCURRENCY,
+            auto_approve_confidence=settings.SEG_AUTO_APPROVE_CONFIDENCE,
+            retry_policy=retry_policy(settings.SEG_RETRY_MAX_ATTEMPTS),
+            dead_letters=dead_letters,
+        )
+
+    if "cls" in stages:
+        workers["cls"] = ClassificationWorker(
+            class_queue=queues.cls,
+            image_repo=image_repo,
+            classification_service=get_classification_service(),
+            storage=storage,
+            thumbnail_service=thumbnail_service or get_thumbnail_service(),
+            validation_service=get_validation_service(),
+            classification_repo=make_scoped_repo(new_classification_repo, session_maker),
+            recipe_repo=make_scoped_repo(new_recipe_repo, session_maker),
+            book_repo=make_scoped_repo(new_book_scan_repo, session_maker),
+            concurrency=settings.CLS_WORKER_CONCURRENCY,
+            group_concurrency=settings.CLS_GROUP_CONCURRENCY,
+            auto_approve=settings.CLS_AUTO_APPROVE,
+            retry_policy=retry_policy(settings.CLS_RETRY_MAX_ATTEMPTS),
+            dead_letters=dead_letters,
+        )
+
+    if "emb" in stages:
+        embedding = embedding or build_embedding_runtime(session_maker)
+        workers["emb"] = EmbeddingWorker(
+            entry_queue=queues.emb,
+            service=embedding.service,
+            stores=embedding.stores,
+            current_version=embedding.active_version,
+            concurrency=settings.EMB_WORKER_CONCURRENCY,
+            retry_policy=retry_policy(settings.EMB_RETRY_MAX_ATTEMPTS),
+            dead_letters=dead_letters,
+            batch_size=settings.EMB_BATCH_SIZE,
+            batch_wait_ms=settings.EMB_BATCH_WAIT_MS,
+        )
+
+    logger.info(f"Built workers for stages: {', '.join(workers) or 'none'}")
+    return workers
+
+
+async def drain_workers(workers: Dict[str, BaseWorker], tasks: List[asyncio.Task], grace_s: float) -> None:
+    """
+    Stop all workers at once: they take no new items and get `grace_s` to finish in-flight work.
+    Unfinished items go back to their queue, so nothing taken from a queue is lost.
+    """
+    logger.info(f"Draining workers {', '.join(workers) or 'none'} with a grace period of {grace_s}s")
+    await asyncio.gather(*(worker.shutdown(task, grace_s) for worker, task in zip(workers.values(), tasks)))
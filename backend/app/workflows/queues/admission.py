@@ -0,0 +1,113 @@
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.core.config import get_settings
+from app.schemas.queue import QueueStageStatus
+
+# bounds for the Retry-After hint sent to saturated clients
+MIN_RETRY_AFTER_S = 1
+MAX_RETRY_AFTER_S = 600
+# used when a stage has not drained anything recently
+DEFAULT_RETRY_AFTER_S = 30
+# span over which the drain rate is measured
+DRAIN_WINDOW_S = 60.0
+
+
+class DrainRate:
+    """Items taken off a queue per second, measured over a sliding window."""
+
+    def __init__(self, window_s: float = DRAIN_WINDOW_S):
+        self.window_s = window_s
+        self._taken: Deque[float] = deque()
+
+    def record(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._taken.append(now)
+        self._trim(now)
+
+    def per_second(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self._trim(now)
+        if not self._taken:
+            return 0.0
+        # a young window is measured over its actual span, at least one second
+        span = max(1.0, min(self.window_s, now - self._taken[0]))
+        return len(self._taken) / span
+
+    def _trim(self, now: float) -> None:
+        while self._taken and now - self._taken[0] > self.window_s:
+            self._taken.popleft()
+
+
+class QueueSaturated(Exception):
+    """A pipeline stage is above its high-water mark and does not accept new bulk work."""
+
+    def __init__(self, stage: str, depth: int, high_water: int, retry_after: int):
+        super().__init__(f"Queue '{stage}' is saturated ({depth}/{high_water}), retry in {retry_after}s")
+        self.stage = stage
+        self.depth = depth
+        self.high_water = high_water
+        self.retry_after = retry_after
+
+
+def high_water_marks() -> Dict[str, int]:
+    settings = get_settings()
+    return {
+        "ocr": settings.OCR_QUEUE_HIGH_WATER,
+        "seg": settings.SEG_QUEUE_HIGH_WATER,
+        "cls": settings.CLS_QUEUE_HIGH_WATER,
+        "emb": settings.EMB_QUEUE_HIGH_WATER,
+    }
+
+
+async def queue_depth(queue) -> int:
+    """Exact depth where the backend can tell (durable queues), otherwise `qsize()`."""
+    depth = getattr(queue, "depth", None)
+    if depth is not None:
+        return await depth()
+    return queue.qsize()
+
+
+async def drain_rate(queue) -> float:
+    """Items taken per second, across processes where the backend can tell (durable queues)."""
+    shared = getattr(queue, "drain_rate_per_s", None)
+    if shared is not None:
+        return await shared()
+    rate: Optional[DrainRate] = getattr(queue, "drain_rate", None)
+    return rate.per_second() if rate is not None else 0.0
+
+
+def retry_after(excess: int, rate_per_s: float) -> int:
+    """Seconds until `excess` items have drained at the measured rate."""
+    if rate_per_s <= 0:
+        return DEFAULT_RETRY_AFTER_S
+    return max(MIN_RETRY_AFTER_S, min(MAX_RETRY_AFTER_S, math.ceil(excess / rate_per_s)))
+
+
+async def admit(stage: str, queue, incoming: int = 1) -> None:
+    """
+    Admission control for bulk ingest: raise `QueueSaturated` if adding `incoming` items
+    would push `queue` above the stage's high-water mark.
+    An idle stage always admits, so a batch larger than the mark is not rejected forever.
+    """
+    high_water = high_water_marks()[stage]
+    depth = await queue_depth(queue)
+    excess = depth + incoming - high_water
+    if depth > 0 and excess > 0:
+        raise QueueSaturated(stage, depth, high_water, retry_after(excess, await drain_rate(queue)))
+
+
+async def stage_status(stage: str, queue) -> QueueStageStatus:
+    high_water = high_water_marks()[stage]
+    depth = await queue_depth(queue)
+    wait_stats = getattr(queue, "wait_stats", None)
+    return QueueStageStatus(
+        stage=stage,
+        depth=depth,
+        high_water=high_water,
+        saturated=depth >= high_water,
+        drain_rate_per_s=round(await drain_rate(queue), 3),
+        wait_by_priority=wait_stats.snapshot() if wait_stats is not None else {},
+    )
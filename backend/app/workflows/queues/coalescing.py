@@ -0,0 +1,36 @@
+from typing import Any, Callable, Optional
+
+from app.schemas.embeddings import EmbeddingJob
+from app.schemas.ocr import PageScanRead
+
+
+def coalesce_key(stage: str, item: Any) -> Optional[str]:
+    """
+    Identity of a queued item as (stage, entity id, version): two pending items with the same key
+    describe the same work and are merged into one. Items without a key are never merged.
+    """
+    if isinstance(item, EmbeddingJob):
+        return f"{stage}:{item.recipe_id}:{item.version or ''}"
+    if isinstance(item, PageScanRead):
+        return f"{stage}:{item.id}:"
+    return None
+
+
+def merge_items(pending: Any, incoming: Any) -> Any:
+    """Fold a duplicate into the pending item. Embedding jobs combine their work, anything else keeps the newest."""
+    if isinstance(pending, EmbeddingJob) and isinstance(incoming, EmbeddingJob):
+        return merge_embedding_jobs(pending, incoming)
+    return incoming
+
+
+def merge_embedding_jobs(pending: EmbeddingJob, incoming: EmbeddingJob) -> EmbeddingJob:
+    # no targets means all targets, which covers any explicit list
+    if pending.targets is None or incoming.targets is None:
+        targets = None
+    else:
+        targets = list(dict.fromkeys([*pending.targets, *incoming.targets]))
+    return incoming.model_copy(update={"targets": targets, "reindex": pending.reindex or incoming.reindex})
+
+
+def key_for(stage: str) -> Callable[[Any], Optional[str]]:
+    return lambda item: coalesce_key(stage, item)
@@ -0,0 +1,26 @@
+import traceback
+from typing import Any, Callable
+
+from pydantic import TypeAdapter
+
+from app.repos.dead_letter import DeadLetterRepository
+from app.schemas.queue import DeadLetterRead
+
+
+class DeadLetterStore:
+    """Persists pipeline items a worker gave up on, together with the error that ended them."""
+
+    def __init__(self, session_maker: Callable[[], Any]):
+        self._session_maker = session_maker
+
+    async def record(self, stage: str, worker: str, item: Any, exc: BaseException, attempts: int) -> DeadLetterRead:
+        payload = TypeAdapter(type(item)).dump_python(item, mode="json")
+        async with self._session_maker() as session:
+            return await DeadLetterRepository(session).add(
+                stage=stage,
+                worker=worker,
+                payload=payload,
+                error=f"{type(exc).__name__}: {exc}",
+                traceback="".join(traceback.format_exception(exc)),
+                attempts=attempts,
+            )
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.workflows.queues.coalescing import coalesce_key, merge_items
+from app.workflows.queues.priority import Priority
+from app.workflows.queues.queues import enqueue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Pending:
+    queue: Any
+    item: Any
+    priority: Priority
+    first_at: float
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+@dataclass
+class Debouncer:
+    """
+    Holds items back for `window_s` before enqueueing them, so a burst of triggers for the same
+    entity (for example a recipe edited several times) collapses into one job.
+    Every duplicate restarts the window, but no item is held longer than `max_delay_s`.
+    Held items live in this process only; `close()` enqueues them.
+    """
+
+    window_s: float = 2.0
+    max_delay_s: float = 30.0
+    _pending: Dict[str, _Pending] = field(default_factory=dict)
+    _flushing: set = field(default_factory=set)
+
+    async def submit(self, stage: str, queue, item: Any, priority: Priority = Priority.NORMAL) -> None:
+        key = coalesce_key(stage, item)
+        if key is None or self.window_s <= 0:
+            await self._enqueue(queue, item, priority)
+            return
+
+        now = time.monotonic()
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(queue, item, Priority(priority), now)
+        else:
+            pending.item = merge_items(pending.item, item)
+            pending.priority = min(pending.priority, Priority(priority))
+            pending.timer.cancel()
+            logger.debug(f"Debounced duplicate {key}")
+
+        delay = min(self.window_s, max(0.0, pending.first_at + self.max_delay_s - now))
+        pending.timer = asyncio.get_running_loop().call_later(delay, self._fire, key)
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _fire(self, key: str) -> None:
+        task = asyncio.create_task(self.flush(key), name=f"debounce-{key}")
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def flush(self, key: Optional[str] = None) -> None:
+        """Enqueue the held item of `key` now, or every held item."""
+        keys = [key] if key is not None else list(self._pending)
+        for k in keys:
+            pending = self._pending.pop(k, None)
+            if pending is None:
+                continue
+            if pending.timer is not None:
+                pending.timer.cancel()
+            try:
+                await self._enqueue(pending.queue, pending.item, pending.priority)
+            except Exception:
+                logger.exception(f"Failed to enqueue debounced item {k}")
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    @staticmethod
+    async def _enqueue(queue, item: Any, priority: Priority) -> None:
+        await enqueue(queue, item, priority)
+
+
+_default_debouncer: Optional[Debouncer] = None
+
+
+def get_debouncer() -> Debouncer:
+    global _default_debouncer
+    if _default_debouncer is None:
+        settings = get_settings()
+        _default_debouncer = Debouncer(
+            window_s=settings.QUEUE_DEBOUNCE_S, max_delay_s=settings.QUEUE_DEBOUNCE_MAX_DELAY_S
+        )
+    return _default_debouncer
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Generic, Optional, Tuple, Type, TypeVar
+
+import psycopg
+from pydantic import TypeAdapter
+
+from app.repos.job_queue import JobQueueRepository, utcnow
+from app.schemas.queue import QueuedJobRead
+from app.workflows.queues.admission import DRAIN_WINDOW_S
+from app.workflows.queues.priority import Priority, WaitStats, owner_key
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def _finish(coro: Awaitable[Any]) -> Any:
+    """
+    Complete a database round trip even if the caller is cancelled.
+    A query cut off midway invalidates its pooled connection.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        await task
+        raise
+
+
+class PostgresQueue(Generic[T]):
+    """
+    Durable drop-in for `asyncio.Queue` backed by the `job_queue` table.
+
+    - `put()` inserts a row and sends a NOTIFY on the queue's channel.
+    - `get()` claims the next visible row with `FOR UPDATE SKIP LOCKED` and hides it
+      for `visibility_timeout` seconds. The claim is extended while the item is being worked on,
+      so long jobs are not handed out twice; if the consumer dies, the job becomes visible again.
+      Rows are served by `Priority`, and owners (see `owner_key`) take turns within a priority.
+      One in every `starved_every` claims of this process goes to the oldest row waiting
+      longer than `starvation_after` seconds, as in `PriorityQueue`.
+    - With `key_of`, a `put()` whose key matches a job still waiting merges into that job
+      (with `merge`, default: the newer item replaces it) instead of inserting a duplicate.
+    - `ack()` deletes the row once the item is fully processed; `BaseWorker` calls it.
+      `release()` hands an unfinished item back at once instead of after the timeout,
+      `abandon()` stops extending the claim, so the job comes back once the timeout expires.
+    - Idle consumers sleep until a NOTIFY arrives or `poll_interval` passes.
+
+    Items are stored as JSON via pydantic, so any pydantic model or dataclass works as `item_type`.
+    Several processes and nodes can share one queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        item_type: Type[T],
+        session_maker: Callable[[], Any],
+        visibility_timeout: float = 600.0,
+        poll_interval: float = 5.0,
+        listen_dsn: Optional[str] = None,
+        starvation_after: float = 60.0,
+        starved_every: int = 4,
+        owner_of: Callable[[Any], Optional[str]] = owner_key,
+        key_of: Optional[Callable[[Any], Optional[str]]] = None,
+        merge: Optional[Callable[[T, T], T]] = None,
+    ):
+        self.name = name
+        self.channel = f"job_queue_{name}"
+        self._adapter: TypeAdapter[T] = TypeAdapter(item_type)
+        self._session_maker = session_maker
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self._listen_dsn = listen_dsn
+        self.starvation_after = starvation_after
+        self.starved_every = max(1, starved_every)
+        # claims since the last starved job; the first starved job goes out at once
+        self._since_starved = self.starved_every - 1
+        self.owner_of = owner_of
+        self.key_of = key_of
+        self.merge = merge
+        self.coalesced = 0
+        self.wait_stats = WaitStats()
+
+        # job id -> item handed out by get() and not yet settled, with the task extending its claim
+        self._claimed: dict[int, Tuple[T, asyncio.Task]] = {}
+        self._depth = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    # --- asyncio.Queue interface ---
+
+    async def put(self, item: T, priority: Priority = Priority.NORMAL) -> None:
+        payload = self._adapter.dump_python(item, mode="json")
+        key = self.key_of(item) if self.key_of is not None else None
+        merged = await _finish(self._enqueue(payload, Priority(priority), self.owner_of(item), key))
+        if merged:
+            self.coalesced += 1
+            return
+        self._depth += 1
+        # consumers in this process need not wait for the NOTIFY round trip
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def get(self) -> T:
+        self._ensure_listener()
+        while True:
+            claim = asyncio.ensure_future(self._claim())
+            try:
+                job = await asyncio.shield(claim)
+            except asyncio.CancelledError:
+                # the caller gave up: hand a job claimed in the meantime straight back
+                job = await claim
+                if job is not None:
+                    await self._release(job.id)
+                raise
+            if job is not None:
+                self.wait_stats.record(job.priority, (utcnow() - job.enqueued_at).total_seconds())
+                item = self._adapter.validate_python(job.payload)
+                keeper = asyncio.create_task(self._keep_claimed(job.id), name=f"{self.channel}-claim-{job.id}")
+                self._claimed[job.id] = (item, keeper)
+                self._depth = max(0, self._depth - 1)
+                return item
+            await self._wait_for_work()
+
+    def task_done(self) -> None:
+        """Rows are removed by `ack()`; kept for `asyncio.Queue` compatibility."""
+
+    def qsize(self) -> int:
+        """Approximate number of waiting jobs, as last seen by this process (see `depth()`)."""
+        return self._depth
+
+    def empty(self) -> bool:
+        return self._depth == 0
+
+    # --- durability ---
+
+    async def ack(self, item: T) -> None:
+        """Delete the job behind a fully processed item."""
+        job_id = await self._settle(item)
+        if job_id is None:
+            return
+        await _finish(self._ack(job_id))
+
+    async def release(self, item: T) -> None:
+        """Make the job behind an unfinished item visible again, e.g. when its worker shuts down."""
+        job_id = await self._settle(item)
+        if job_id is None:
+            return
+        await _finish(self._release(job_id))
+        self._depth += 1
+
+    def abandon(self, item: T) -> None:
+        """Give up an item without touching its job, which is handed out again after the visibility timeout."""
+        job_id = self._job_of(item)
+        if job_id is not None:
+            self._claimed.pop(job_id)[1].cancel()
+
+    def _job_of(self, item: T) -> Optional[int]:
+        # by identity: handed-out items are kept alive here, and equal payloads may be different jobs
+        return next((job_id for job_id, (claimed, _) in self._claimed.items() if claimed is item), None)
+
+    async def _settle(self, item: T) -> Optional[int]:
+        """Stop extending the claim of `item` and return its job id."""
+        job_id = self._job_of(item)
+        if job_id is None:
+            return None
+        keeper = self._claimed.pop(job_id)[1]
+        keeper.cancel()
+        # an extension still under way must not hide the job again after it was released
+        with suppress(asyncio.CancelledError):
+            await keeper
+        return job_id
+
+    async def _keep_claimed(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await _finish(self._release(job_id, delay=self.visibility_timeout))
+            except Exception as e:
+                logger.warning(f"Failed to extend the claim of job {job_id} on {self.channel}: {e}")
+
+    async def depth(self) -> int:
+        """Exact number of jobs waiting to be claimed, across all processes."""
+        async with self._session_maker() as session:
+            self._depth = await JobQueueRepository(session).count_ready(self.name)
+        return self._depth
+
+    async def drain_rate_per_s(self) -> float:
+        """Jobs acknowledged per second by all processes, so an API without workers sees the real rate."""
+        async with self._session_maker() as session:
+            return await JobQueueRepository(session).drain_rate(self.name, DRAIN_WINDOW_S)
+
+    # --- database round trips ---
+
+    async def _enqueue(self, payload: dict, priority: Priority, owner: Optional[str], key: Optional[str]) -> bool:
+        """Insert a job; True if it was merged into a waiting duplicate instead."""
+        async with self._session_maker() as session:
+            repo = JobQueueRepository(session)
+            if key is not None and await repo.merge_pending(self.name, key, payload, priority, self._merge_payloads):
+                return True
+            await repo.enqueue(self.name, payload, priority, owner=owner, notify_channel=self.channel, dedupe_key=key)
+            return False
+
+    def _merge_payloads(self, pending: dict, incoming: dict) -> dict:
+        if self.merge is None:
+            return incoming
+        merged = self.merge(self._adapter.validate_python(pending), self._adapter.validate_python(incoming))
+        return self._adapter.dump_python(merged, mode="json")
+
+    async def _claim(self) -> Optional[QueuedJobRead]:
+        serve_starved = self._since_starved >= self.starved_every - 1
+        async with self._session_maker() as session:
+            job = await JobQueueRepository(session).claim(
+                self.name, self.visibility_timeout, self.starvation_after, serve_starved=serve_starved
+            )
+        if job is not None:
+            starved = serve_starved and (utcnow() - job.enqueued_at).total_seconds() >= self.starvation_after
+            self._since_starved = 0 if starved else self._since_starved + 1
+        return job
+
+    async def _ack(self, job_id: int) -> None:
+        async with self._session_maker() as session:
+            await JobQueueRepository(session).ack(self.name, job_id, DRAIN_WINDOW_S)
+
+    async def _release(self, job_id: int, delay: float = 0.0) -> None:
+        async with self._session_maker() as session:
+            await JobQueueRepository(session).release(job_id, delay)
+
+    async def close(self) -> None:
+        # as if the process died: unsettled jobs come back after their visibility timeout
+        for item, _ in list(self._claimed.values()):
+            await self._settle(item)
+        if self._listener:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    # --- LISTEN/NOTIFY ---
+
+    def _ensure_listener(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._listen_dsn and self._listener is None:
+            self._listener = asyncio.create_task(self._listen(), name=f"{self.channel}-listener")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._listen_dsn, autocommit=True) as conn:
+                    await conn.execute(f'LISTEN "{self.channel}"')
+                    logger.info(f"Listening for jobs on {self.channel}")
+                    async for _ in conn.notifies():
+                        self._wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # polling keeps the queue working while the listener reconnects
+                logger.warning(f"{self.channel} listener failed, reconnecting: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _wait_for_work(self) -> None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        self._wakeup.clear()
@@ -0,0 +1,250 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Generic, List, Optional, Tuple, TypeVar
+
+from app.workflows.queues.admission import DrainRate
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Scheduling class of a queued item; lower values are served first."""
+
+    INTERACTIVE = 0  # a user is waiting on the result: approvals, re-triggers
+    NORMAL = 1
+    BULK = 2  # book ingest and other mass work
+
+
+def owner_key(item: Any) -> Optional[str]:
+    """
+    Fair-share key of a queued item: its owner, or its book scan for pages, which carry no owner.
+    A book scan belongs to exactly one user, so a large upload still counts as a single flow.
+    """
+    for attr in ("owner_id", "user_id", "bookScanID"):
+        value = getattr(item, attr, None)
+        if value is not None:
+            return str(value)
+    return None
+
+
+@dataclass
+class _ClassWaits:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+
+@dataclass
+class WaitStats:
+    """How long items waited in a queue before a consumer picked them up, per priority class."""
+
+    _classes: Dict[Priority, _ClassWaits] = field(default_factory=lambda: {p: _ClassWaits() for p in Priority})
+
+    def record(self, priority: Priority, wait_s: float) -> None:
+        waits = self._classes[Priority(priority)]
+        waits.count += 1
+        waits.total_s += wait_s
+        waits.max_s = max(waits.max_s, wait_s)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            p.name.lower(): {
+                "count": w.count,
+                "avg_wait_s": round(w.total_s / w.count, 3) if w.count else 0.0,
+                "max_wait_s": round(w.max_s, 3),
+            }
+            for p, w in self._classes.items()
+        }
+
+
+@dataclass
+class _Entry(Generic[T]):
+    priority: Priority
+    owner: Optional[str]
+    enqueued_at: float
+    item: T
+    # coalescing key, see `PriorityQueue`
+    key: Optional[str] = None
+
+
+class _Lane:
+    """One priority class: a FIFO per owner, served round-robin."""
+
+    def __init__(self):
+        self.owners: OrderedDict[Optional[str], Deque[_Entry]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.owners.values())
+
+    def append(self, entry: _Entry) -> None:
+        self.owners.setdefault(entry.owner, deque()).append(entry)
+
+    def oldest(self) -> Optional[_Entry]:
+        # every owner's FIFO is in arrival order, so the oldest entry is one of the heads
+        return min((entries[0] for entries in self.owners.values()), key=lambda e: e.enqueued_at, default=None)
+
+    def pop_next(self) -> _Entry:
+        owner, entries = next(iter(self.owners.items()))
+        entry = entries.popleft()
+        # the served owner goes to the back of the rotation
+        del self.owners[owner]
+        if entries:
+            self.owners[owner] = entries
+        return entry
+
+    def remove(self, entry: _Entry) -> None:
+        entries = self.owners[entry.owner]
+        entries.remove(entry)
+        if not entries:
+            del self.owners[entry.owner]
+
+    def pop_owner(self, owner: Optional[str]) -> _Entry:
+        entries = self.owners.pop(owner)
+        entry = entries.popleft()
+        if entries:
+            self.owners[owner] = entries
+        return entry
+
+
+class PriorityQueue(asyncio.Queue, Generic[T]):
+    """
+    In-memory queue with one lane per `Priority` class.
+
+    Higher classes are always served first, except that an item which has waited
+    `starvation_after` seconds is served before anything younger, whatever its class,
+    at most once every `starved_every` items. Under a sustained backlog every item is
+    old, so the other items keep following priority and owner turns.
+    Within a class, owners (see `owner_key`) take turns, so one user's bulk upload
+    cannot hold back everyone else's pages.
+
+    With `key_of`, an item whose key matches a waiting item is folded into it with `merge`
+    instead of being queued again; the merged item keeps its place, or moves up to the
+    higher of both priorities.
+
+    Taken items are remembered until the consumer calls `forget()`, so `requeue_nowait()` can
+    hand one back with its priority and original enqueue time.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        starvation_after: float = 60.0,
+        starved_every: int = 4,
+        owner_of: Callable[[Any], Optional[str]] = owner_key,
+        key_of: Optional[Callable[[Any], Optional[str]]] = None,
+        merge: Callable[[Any, Any], Any] = lambda pending, incoming: incoming,
+    ):
+        super().__init__(maxsize)
+        self.starvation_after = starvation_after
+        self.starved_every = max(1, starved_every)
+        # items served since the last starved one; the first starved item goes out at once
+        self._since_starved = self.starved_every - 1
+        self.owner_of = owner_of
+        self.key_of = key_of
+        self.merge = merge
+        self.coalesced = 0
+        # entries handed out and not yet forgotten, matched by identity like the durable queue's claims
+        self._taken: List[_Entry] = []
+        self.wait_stats = WaitStats()
+        self.drain_rate = DrainRate()
+
+    async def put(self, item: T, priority: Priority = Priority.NORMAL) -> None:
+        entry = self._wrap(item, priority)
+        # a duplicate never waits for a free slot
+        if not self._coalesce(entry):
+            await super().put(entry)
+
+    def put_nowait(self, item: T, priority: Priority = Priority.NORMAL) -> None:
+        # asyncio.Queue.put() ends in put_nowait(), by then the item is already wrapped
+        if not isinstance(item, _Entry):
+            item = self._wrap(item, priority)
+        if not self._coalesce(item):
+            super().put_nowait(item)
+
+    def requeue_nowait(self, item: T) -> None:
+        """Put a taken item back in its class and at its age; unknown items go in as NORMAL."""
+        entry = self._taken_entry(item)
+        if entry is None:
+            self.put_nowait(item)
+            return
+        self._taken.remove(entry)
+        self.put_nowait(entry)
+
+    def forget(self, item: T) -> None:
+        """Drop what is remembered of a taken item once the consumer is done with it."""
+        entry = self._taken_entry(item)
+        if entry is not None:
+            self._taken.remove(entry)
+
+    def _taken_entry(self, item: T) -> Optional[_Entry]:
+        return next((entry for entry in self._taken if entry.item is item), None)
+
+    def _wrap(self, item: T, priority: Priority) -> _Entry:
+        key = self.key_of(item) if self.key_of is not None else None
+        return _Entry(Priority(priority), self.owner_of(item), time.monotonic(), item, key)
+
+    def _coalesce(self, entry: _Entry) -> bool:
+        """Merge `entry` into a waiting item with the same key; False if there is none."""
+        pending = self._keyed.get(entry.key) if entry.key is not None else None
+        if pending is None:
+            return False
+        pending.item = self.merge(pending.item, entry.item)
+        if entry.priority < pending.priority:
+            self._lanes[pending.priority].remove(pending)
+            pending.priority = entry.priority
+            self._lanes[pending.priority].append(pending)
+        self.coalesced += 1
+        return True
+
+    def qsize(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def drain_nowait(self) -> List[Tuple[T, Priority]]:
+        """Remove and return every waiting item with its priority, oldest first; they count as done."""
+        entries = sorted(
+            (entry for lane in self._lanes.values() for entries in lane.owners.values() for entry in entries),
+            key=lambda e: e.enqueued_at,
+        )
+        self._init(self.maxsize)
+        for _ in entries:
+            self.task_done()
+        return [(entry.item, entry.priority) for entry in entries]
+
+    # --- asyncio.Queue storage hooks ---
+
+    def _init(self, maxsize: int) -> None:
+        self._lanes: Dict[Priority, _Lane] = {p: _Lane() for p in Priority}
+        self._keyed: Dict[str, _Entry] = {}
+
+    def _put(self, entry: _Entry) -> None:
+        self._lanes[entry.priority].append(entry)
+        if entry.key is not None:
+            self._keyed[entry.key] = entry
+
+    def _get(self) -> T:
+        now = time.monotonic()
+        entry = self._pop_next(now)
+        # once taken, a new item with the same key is new work
+        if entry.key is not None and self._keyed.get(entry.key) is entry:
+            del self._keyed[entry.key]
+        self.wait_stats.record(entry.priority, now - entry.enqueued_at)
+        self.drain_rate.record(now)
+        self._taken.append(entry)
+        return entry.item
+
+    def _pop_next(self, now: float) -> _Entry:
+        heads = [oldest for oldest in (lane.oldest() for lane in self._lanes.values()) if oldest is not None]
+        starved = [e for e in heads if now - e.enqueued_at >= self.starvation_after]
+        if starved and self._since_starved >= self.starved_every - 1:
+            self._since_starved = 0
+            oldest = min(starved, key=lambda e: e.enqueued_at)
+            return self._lanes[oldest.priority].pop_owner(oldest.owner)
+        self._since_starved += 1
+        # lanes are kept in priority order
+        return next(lane for lane in self._lanes.values() if lane).pop_next()
@@ -1,9 +1,15 @@
-import asyncio
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, fields
+from typing import List, Optional, Protocol, TypeVar, runtime_checkable
 
+from app.core.config import get_settings
+from app.database import init_db as dbmod
 from app.schemas.embeddings import EmbeddingJob
 from app.schemas.ocr import PageScanRead
+from app.workflows.queues.coalescing import key_for, merge_items
+from app.workflows.queues.postgres_queue import PostgresQueue
+from app.workflows.queues.priority import Priority, PriorityQueue, WaitStats
+
+T = TypeVar("T")
 
 
 @dataclass
@@ -12,16 +18,112 @@ class ClassificationJob:
     owner_id: str
 
 
+class WorkQueue(Protocol[T]):
+    """The subset of `asyncio.Queue` the pipeline relies on; every queue backend implements it."""
+
+    async def put(self, item: T) -> None: ...
+
+    async def get(self) -> T: ...
+
+    def task_done(self) -> None: ...
+
+    def qsize(self) -> int: ...
+
+
+@runtime_checkable
+class AcknowledgingQueue(Protocol):
+    """Queues that keep an item until the consumer confirms it was processed."""
+
+    async def ack(self, item) -> None: ...
+
+
+@runtime_checkable
+class PrioritizedQueue(Protocol):
+    """Queues whose `put()` takes a `priority` and that measure wait time per priority class."""
+
+    wait_stats: WaitStats
+
+    async def put(self, item, priority: Priority = Priority.NORMAL) -> None: ...
+
+
+async def enqueue(queue: WorkQueue[T], item: T, priority: Priority = Priority.NORMAL) -> None:
+    """Put `item` on `queue` in the given priority class; plain FIFO queues ignore the priority."""
+    if isinstance(queue, PrioritizedQueue):
+        await queue.put(item, priority=priority)
+    else:
+        await queue.put(item)
+
+
+# item type carried by each stage's queue, used to (de)serialize stored items
+STAGE_ITEM_TYPES = {
+    "ocr": PageScanRead,
+    "seg": PageScanRead,
+    "cls": ClassificationJob,
+    "emb": EmbeddingJob,
+}
+
+
 @dataclass
 class QueueRegistry:
-    ocr: asyncio.Queue[PageScanRead]
-    seg: asyncio.Queue[PageScanRead]
-    cls: asyncio.Queue[ClassificationJob]
-    emb: asyncio.Queue[EmbeddingJob]
+    ocr: WorkQueue[PageScanRead]
+    seg: WorkQueue[PageScanRead]
+    cls: WorkQueue[ClassificationJob]
+    emb: WorkQueue[EmbeddingJob]
+
+    async def close(self) -> None:
+        for f in fields(self):
+            close = getattr(getattr(self, f.name), "close", None)
+            if close is not None:
+                await close()
+
+
+def build_queue_registry(backend: str) -> QueueRegistry:
+    backend = backend.lower()
+    settings = get_settings()
+
+    def coalescing(stage: str) -> dict:
+        # waiting duplicates of the same (stage, entity id, version) are merged into one job
+        if not settings.QUEUE_COALESCE:
+            return {}
+        return {"key_of": key_for(stage), "merge": merge_items}
+
+    if backend == "memory":
+
+        def make_memory(stage: str) -> PriorityQueue:
+            return PriorityQueue(
+                maxsize=settings.QUEUE_MAX_SIZE,
+                starvation_after=settings.QUEUE_STARVATION_AFTER_S,
+                starved_every=settings.QUEUE_STARVED_EVERY,
+                **coalescing(stage),
+            )
+
+        return QueueRegistry(**{stage: make_memory(stage) for stage in STAGE_ITEM_TYPES})
+
+    if backend == "postgres":
+
+        def make(name: str, item_type):
+            return PostgresQueue(
+                name,
+                item_type,
+                dbmod.SessionMaker,
+                visibility_timeout=settings.QUEUE_VISIBILITY_TIMEOUT_S,
+                poll_interval=settings.QUEUE_POLL_INTERVAL_S,
+                listen_dsn=settings.sync_db_url,
+                starvation_after=settings.QUEUE_STARVATION_AFTER_S,
+                starved_every=settings.QUEUE_STARVED_EVERY,
+                **coalescing(name),
+            )
+
+        return QueueRegistry(**{stage: make(stage, item_type) for stage, item_type in STAGE_ITEM_TYPES.items()})
+
+    raise ValueError(f"Unsupported queue backend: {backend}")
 
 
-_default_registry = QueueRegistry(asyncio.Queue(), asyncio.Queue(), asyncio.Queue(), asyncio.Queue())
+_default_registry: Optional[QueueRegistry] = None
 
 
 def get_queue_registry() -> QueueRegistry:
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = build_queue_registry(get_settings().QUEUE_BACKEND)
     return _default_registry
@@ -0,0 +1,96 @@
+"""
+In-memory queues lose their contents when the process stops. On shutdown their remaining items
+are spilled into the `job_queue` table under `<stage>.spill` and replayed on the next start.
+Durable queues keep their jobs anyway and are skipped.
+
+Restoring runs before the workers start, so it never waits for room: what does not fit into a
+bounded queue stays spilled until the next start.
+"""
+
+import asyncio
+import logging
+from dataclasses import fields
+from typing import Any, Callable, Dict, List, Tuple
+
+from pydantic import TypeAdapter
+
+from app.repos.job_queue import JobQueueRepository
+from app.workflows.queues.priority import Priority, owner_key
+from app.workflows.queues.queues import STAGE_ITEM_TYPES, AcknowledgingQueue, PrioritizedQueue, QueueRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def spill_name(stage: str) -> str:
+    return f"{stage}.spill"
+
+
+def _take_waiting(queue) -> List[Tuple[Any, Priority]]:
+    drain = getattr(queue, "drain_nowait", None)
+    if drain is not None:
+        return drain()
+    # plain asyncio.Queue
+    items = []
+    while not queue.empty():
+        items.append((queue.get_nowait(), Priority.NORMAL))
+        queue.task_done()
+    return items
+
+
+def _enqueue_nowait(queue, item: Any, priority: Priority) -> None:
+    if isinstance(queue, PrioritizedQueue):
+        queue.put_nowait(item, priority=priority)
+    else:
+        queue.put_nowait(item)
+
+
+async def persist_queues(queues: QueueRegistry, session_maker: Callable[[], Any]) -> Dict[str, int]:
+    """Move the waiting items of every in-memory queue into the database."""
+    spilled: Dict[str, int] = {}
+    for f in fields(queues):
+        stage, queue = f.name, getattr(queues, f.name)
+        if isinstance(queue, AcknowledgingQueue):
+            continue
+        items = _take_waiting(queue)
+        if not items:
+            continue
+        adapter = TypeAdapter(STAGE_ITEM_TYPES[stage])
+        async with session_maker() as session:
+            repo = JobQueueRepository(session)
+            for item, priority in items:
+                await repo.enqueue(
+                    spill_name(stage), adapter.dump_python(item, mode="json"), priority, owner=owner_key(item)
+                )
+        spilled[stage] = len(items)
+        logger.info(f"Persisted {len(items)} queued {stage} item(s) for the next start")
+    return spilled
+
+
+async def restore_queues(queues: QueueRegistry, session_maker: Callable[[], Any]) -> Dict[str, int]:
+    """Replay items persisted by `persist_queues()` into the in-memory queues."""
+    restored: Dict[str, int] = {}
+    for f in fields(queues):
+        stage, queue = f.name, getattr(queues, f.name)
+        if isinstance(queue, AcknowledgingQueue):
+            continue
+        async with session_maker() as session:
+            repo = JobQueueRepository(session)
+            jobs = await repo.list_all(spill_name(stage))
+            if not jobs:
+                continue
+            adapter = TypeAdapter(STAGE_ITEM_TYPES[stage])
+            count = 0
+            for job in jobs:
+                try:
+                    _enqueue_nowait(queue, adapter.validate_python(job.payload), Priority(job.priority))
+                except asyncio.QueueFull:
+                    logger.warning(
+                        f"{stage} queue is full, {len(jobs) - count} item(s) stay spilled for the next start"
+                    )
+                    break
+                # deleted once queued: a failed restore leaves the rest for the next start
+                await repo.discard(job.id)
+                count += 1
+        restored[stage] = count
+        logger.info(f"Restored {count} {stage} item(s) queued before the last shutdown")
+    return restored
@@ -1,11 +1,14 @@
-import asyncio
 import logging
-from typing import Dict, Optional, Tuple, cast, get_args
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, cast, get_args
 
 from app.ports.embedding_store import IEmbeddingStore
 from app.schemas.embeddings import EmbeddingJob, EmbeddingPipelineTargets
 from app.services.embedding_service import EmbeddingService
 from app.workflows.base_worker import BaseWorker
+from app.workflows.queues.dead_letters import DeadLetterStore
+from app.workflows.queues.queues import WorkQueue
+from app.workflows.retry import NO_RETRY, RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -13,25 +16,58 @@ logger = logging.getLogger(__name__)
 class EmbeddingWorker(BaseWorker[EmbeddingJob]):
     def __init__(
         self,
-        entry_queue: asyncio.Queue[EmbeddingJob],
+        entry_queue: WorkQueue[EmbeddingJob],
         service: EmbeddingService,
         stores: Dict[str, IEmbeddingStore],
         current_version: str,
         worker_name: Optional[str] = None,
+        concurrency: int = 1,
+        retry_policy: RetryPolicy = NO_RETRY,
+        dead_letters: Optional[DeadLetterStore] = None,
+        batch_size: int = 1,
+        batch_wait_ms: float = 0.0,
     ):
-        super().__init__(entry_queue, worker_name or "EmbeddingWorker")
+        super().__init__(
+            entry_queue,
+            worker_name or "EmbeddingWorker",
+            concurrency=concurrency,
+            stage="emb",
+            retry_policy=retry_policy,
+            dead_letters=dead_letters,
+            batch_size=batch_size,
+            batch_wait_ms=batch_wait_ms,
+        )
         self.service = service
         self.stores = stores
         logger.info(f"Embedding worker uses these stores: {list(self.stores.keys())}")
         self.current_version = current_version
 
-    async def handle(self, job: EmbeddingJob):
+    def _store_keys(self, job: EmbeddingJob) -> List[str]:
         version = job.version or self.current_version
         default_targets: Tuple[str, ...] = cast(Tuple[str, ...], get_args(EmbeddingPipelineTargets))
         targets = list(job.targets) if job.targets else list(default_targets)
         vector_store_keys = [f"{t}:{version}" for t in targets]
         logger.info("Embedding targets: %s", vector_store_keys)
-        used = [self.stores[k] for k in vector_store_keys if k in self.stores]
+        return [k for k in vector_store_keys if k in self.stores]
+
+    async def handle_batch(self, jobs: List[EmbeddingJob]) -> Dict[int, Exception]:
+        """Embed the recipes of all jobs with one call per store."""
+        by_store: Dict[str, List[EmbeddingJob]] = defaultdict(list)
+        for job in jobs:
+            keys = self._store_keys(job)
+            if not keys:
+                logger.warning("No stores resolved for job %s", job.model_dump())
+            for k in keys:
+                by_store[k].append(job)
+        for k, store_jobs in by_store.items():
+            n = await self.service.index_many(
+                self.stores[k], [(job.recipe_id, job.user_id, job.reindex) for job in store_jobs]
+            )
+            logger.info("Indexed %s chunks of %s recipes into %s", n, len(store_jobs), k)
+        return {}
+
+    async def handle(self, job: EmbeddingJob):
+        used = [self.stores[k] for k in self._store_keys(job)]
         if not used:
             logger.warning("No stores resolved for job %s", job.model_dump())
             return
@@ -0,0 +1,29 @@
+import random
+from dataclasses import dataclass, field
+from typing import Tuple, Type
+
+from app.ports.errors import TRANSIENT_ERRORS
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How a worker retries a failed item before it is dead-lettered.
+    Delays grow exponentially from `base_delay` up to `max_delay`, with full jitter.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    retry_on: Tuple[Type[BaseException], ...] = field(default=TRANSIENT_ERRORS)
+
+    def should_retry(self, exc: BaseException, attempt: int) -> bool:
+        return attempt < self.max_attempts and isinstance(exc, self.retry_on)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+# retry nothing: the first failure is final
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -1,14 +1,16 @@
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
+from app.infra.graph_checkpoints import GRAPH_CHECKPOINTER
 from app.schemas.ocr import SegmentationGraphState
 from app.workflows.segmentation.nodes.approve_segmentation import approve_segmentation
 from app.workflows.segmentation.nodes.interrupt_segmentation import interrupt_segmentation
+from app.workflows.segmentation.nodes.routers import route_after_segmentation
 from app.workflows.segmentation.nodes.start_segmentation import start_segmentation
 
 
-def build_segmentation_graph(checkpointer: InMemorySaver = InMemorySaver()):
+def build_segmentation_graph(checkpointer: BaseCheckpointSaver = GRAPH_CHECKPOINTER):
     builder = StateGraph(SegmentationGraphState)
 
     builder.add_node("start_segmentation", start_segmentation)
@@ -19,7 +21,14 @@ def build_segmentation_graph(checkpointer: InMemorySaver = InMemorySaver()):
         START,
         "start_segmentation",
     )
-    builder.add_edge("start_segmentation", "interrupt_segmentation")
+    builder.add_conditional_edges(
+        "start_segmentation",
+        route_after_segmentation,
+        {
+            "to_user_review": "interrupt_segmentation",
+            "to_approval": "approve_segmentation",
+        },
+    )
     builder.add_edge("interrupt_segmentation", "approve_segmentation")
     builder.add_edge("approve_segmentation", END)
 
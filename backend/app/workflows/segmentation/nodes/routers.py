@@ -0,0 +1,11 @@
+from app.schemas.ocr import SegmentationGraphState
+
+
+def route_after_segmentation(state: SegmentationGraphState, config) -> str:
+    # confident segmentations are approved without asking the user; no threshold means always ask
+    threshold = config["configurable"].get("auto_approve_confidence")
+    confidence = state.segmentation.confidence if state.segmentation else None
+
+    if threshold is not None and confidence is not None and confidence >= threshold:
+        return "to_approval"
+    return "to_user_review"
@@ -11,10 +11,8 @@ _locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 logger = logging.getLogger(__name__)
 
 
-# TODO: make this part of the worker thread, by adjusting what kind of object the queue takes.
-#   the worker then works on intial and on resume tasks, all segmentation work is done by the segmenteation worker
-#  this could also not be diffictul if a lot of scans are added, we want to have the approval to have priority, w
-#  e would need a priority queue for this to work
+# Approvals resume the graph directly in the request instead of going through the segmentation queue,
+# so they never wait behind scan work. Re-triggered pages jump the queue via Priority.INTERACTIVE.
 async def approve_segments(
     page_id: str,
     segmentation: SegmentationApproval,
@@ -1,5 +1,5 @@
-import asyncio
 import logging
+from typing import Optional
 
 from app.ports.segmentation import SegmentationService
 from app.ports.storage import StorageService
@@ -7,6 +7,9 @@ from app.repos.image_repo import ImageRepository
 from app.routes.status import broadcast_status
 from app.schemas.ocr import GraphBroadCast, PageScanRead, PageScanUpdate, PageStatus, SegmentationGraphState
 from app.workflows.base_worker import BaseWorker
+from app.workflows.queues.dead_letters import DeadLetterStore
+from app.workflows.queues.queues import WorkQueue
+from app.workflows.retry import NO_RETRY, RetryPolicy
 from app.workflows.segmentation.graph_builder import build_segmentation_graph
 
 logger = logging.getLogger(__name__)
@@ -16,22 +19,35 @@ SEG_GRAPH = build_segmentation_graph()
 class SegmentationWorker(BaseWorker[PageScanRead]):
     def __init__(
         self,
-        seg_queue: asyncio.Queue[PageScanRead],
+        seg_queue: WorkQueue[PageScanRead],
         image_repo: ImageRepository,
         segmentation_service: SegmentationService,
         storage: StorageService,
+        concurrency: int = 1,
+        auto_approve_confidence: Optional[float] = None,
+        retry_policy: RetryPolicy = NO_RETRY,
+        dead_letters: Optional[DeadLetterStore] = None,
     ):
-        (super().__init__(entry_queue=seg_queue),)
+        (
+            super().__init__(
+                entry_queue=seg_queue,
+                concurrency=concurrency,
+                stage="seg",
+                retry_policy=retry_policy,
+                dead_letters=dead_letters,
+            ),
+        )
         self.seg = segmentation_service
         self.page_repo = image_repo
         self.storage = storage
+        self.auto_approve_confidence = auto_approve_confidence
 
     async def handle(self, next_page: PageScanRead):
         page_id = next_page.id
         logger.info(f"Processing image: {page_id}")
 
         # Load image from storage
-        ocr_result = await self.storage.read_json(page_id)
+        ocr_result = await self.storage.read_ocr(page_id)
         logger.info("Read OCR result from storage")
         state = SegmentationGraphState(
             page_record_id=page_id,
@@ -44,6 +60,7 @@ class SegmentationWorker(BaseWorker[PageScanRead]):
                 "storage": self.storage,
                 "page_repo": self.page_repo,
                 "thread_id": page_id,
+                "auto_approve_confidence": self.auto_approve_confidence,
             }
         }
 
@@ -53,7 +70,7 @@ class SegmentationWorker(BaseWorker[PageScanRead]):
         result = await SEG_GRAPH.ainvoke(state, config=config)
         logger.debug(f"Segmentation graph result: {result}")
 
-        if result["__interrupt__"]:
+        if result.get("__interrupt__"):
             # we update the database with the preliminary segmentation, the frontend will request this data
             result = await self.page_repo.update(
                 PageScanUpdate(
@@ -68,4 +85,9 @@ class SegmentationWorker(BaseWorker[PageScanRead]):
             logger.info(f"Awaiting approval for image {page_id}")
         # We do not put into the next queue as all pages require segmentation before we continue
         else:
-            logger.info(f"Finished segmentation for image {page_id}")
+            # confident enough: approve_segmentation already stored the segments
+            logger.info(f"Finished segmentation for image {page_id}, approved automatically")
+
+    async def on_dead_letter(self, item: PageScanRead, exc: Exception):
+        await self.page_repo.update(PageScanUpdate(id=item.id, status=PageStatus.FAILED))
+        await broadcast_status(GraphBroadCast(type="image", id=item.id, status=PageStatus.FAILED))
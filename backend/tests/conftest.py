@@ -273,6 +273,8 @@ def force_mock_services():
     settings.THUMBNAIL_TYPE = "mock"
     settings.SEGMENTATION = "mock"
     settings.LLM_API_PROVIDER = "mock"
+    # CPU work runs in-process, so tests can monkeypatch it
+    settings.CPU_POOL_WORKERS = 0
 
 
 @pytest_asyncio.fixture
@@ -2,11 +2,13 @@ import pytest
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 
+from app.database.init_db import backfill_record_pages
 from app.models.ocr import BookScanORM, ClassificationRecordORM
 from app.repos.classification_record import ClassificationRecordRepository
 from app.schemas.ocr import (
     ClassificationRecordCreate,
     ClassificationRecordUpdate,
+    Page,
     RecordStatus,
 )
 
@@ -335,3 +337,40 @@ async def test_get_all_owned_by_book_id_filters_out_foreign_records(db_session,
     out = await repo.get_all_owned_by_book_id(foreign_book.id, owner_id=test_user.id)
 
     assert out == []
+
+
+@pytest.mark.asyncio
+async def test_used_page_ids_follow_record_pages(db_session, test_user, user_factory):
+    book = await _make_book(db_session, test_user.id, "Scan Pages")
+    other_book = await _make_book(db_session, test_user.id, "Other Scan")
+    repo = ClassificationRecordRepository(db_session)
+    first = await repo.save(ClassificationRecordCreate(book_scan_id=book.id), owner_id=test_user.id)
+    second = await repo.save(ClassificationRecordCreate(book_scan_id=book.id), owner_id=test_user.id)
+    elsewhere = await repo.save(ClassificationRecordCreate(book_scan_id=other_book.id), owner_id=test_user.id)
+
+    await repo.update(ClassificationRecordUpdate(id=first.id, text_pages=[Page(id="t1"), Page(id="t2")]))
+    await repo.update(ClassificationRecordUpdate(id=second.id, text_pages=[Page(id="t2")], image_pages=[Page(id="i1")]))
+    await repo.update(ClassificationRecordUpdate(id=elsewhere.id, text_pages=[Page(id="x1")]))
+    assert await repo.get_used_page_ids(book.id, owner_id=test_user.id) == {"t1", "t2", "i1"}
+
+    # regrouped: the dropped page is free again
+    await repo.update(ClassificationRecordUpdate(id=first.id, text_pages=[Page(id="t1")]))
+    await repo.delete(second.id, owner_id=test_user.id)
+    assert await repo.get_used_page_ids(book.id) == {"t1"}
+
+    with pytest.raises(NoResultFound):
+        await repo.get_used_page_ids(book.id, owner_id=(await user_factory()).id)
+
+
+@pytest.mark.asyncio
+async def test_backfill_links_pages_of_existing_records(db_session, test_user):
+    book = await _make_book(db_session, test_user.id, "Old Scan")
+    await _make_record(db_session, book.id, pages={"text_pages": [{"id": "t1"}], "image_pages": [{"id": "i1"}]})
+    await _make_record(db_session, book.id)
+
+    linked = await db_session.run_sync(lambda session: backfill_record_pages(session.connection()))
+    await db_session.commit()
+
+    assert linked == 2
+    repo = ClassificationRecordRepository(db_session)
+    assert await repo.get_used_page_ids(book.id) == {"t1", "i1"}
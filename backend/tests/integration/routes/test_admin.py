@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+
+import app.core.deps as deps
+from app.main import app as fastapi_app
+from app.repos.dead_letter import DeadLetterRepository
+from app.schemas.ocr import PageScanRead
+from app.workflows.queues.queues import QueueRegistry
+
+
+@pytest.fixture
+def as_admin(test_user):
+    fastapi_app.dependency_overrides[deps.get_current_active_admin] = lambda: test_user
+    yield test_user
+    fastapi_app.dependency_overrides.pop(deps.get_current_active_admin, None)
+
+
+@pytest.fixture
+def ocr_registry():
+    registry = QueueRegistry(ocr=asyncio.Queue(), seg=asyncio.Queue(), cls=asyncio.Queue(), emb=asyncio.Queue())
+    fastapi_app.dependency_overrides[deps.get_queue_registry] = lambda: registry
+    yield registry
+    fastapi_app.dependency_overrides.pop(deps.get_queue_registry, None)
+
+
+async def add_dead_page(db_session, page_id: str):
+    page = PageScanRead(id=page_id, filename=f"{page_id}.jpg", bookScanID="b1", page_number=1, scanDate=datetime.now())
+    return await DeadLetterRepository(db_session).add(
+        stage="ocr",
+        worker="OCRWorker",
+        payload=page.model_dump(mode="json"),
+        error="TransientServiceError: Google Vision API error: 503",
+        traceback="Traceback ...",
+        attempts=5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_dead_letters_require_admin(authed_client_session: AsyncClient):
+    resp = await authed_client_session.get("/api/v1/admin/dead_letters")
+    assert resp.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_list_and_inspect_dead_letters(authed_client_session: AsyncClient, as_admin, db_session):
+    dead = await add_dead_page(db_session, "dead-page-1")
+
+    resp = await authed_client_session.get("/api/v1/admin/dead_letters", params={"stage": "ocr"})
+    assert resp.status_code == 200
+    assert dead.id in [d["id"] for d in resp.json()]
+
+    resp = await authed_client_session.get(f"/api/v1/admin/dead_letters/{dead.id}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["attempts"] == 5
+    assert body["payload"]["id"] == "dead-page-1"
+    assert "503" in body["error"]
+
+
+@pytest.mark.asyncio
+async def test_requeue_puts_item_back_on_its_stage(
+    authed_client_session: AsyncClient, as_admin, ocr_registry, db_session
+):
+    dead = await add_dead_page(db_session, "dead-page-2")
+
+    resp = await authed_client_session.post(f"/api/v1/admin/dead_letters/{dead.id}/requeue")
+    assert resp.status_code == 200
+    assert resp.json()["requeued_at"] is not None
+
+    page = ocr_registry.ocr.get_nowait()
+    assert isinstance(page, PageScanRead)
+    assert page.id == "dead-page-2"
+
+    # requeued letters are hidden by default
+    resp = await authed_client_session.get("/api/v1/admin/dead_letters")
+    assert dead.id not in [d["id"] for d in resp.json()]
+
+
+@pytest.mark.asyncio
+async def test_delete_dead_letter(authed_client_session: AsyncClient, as_admin, db_session):
+    dead = await add_dead_page(db_session, "dead-page-3")
+
+    resp = await authed_client_session.delete(f"/api/v1/admin/dead_letters/{dead.id}")
+    assert resp.status_code == 200
+    resp = await authed_client_session.get(f"/api/v1/admin/dead_letters/{dead.id}")
+    assert resp.status_code == 404
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 
@@ -5,6 +7,7 @@ import app.core.deps as deps
 from app.main import app as fastapi_app
 from app.models.recipe import Recipe
 from app.schemas.embeddings import EmbeddingJob
+from app.workflows.queues.debounce import Debouncer, get_debouncer
 from app.workflows.queues.queues import QueueRegistry
 
 
@@ -26,11 +29,14 @@ def queue_registry_fixture(queues):
     )
 
     fastapi_app.dependency_overrides[deps.get_queue_registry] = lambda: registry
+    # enqueue immediately, debouncing has its own test
+    fastapi_app.dependency_overrides[get_debouncer] = lambda: Debouncer(window_s=0)
 
     yield registry
 
     # cleanup
     fastapi_app.dependency_overrides.pop(deps.get_queue_registry, None)
+    fastapi_app.dependency_overrides.pop(get_debouncer, None)
 
 
 # --------------------------------------------------------------------
@@ -132,3 +138,24 @@ async def test_reindex_all_no_recipes(
     assert resp.status_code in (200, 204)
 
     assert emb_q.empty()
+
+
+@pytest.mark.asyncio
+async def test_trigger_embedding_bursts_collapse_into_one_job(
+    authed_client_session: AsyncClient,
+    queue_registry_fixture: QueueRegistry,
+):
+    client = authed_client_session
+    emb_q = queue_registry_fixture.emb
+    debouncer = Debouncer(window_s=0.05)
+    fastapi_app.dependency_overrides[get_debouncer] = lambda: debouncer
+
+    for targets in ("local_bge", "mistralai", "local_bge"):
+        resp = await client.post(f"/api/v1/embeddings/burst?reindex=false&targets={targets}")
+        assert resp.status_code == 200
+    assert emb_q.empty()
+
+    job = await asyncio.wait_for(emb_q.get(), timeout=1)
+    assert job.recipe_id == "burst"
+    assert list(job.targets) == ["local_bge", "mistralai"]
+    assert emb_q.empty()
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from app.core.config import get_settings
 from app.core.deps import (
     get_book_repo,
     get_classification_repo,
@@ -16,7 +17,8 @@ from app.main import app as fastapi_app
 from app.models.ocr import BookScanORM
 from app.schemas.ocr import BookScanRead, ClassificationRecordRead, Page, PageScanRead
 from app.services.image_ingest_service import ImageIngestService
-from app.workflows.queues.queues import ClassificationJob, QueueRegistry, get_queue_registry
+from app.workflows.queues.priority import PriorityQueue
+from app.workflows.queues.queues import ClassificationJob, Priority, QueueRegistry, get_queue_registry
 
 
 @pytest.fixture
@@ -270,6 +272,87 @@ async def test_upload_pages_success(override_image_service, authed_client_sessio
     assert args[2] == test_user.id
 
 
+@pytest.mark.asyncio
+async def test_upload_pages_rejected_when_ocr_queue_is_saturated(
+    override_image_service, authed_client_session, db_session, test_user, monkeypatch
+):
+    book = BookScanORM(title="Busy Book", user_id=test_user.id)
+    db_session.add(book)
+    await db_session.commit()
+
+    monkeypatch.setattr(get_settings(), "OCR_QUEUE_HIGH_WATER", 3)
+    ocr_q = PriorityQueue()
+    for i in range(3):
+        await ocr_q.put(f"queued-{i}")
+    fastapi_app.dependency_overrides[get_queue_registry] = lambda: QueueRegistry(
+        ocr=ocr_q, seg=PriorityQueue(), cls=PriorityQueue(), emb=PriorityQueue()
+    )
+    try:
+        files = [("files", ("page1.jpg", io.BytesIO(b"fake-image-1"), "image/jpeg"))]
+        response = await authed_client_session.post(f"/api/v1/recipescanner/upload/{book.id}", files=files)
+
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert response.json()["stage"] == "ocr"
+        override_image_service.ingest_pages.assert_not_awaited()
+
+        status = await authed_client_session.get("/api/v1/recipescanner/queues")
+        assert status.status_code == 200
+        assert [s["stage"] for s in status.json()] == ["ocr", "seg", "cls", "emb"]
+        ocr_status = next(s for s in status.json() if s["stage"] == "ocr")
+        assert ocr_status["depth"] == 3
+        assert ocr_status["high_water"] == 3
+        assert ocr_status["saturated"] is True
+    finally:
+        fastapi_app.dependency_overrides.pop(get_queue_registry, None)
+
+
+@pytest.mark.asyncio
+async def test_classify_book_scan_enqueues_bulk_job(authed_client_session, db_session, test_user):
+    book = BookScanORM(title="Whole Book", user_id=test_user.id)
+    db_session.add(book)
+    await db_session.commit()
+
+    mock_image_repo = AsyncMock()
+    mock_image_repo.list_by_book.return_value = [
+        PageScanRead(id="p1", page_number=1, filename="p1.jpg", bookScanID=book.id, scanDate=datetime.datetime.now())
+    ]
+    cls_q = PriorityQueue()
+    fastapi_app.dependency_overrides[get_image_repo] = lambda: mock_image_repo
+    fastapi_app.dependency_overrides[get_queue_registry] = lambda: QueueRegistry(
+        ocr=PriorityQueue(), seg=PriorityQueue(), cls=cls_q, emb=None
+    )
+    try:
+        response = await authed_client_session.post(f"/api/v1/recipescanner/classify_book_scan/{book.id}")
+
+        assert response.status_code == 200
+        [(job, priority)] = cls_q.drain_nowait()
+        assert priority == Priority.BULK
+        assert [page.id for page in job.pages] == ["p1"]
+        assert job.owner_id == test_user.id
+    finally:
+        fastapi_app.dependency_overrides.pop(get_image_repo, None)
+        fastapi_app.dependency_overrides.pop(get_queue_registry, None)
+
+
+@pytest.mark.asyncio
+async def test_ocr_cache_status(authed_client_session):
+    response = await authed_client_session.get("/api/v1/recipescanner/ocr_cache")
+
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+    for entry in response.json():
+        assert set(entry) == {"backend", "hits", "misses", "hit_rate"}
+
+
+@pytest.mark.asyncio
+async def test_ocr_backend_status(authed_client_session):
+    response = await authed_client_session.get("/api/v1/recipescanner/ocr_backends")
+
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+
 @pytest.mark.asyncio
 async def test_add_page_success(authed_client_session, test_user):
     mock_class_repo = AsyncMock()
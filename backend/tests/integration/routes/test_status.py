@@ -5,7 +5,7 @@ from httpx import AsyncClient
 from starlette.testclient import TestClient
 
 from app.main import app as fastapi_app
-from app.routes.status import active_clients, broadcast_status
+from app.routes.status import active_clients, broadcast_status, relay_status
 from app.schemas.ocr import GraphBroadCast, PageStatus
 
 # -----------------------------------------------------------
@@ -93,3 +93,26 @@ async def test_broadcast_status_removes_dead_clients(monkeypatch):
     assert fake_ws not in active_clients
 
     active_clients.clear()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_status_is_relayed_from_processes_without_websockets():
+    fake_ws = AsyncMock()
+    active_clients.add(fake_ws)
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+
+    relay_status(lambda: session)
+    try:
+        msg = GraphBroadCast(type="image", id="p1", status=PageStatus.NEEDS_REVIEW)
+        await broadcast_status(msg)
+    finally:
+        relay_status(None)
+        active_clients.clear()
+
+    # the payload goes out as a NOTIFY, the API process passes it on
+    fake_ws.send_text.assert_not_awaited()
+    statement = session.execute.await_args.args[0]
+    assert "pg_notify" in str(statement)
+    assert set(statement.compile().params.values()) == {"status_broadcast", msg.model_dump_json()}
+    session.commit.assert_awaited_once()
@@ -0,0 +1,263 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.job_queue import QueuedJobORM
+from app.schemas.embeddings import EmbeddingJob
+from app.schemas.ocr import PageScanRead
+from app.workflows.base_worker import BaseWorker
+from app.workflows.queues.admission import stage_status
+from app.workflows.queues.coalescing import key_for, merge_items
+from app.workflows.queues.postgres_queue import PostgresQueue
+from app.workflows.queues.priority import Priority
+from app.workflows.queues.queues import ClassificationJob
+
+
+def make_page(page_id: str) -> PageScanRead:
+    return PageScanRead(id=page_id, filename=f"{page_id}.jpg", bookScanID="b1", page_number=1, scanDate=datetime.now())
+
+
+async def count_rows(session_maker, queue: str) -> int:
+    async with session_maker() as s:
+        return (await s.execute(select(func.count(QueuedJobORM.id)).where(QueuedJobORM.queue == queue))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_put_get_roundtrip_preserves_type_and_order(session_maker):
+    q = PostgresQueue("emb", EmbeddingJob, session_maker, poll_interval=0.01)
+
+    await q.put(EmbeddingJob(recipe_id="r1", user_id="u1"))
+    await q.put(EmbeddingJob(recipe_id="r2", user_id="u1", reindex=True, targets=["local_bge"]))
+
+    first = await q.get()
+    second = await q.get()
+
+    assert isinstance(first, EmbeddingJob)
+    assert first.recipe_id == "r1"
+    assert second.recipe_id == "r2"
+    assert second.reindex is True
+    assert list(second.targets) == ["local_bge"]
+
+
+@pytest.mark.asyncio
+async def test_dataclass_items_with_nested_models(session_maker):
+    q = PostgresQueue("cls", ClassificationJob, session_maker, poll_interval=0.01)
+
+    await q.put(ClassificationJob(pages=[make_page("p1"), make_page("p2")], owner_id="u1"))
+    job = await q.get()
+
+    assert isinstance(job, ClassificationJob)
+    assert [p.id for p in job.pages] == ["p1", "p2"]
+    assert isinstance(job.pages[0], PageScanRead)
+
+
+@pytest.mark.asyncio
+async def test_claimed_job_is_hidden_from_other_consumers_until_ack(session_maker):
+    producer = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01)
+    consumer_a = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01)
+    consumer_b = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01)
+
+    await producer.put(make_page("p1"))
+    item = await consumer_a.get()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(consumer_b.get(), timeout=0.1)
+
+    await consumer_a.ack(item)
+    assert await count_rows(session_maker, "ocr") == 0
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_job_reappears_after_visibility_timeout(session_maker):
+    q = PostgresQueue("seg", PageScanRead, session_maker, visibility_timeout=0.05, poll_interval=0.01)
+    crashing = PostgresQueue("seg", PageScanRead, session_maker, visibility_timeout=0.05, poll_interval=0.01)
+
+    await q.put(make_page("p1"))
+    await crashing.get()
+    await crashing.close()  # the consumer dies without ack
+
+    again = await asyncio.wait_for(q.get(), timeout=1)
+    assert again.id == "p1"
+
+    async with session_maker() as s:
+        row = (await s.execute(select(QueuedJobORM).where(QueuedJobORM.queue == "seg"))).scalar_one()
+    assert row.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_claim_is_extended_while_the_item_is_worked_on(session_maker):
+    q = PostgresQueue("seg", PageScanRead, session_maker, visibility_timeout=0.1, poll_interval=0.01)
+
+    await q.put(make_page("p1"))
+    item = await q.get()
+    await asyncio.sleep(0.35)
+    q.abandon(item)
+    await asyncio.sleep(0.05)  # an extension under way finishes
+
+    async with session_maker() as s:
+        row = (await s.execute(select(QueuedJobORM).where(QueuedJobORM.queue == "seg"))).scalar_one()
+    # hidden well past the first timeout, and never handed out again
+    assert (row.visible_at - row.enqueued_at).total_seconds() > 0.3
+    assert row.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_queues_are_isolated_by_name_and_depth_counts_visible_jobs(session_maker):
+    ocr = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01)
+    seg = PostgresQueue("seg", PageScanRead, session_maker, poll_interval=0.01)
+
+    await ocr.put(make_page("p1"))
+    await ocr.put(make_page("p2"))
+
+    assert await ocr.depth() == 2
+    assert await seg.depth() == 0
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(seg.get(), timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_drain_rate_is_shared_between_processes(session_maker):
+    worker_side = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01)
+    api_side = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01)
+    for i in range(3):
+        await worker_side.put(make_page(f"p{i}"))
+
+    for _ in range(3):
+        await worker_side.ack(await worker_side.get())
+
+    # the API process never claimed anything, yet sees the jobs drain
+    assert await api_side.drain_rate_per_s() == pytest.approx(3.0)
+    assert (await stage_status("ocr", api_side)).drain_rate_per_s == pytest.approx(3.0)
+
+
+@pytest.mark.asyncio
+async def test_get_waits_for_put(session_maker):
+    # no polling: the put itself has to wake the waiting consumer
+    q = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=60)
+
+    getter = asyncio.create_task(q.get())
+    await asyncio.sleep(0.05)
+    assert not getter.done()
+
+    await q.put(make_page("late"))
+    item = await asyncio.wait_for(getter, timeout=1)
+    assert item.id == "late"
+
+
+class CollectingWorker(BaseWorker[PageScanRead]):
+    def __init__(self, queue, fail_on=()):
+        # the SQLite test engine shares one connection between sessions, so claims and acks must not interleave
+        super().__init__(queue, concurrency=1)
+        self.fail_on = set(fail_on)
+        self.seen = []
+
+    async def handle(self, item: PageScanRead):
+        self.seen.append(item.id)
+        if item.id in self.fail_on:
+            raise RuntimeError("handler failed")
+
+
+@pytest.mark.asyncio
+async def test_worker_acknowledges_processed_items(session_maker):
+    q = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01)
+    for pid in ["p1", "p2", "p3"]:
+        await q.put(make_page(pid))
+
+    worker = CollectingWorker(q, fail_on={"p2"})
+    runner = asyncio.create_task(worker.run())
+    # poll the worker, not the table: a second session on the shared connection could roll back an ack
+    for _ in range(100):
+        if len(worker.seen) == 3:
+            break
+        await asyncio.sleep(0.02)
+    # shutdown lets the last acknowledgement finish
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+
+    assert sorted(worker.seen) == ["p1", "p2", "p3"]
+    assert await count_rows(session_maker, "ocr") == 0
+
+
+@pytest.mark.asyncio
+async def test_claims_follow_priority_with_starvation_protection(session_maker):
+    q = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01, starvation_after=3600)
+    await q.put(make_page("bulk"), priority=Priority.BULK)
+    await q.put(make_page("normal"))
+    await q.put(make_page("interactive"), priority=Priority.INTERACTIVE)
+
+    assert [(await q.get()).id for _ in range(3)] == ["interactive", "normal", "bulk"]
+    stats = q.wait_stats.snapshot()
+    assert stats["interactive"]["count"] == stats["normal"]["count"] == stats["bulk"]["count"] == 1
+
+    starving = PostgresQueue("seg", PageScanRead, session_maker, poll_interval=0.01, starvation_after=0.05)
+    await starving.put(make_page("bulk-old"), priority=Priority.BULK)
+    await asyncio.sleep(0.1)
+    await starving.put(make_page("interactive-new"), priority=Priority.INTERACTIVE)
+
+    assert (await starving.get()).id == "bulk-old"
+
+
+@pytest.mark.asyncio
+async def test_aged_backlog_does_not_turn_claims_into_fifo(session_maker):
+    q = PostgresQueue("ocr", PageScanRead, session_maker, poll_interval=0.01, starvation_after=0.05, starved_every=4)
+    for n in range(20):
+        await q.put(make_page(f"a-{n}"), priority=Priority.BULK)
+    await asyncio.sleep(0.1)
+    other = make_page("b")
+    other.bookScanID = "b2"
+    await q.put(other, priority=Priority.BULK)
+    await q.put(make_page("interactive"), priority=Priority.INTERACTIVE)
+
+    claimed = [(await q.get()).id for _ in range(22)]
+
+    # one starved job, then priority and turns again
+    assert claimed[:3] == ["a-0", "interactive", "b"]
+    assert [i for i in claimed if i.startswith("a-")] == [f"a-{n}" for n in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_claims_rotate_between_owners(session_maker):
+    q = PostgresQueue("cls", ClassificationJob, session_maker, poll_interval=0.01, starvation_after=3600)
+    for i in range(3):
+        await q.put(ClassificationJob(pages=[make_page(f"big-{i}")], owner_id="heavy-user"))
+    await q.put(ClassificationJob(pages=[make_page("small-0")], owner_id="light-user"))
+
+    served = [(await q.get()).pages[0].id for _ in range(4)]
+
+    assert served == ["big-0", "small-0", "big-1", "big-2"]
+
+
+@pytest.mark.asyncio
+async def test_waiting_duplicates_are_merged_into_one_job(session_maker):
+    q = PostgresQueue("emb", EmbeddingJob, session_maker, poll_interval=0.01, key_of=key_for("emb"), merge=merge_items)
+
+    await q.put(EmbeddingJob(recipe_id="r1", user_id="u1", targets=["local_bge"]), priority=Priority.BULK)
+    await q.put(EmbeddingJob(recipe_id="r2", user_id="u1"), priority=Priority.BULK)
+    await q.put(EmbeddingJob(recipe_id="r1", user_id="u1", targets=["mistralai"], reindex=True))
+
+    assert await count_rows(session_maker, "emb") == 2
+    assert q.coalesced == 1
+
+    # the merge moved r1 up to the normal class
+    first = await q.get()
+    assert first.recipe_id == "r1"
+    assert list(first.targets) == ["local_bge", "mistralai"]
+    assert first.reindex is True
+
+    # a claimed job is in progress, a new trigger is new work
+    await q.put(EmbeddingJob(recipe_id="r1", user_id="u1"))
+    assert await count_rows(session_maker, "emb") == 3
+
+
+@pytest.mark.asyncio
+async def test_release_hands_an_unfinished_job_back_at_once(session_maker):
+    q = PostgresQueue("ocr", PageScanRead, session_maker, visibility_timeout=600, poll_interval=0.01)
+
+    await q.put(make_page("p1"))
+    item = await q.get()
+    await q.release(item)
+
+    again = await asyncio.wait_for(q.get(), timeout=1)
+    assert again.id == "p1"
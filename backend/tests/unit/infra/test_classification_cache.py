@@ -0,0 +1,135 @@
+import os
+import time
+
+import pytest
+
+from app.infra import classification_cache
+from app.infra.classification_cache import CachedClassificationService, _prune, normalize_text
+from app.infra.validation_simple import ValidationSimple
+from app.ports.classification import ClassificationService
+from app.schemas.ocr import OCRResult
+
+
+class CountingClassifier(ClassificationService):
+    def __init__(self, version="fake:model:prompt1"):
+        self.version = version
+        self.calls = []
+
+    def cache_version(self):
+        return self.version
+
+    async def classify(self, ocr_blocks, ocr_result):
+        self.calls.append(ocr_result.full_text)
+        return {"title": ocr_result.full_text.split()[0], "ingredients": ["2 eggs"]}
+
+
+def text(full_text, page_id="p1"):
+    return OCRResult(page_id=page_id, full_text=full_text, blocks=[])
+
+
+def cached(inner, tmp_path, **kwargs):
+    kwargs = {"max_entries": 100, "max_age_s": 3600.0, **kwargs}
+    return CachedClassificationService(inner, str(tmp_path / "cache"), **kwargs)
+
+
+def test_normalize_text_ignores_layout_only():
+    assert normalize_text("  Apple Pie\n\n2 eggs\t ") == "Apple Pie 2 eggs"
+    assert normalize_text("Apple Pie") != normalize_text("apple pie")
+
+
+@pytest.mark.asyncio
+async def test_same_text_is_classified_once(tmp_path):
+    inner = CountingClassifier()
+    service = cached(inner, tmp_path)
+
+    first = await service.classify([], text("Apple Pie\n2 eggs", page_id="p1"))
+    # re-grouped: other page, same text up to line breaks
+    again = await service.classify([], text("Apple Pie 2 eggs ", page_id="p7"))
+    other = await service.classify([], text("Tomato Soup"))
+
+    assert inner.calls == ["Apple Pie\n2 eggs", "Tomato Soup"]
+    assert again == first == {"title": "Apple", "ingredients": ["2 eggs"]}
+    assert other["title"] == "Tomato"
+
+
+@pytest.mark.asyncio
+async def test_other_model_or_prompt_is_not_reused(tmp_path):
+    old = CountingClassifier("fake:model:prompt1")
+    new = CountingClassifier("fake:model:prompt2")
+
+    await cached(old, tmp_path).classify([], text("Apple Pie"))
+    await cached(new, tmp_path).classify([], text("Apple Pie"))
+
+    assert new.calls == ["Apple Pie"]
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_classified_again(tmp_path):
+    inner = CountingClassifier()
+    service = cached(inner, tmp_path, max_age_s=60.0)
+    await service.classify([], text("Apple Pie"))
+    for directory, _, files in os.walk(tmp_path / "cache"):
+        for name in files:
+            os.utime(os.path.join(directory, name), (time.time() - 120, time.time() - 120))
+
+    await service.classify([], text("Apple Pie"))
+
+    assert inner.calls == ["Apple Pie", "Apple Pie"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_candidates_are_not_cached(tmp_path):
+    # the fake's candidates have no instructions
+    inner = CountingClassifier()
+    service = cached(inner, tmp_path, validator=ValidationSimple())
+
+    await service.classify([], text("Apple Pie"))
+    await service.classify([], text("Apple Pie"))
+
+    assert inner.calls == ["Apple Pie", "Apple Pie"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_entries_already_stored_are_a_miss(tmp_path):
+    inner = CountingClassifier()
+    await cached(inner, tmp_path).classify([], text("Apple Pie"))
+
+    await cached(inner, tmp_path, validator=ValidationSimple()).classify([], text("Apple Pie"))
+
+    assert inner.calls == ["Apple Pie", "Apple Pie"]
+
+
+def test_prune_drops_old_entries_then_the_oldest_beyond_the_limit(tmp_path):
+    now = time.time()
+    for name, age in [("a", 10), ("b", 20), ("c", 30), ("old", 500)]:
+        path = tmp_path / f"{name}.json"
+        path.write_text("{}")
+        os.utime(path, (now - age, now - age))
+
+    assert _prune(str(tmp_path), max_entries=2, max_age_s=100) == 2
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "b.json"]
+
+
+@pytest.mark.asyncio
+async def test_writes_evict_beyond_max_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(classification_cache, "PRUNE_EVERY", 1)
+    inner = CountingClassifier()
+    service = cached(inner, tmp_path, max_entries=2)
+
+    for title in ["Apple Pie", "Tomato Soup", "Lemon Tart"]:
+        await service.classify([], text(title))
+
+    entries = [name for _, _, files in os.walk(tmp_path / "cache") for name in files]
+    assert len(entries) == 2
+
+
+@pytest.mark.asyncio
+async def test_services_without_cache_version_are_called_directly(tmp_path):
+    inner = CountingClassifier(version=None)
+    service = cached(inner, tmp_path)
+
+    await service.classify([], text("Apple Pie"))
+    await service.classify([], text("Apple Pie"))
+
+    assert len(inner.calls) == 2
+    assert not os.path.exists(tmp_path / "cache")
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from app.infra.classification_limit import LimitedClassificationService
+from app.ports.classification import ClassificationService
+
+
+class SlowClassifier(ClassificationService):
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def classify(self, ocr_blocks, ocr_result):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return {"blocks": len(ocr_blocks)}
+
+
+@pytest.mark.asyncio
+async def test_calls_of_a_provider_share_one_limit():
+    inner = SlowClassifier()
+    # services are created per request, the limit holds across them
+    services = [LimitedClassificationService(inner, "test-provider", limit=2) for _ in range(3)]
+
+    results = await asyncio.gather(*(services[i % 3].classify([{}] * i, None) for i in range(6)))
+
+    assert [r["blocks"] for r in results] == list(range(6))
+    assert inner.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_providers_are_limited_separately():
+    inner = SlowClassifier()
+    a = LimitedClassificationService(inner, "provider-a", limit=1)
+    b = LimitedClassificationService(inner, "provider-b", limit=1)
+
+    await asyncio.gather(a.classify([], None), b.classify([], None))
+
+    assert inner.peak == 2
@@ -1,71 +1,170 @@
+import asyncio
 import json
-from io import BytesIO
-from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
-from conftest import get_test_file
+from PIL import Image
 
-from app.infra.ocr_google import GoogleVisionOCRService
+from app.infra.ocr_google import GoogleVisionOCRService, _encode_image
+from app.ports.errors import TransientServiceError
 from app.schemas.ocr import OCRResult
 
 
+class VisionStandIn:
+    """Stand-in for the images:annotate endpoint, answers each image with `respond(index)`."""
+
+    def __init__(self, respond=None, status_code: int = 200):
+        self.respond = respond or (lambda i: {"fullTextAnnotation": {"text": f"text {i}", "pages": [{"blocks": []}]}})
+        self.status_code = status_code
+        self.batches = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.params["key"] == "fake-api-key"
+        images = json.loads(request.content)["requests"]
+        self.batches.append(len(images))
+        if self.status_code != 200:
+            return httpx.Response(self.status_code, text="Internal Server Error")
+        return httpx.Response(200, json={"responses": [self.respond(i) for i in range(len(images))]})
+
+
+def make_service(stand_in: VisionStandIn, **kwargs) -> GoogleVisionOCRService:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(stand_in))
+    return GoogleVisionOCRService(api_key="fake-api-key", client=client, **kwargs)
+
+
 @pytest.fixture
-def mock_image():
-    mock_img = MagicMock()
-    mock_img._getexif.return_value = {274: 1}  # Normal orientation
-    buffer = BytesIO()
-    buffer.write(b"image_bytes_result")
-    buffer.seek(0)
-    mock_img.save.side_effect = lambda buf, format: buf.write(b"image_bytes_result")
-    return mock_img
-
-
-@patch("app.infra.ocr_pytesseract.Image.open")
-@patch("requests.post")
-@pytest.mark.asyncio
-async def test_extract_api_error(mock_post, mock_image_open, mock_image):
-    mock_image_open.return_value = mock_image
-    service = GoogleVisionOCRService(api_key="fake-api-key")
+def image_path(tmp_path):
+    path = tmp_path / "page.jpg"
+    Image.new("RGB", (10, 10), color="white").save(path)
+    return str(path)
+
 
-    mock_response = MagicMock()
-    mock_response.status_code = 500
-    mock_response.text = "Internal Server Error"
-    mock_post.return_value = mock_response
+@pytest.mark.asyncio
+async def test_extract_api_error(image_path):
+    service = make_service(VisionStandIn(status_code=400), batch_wait_ms=1)
 
-    with pytest.raises(RuntimeError, match="Google Vision API error: 500"):
-        await service.extract("fake_path.jpg", "image-id")
+    with pytest.raises(RuntimeError, match="Google Vision API error: 400"):
+        await service.extract(image_path, "image-id")
 
 
-@patch("app.infra.ocr_pytesseract.Image.open")
-@patch("requests.post")
 @pytest.mark.asyncio
-async def test_extract_with_error_in_response(mock_post, mock_image_open, mock_image):
-    mock_image_open.return_value = mock_image
-    service = GoogleVisionOCRService(api_key="fake-api-key")
+async def test_extract_server_error_is_transient(image_path):
+    service = make_service(VisionStandIn(status_code=503), batch_wait_ms=1)
 
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"responses": [{"error": {"message": "Invalid image format"}}]}
-    mock_post.return_value = mock_response
+    with pytest.raises(TransientServiceError, match="Google Vision API error: 503"):
+        await service.extract(image_path, "image-id")
+
+
+@pytest.mark.asyncio
+async def test_extract_with_error_in_response(image_path):
+    service = make_service(VisionStandIn(lambda i: {"error": {"message": "Invalid image format"}}), batch_wait_ms=1)
 
     with pytest.raises(RuntimeError, match="Google Vision API returned error:"):
-        await service.extract("fake_path.jpg", "image-id")
+        await service.extract(image_path, "image-id")
 
 
-@patch("app.infra.ocr_pytesseract.Image.open")
-@patch("requests.post")
 @pytest.mark.asyncio
-async def test_extract_no_full_text_annotation(mock_post, mock_image_open, mock_image):
-    mock_image_open.return_value = mock_image
-    service = GoogleVisionOCRService(api_key="fake-api-key")
-
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"responses": [{}]}  # No fullTextAnnotation
-    mock_post.return_value = mock_response
+async def test_extract_no_full_text_annotation(image_path):
+    service = make_service(VisionStandIn(lambda i: {}), batch_wait_ms=1)
 
-    result = await service.extract("fake_path.jpg", "image-id")
+    result = await service.extract(image_path, "image-id")
     assert isinstance(result, OCRResult)
     assert result.page_id == "image-id"
     assert result.full_text == ""
     assert result.blocks == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_extracts_share_one_batch_request(image_path):
+    stand_in = VisionStandIn()
+    service = make_service(stand_in, batch_wait_ms=20)
+
+    results = await asyncio.gather(*(service.extract(image_path, f"page-{i}") for i in range(5)))
+
+    assert stand_in.batches == [5]
+    assert [r.page_id for r in results] == [f"page-{i}" for i in range(5)]
+    assert [r.full_text for r in results] == [f"text {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_and_errors_stay_per_image(image_path):
+    def respond(i):
+        if i == 1:
+            return {"error": {"code": 14, "message": "unavailable"}}
+        return {"fullTextAnnotation": {"text": "ok", "pages": [{"blocks": []}]}}
+
+    stand_in = VisionStandIn(respond)
+    service = make_service(stand_in, batch_size=4, batch_wait_ms=1000)
+
+    results = await asyncio.gather(
+        *(service.extract(image_path, f"page-{i}") for i in range(6)), return_exceptions=True
+    )
+
+    # a full batch is sent at once, the rest after the wait
+    assert stand_in.batches == [4, 2]
+    assert isinstance(results[1], TransientServiceError)
+    assert isinstance(results[5], TransientServiceError)
+    assert [r.page_id for i, r in enumerate(results) if i not in (1, 5)] == ["page-0", "page-2", "page-3", "page-4"]
+
+
+@pytest.mark.asyncio
+async def test_extract_many_splits_into_requests(image_path):
+    stand_in = VisionStandIn()
+    service = make_service(stand_in)
+
+    results = await service.extract_many([(image_path, f"p{i}") for i in range(20)])
+
+    assert stand_in.batches == [16, 4]
+    assert [r.page_id for r in results] == [f"p{i}" for i in range(20)]
+    await service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unreadable_image_fails_only_its_own_page(image_path, tmp_path):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    stand_in = VisionStandIn()
+    service = make_service(stand_in)
+
+    results = await service.extract_many([(image_path, "p0"), (str(broken), "p1"), (image_path, "p2")])
+
+    assert stand_in.batches == [2]
+    assert isinstance(results[1], Exception)
+    assert [results[0].page_id, results[2].page_id] == ["p0", "p2"]
+    assert [results[0].full_text, results[2].full_text] == ["text 0", "text 1"]
+
+
+@pytest.mark.asyncio
+async def test_large_batches_are_split_by_request_size(image_path):
+    stand_in = VisionStandIn()
+    # room for two encoded pages per request
+    service = make_service(stand_in, max_request_bytes=2 * len(_encode_image(image_path)))
+
+    results = await service.extract_many([(image_path, f"p{i}") for i in range(5)])
+
+    assert sorted(stand_in.batches) == [1, 2, 2]
+    assert [r.page_id for r in results] == [f"p{i}" for i in range(5)]
+    await service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_request_fails_only_its_own_pages(image_path):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(413, text="Request Entity Too Large")
+        images = json.loads(request.content)["requests"]
+        return httpx.Response(200, json={"responses": [{} for _ in images]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = GoogleVisionOCRService(
+        api_key="fake-api-key", client=client, max_request_bytes=len(_encode_image(image_path))
+    )
+
+    results = await service.extract_many([(image_path, "p0"), (image_path, "p1")])
+
+    assert len(calls) == 2
+    assert sum(isinstance(r, RuntimeError) for r in results) == 1
+    assert sum(isinstance(r, OCRResult) for r in results) == 1
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+import pytest
+from langgraph.types import Command
+from unit.workflows.segmentation.nodes.fakes import FakeBroadcast, FakeRepo, FakeSegmentationService
+
+from app.infra.graph_checkpoints import (
+    GraphCheckpointer,
+    PrunableMemorySaver,
+    scanner_serializer,
+)
+from app.schemas.ocr import (
+    OCRResult,
+    PageStatus,
+    SegmentationApproval,
+    SegmentationGraphState,
+    SegmentationResult,
+)
+from app.workflows.segmentation.graph_builder import build_segmentation_graph
+
+
+def page_ocr(page_id):
+    blocks = [{"blockType": "TEXT", "text": f"line {i} of a long recipe text"} for i in range(200)]
+    return OCRResult(page_id=page_id, full_text="\n".join(b["text"] for b in blocks), blocks=blocks)
+
+
+def test_large_values_are_compressed():
+    serde = scanner_serializer()
+    ocr = page_ocr("p1")
+
+    type_, data = serde.dumps_typed(ocr)
+    plain_type, plain = serde.dumps_typed("short")
+
+    assert type_.endswith("+zstd")
+    assert len(data) < len(ocr.model_dump_json()) / 5
+    assert serde.loads_typed((type_, data)) == ocr
+    assert not plain_type.endswith("+zstd") and serde.loads_typed((plain_type, plain)) == "short"
+
+
+async def run_page(graph, page_id, confidence):
+    segmentation = SegmentationResult(segmentation_done=True, page_segments=[], confidence=confidence)
+    config = {
+        "configurable": {
+            "segmentation_service": FakeSegmentationService(result=segmentation),
+            "page_repo": FakeRepo(),
+            "thread_id": page_id,
+            "auto_approve_confidence": 0.8,
+        }
+    }
+    state = SegmentationGraphState(page_record_id=page_id, ocr_result=page_ocr(page_id))
+    return await graph.ainvoke(state, config=config), config
+
+
+@pytest.mark.asyncio
+async def test_prune_removes_finished_threads_and_keeps_pending_reviews(monkeypatch):
+    monkeypatch.setattr("app.workflows.segmentation.nodes.approve_segmentation.broadcast_status", FakeBroadcast())
+    saver = PrunableMemorySaver(serde=scanner_serializer())
+    graph = build_segmentation_graph(checkpointer=GraphCheckpointer(saver))
+
+    await run_page(graph, "done", confidence=0.95)
+    await run_page(graph, "review", confidence=0.5)
+
+    # too recent
+    assert await saver.prune_finished(timedelta(hours=1)) == 0
+    assert await saver.prune_finished(timedelta(0)) == 1
+    assert set(saver.storage) == {"review"}
+    assert all(key[0] == "review" for key in saver.writes)
+
+
+@pytest.mark.asyncio
+async def test_graphs_follow_the_saver_set_after_compiling(monkeypatch):
+    monkeypatch.setattr("app.workflows.segmentation.nodes.approve_segmentation.broadcast_status", FakeBroadcast())
+    checkpointer = GraphCheckpointer(PrunableMemorySaver(serde=scanner_serializer()))
+    graph = build_segmentation_graph(checkpointer=checkpointer)
+    persistent = PrunableMemorySaver(serde=scanner_serializer())
+    checkpointer.use(persistent)
+
+    result, config = await run_page(graph, "p1", confidence=0.5)
+    assert result.get("__interrupt__")
+    assert "p1" in persistent.storage
+
+    approval = SegmentationApproval(segmentation=SegmentationResult(segmentation_done=False, page_segments=[]))
+    await graph.ainvoke(Command(resume={"response_to_approve_seg": approval}), config=config)
+
+    repo = config["configurable"]["page_repo"]
+    assert [dto.status for dto in repo.update_calls] == [PageStatus.APPROVED]
+    assert await checkpointer.prune_finished(timedelta(0)) == 1
+    assert persistent.storage == {}
@@ -7,6 +7,7 @@ from fastapi import UploadFile
 from PIL import Image
 
 from app.infra.storage_local import LocalStorageService
+from app.schemas.ocr import OCRResult
 
 
 @pytest.fixture
@@ -306,3 +307,38 @@ async def test_save_json_unicode(temp_storage):
 
     read_back = await storage.read_json(image_id)
     assert read_back == data
+
+
+@pytest.mark.asyncio
+async def test_ocr_results_are_stored_compactly_and_read_in_parts(temp_storage):
+    storage, tmpdir = temp_storage
+    box = {"vertices": [{"x": 1, "y": 2}, {"y": 2}, {"x": 3, "y": 4}, {"x": 1, "y": 4}]}
+    blocks = [{"blockType": "TEXT", "boundingBox": box, "paragraphs": [{"words": [{"text": "Salz"}]}]}]
+    result = OCRResult(page_id="p1", full_text="Salz", blocks=blocks)
+
+    path = await storage.save_ocr(result, "p1")
+
+    assert path.endswith(".ocrz")
+    assert await storage.read_ocr("p1") == result.model_dump()
+    assert await storage.read_ocr_text("p1") == "Salz"
+    geometry = await storage.read_ocr_geometry("p1")
+    assert geometry["page_id"] == "p1"
+    assert geometry["blocks"][0]["boundingBox"]["vertices"][1] == {"x": 0, "y": 2}
+    assert "paragraphs" not in geometry["blocks"][0]
+
+    await storage.delete(os.path.basename(path))
+    assert not os.path.exists(path)
+
+
+@pytest.mark.asyncio
+async def test_ocr_results_stored_as_json_are_still_read(temp_storage):
+    storage, tmpdir = temp_storage
+    data = {"page_id": "old", "full_text": "Mehl", "blocks": [{"blockType": "TEXT", "boundingBox": None, "text": "x"}]}
+    await storage.save_json(data, "old")
+
+    assert await storage.read_ocr("old") == data
+    assert await storage.read_ocr_text("old") == "Mehl"
+    assert await storage.read_ocr_geometry("old") == {
+        "page_id": "old",
+        "blocks": [{"blockType": "TEXT", "boundingBox": None}],
+    }
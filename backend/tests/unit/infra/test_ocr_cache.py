@@ -0,0 +1,126 @@
+import os
+
+import pytest
+from PIL import Image
+
+import app.infra.ocr_cache as ocr_cache
+from app.infra.ocr_cache import CachedOCRService, get_ocr_cache_stats
+from app.infra.storage_local import LocalStorageService
+from app.ports.ocr import OCRService
+from app.schemas.ocr import OCRResult
+
+
+class CountingOCR(OCRService):
+    def __init__(self, version="fake:v1"):
+        self.version = version
+        self.calls = []
+
+    def cache_version(self):
+        return self.version
+
+    async def extract(self, image_path, image_id):
+        self.calls.append(image_id)
+        return OCRResult(page_id=image_id, full_text=f"text of {os.path.basename(image_path)}", blocks=[{"text": "t"}])
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(ocr_cache, "_stats", {})
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorageService(str(tmp_path / "storage"))
+
+
+def make_image(tmp_path, name, color="white"):
+    path = tmp_path / name
+    Image.new("RGB", (10, 10), color=color).save(path, format="PNG")
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_identical_images_reuse_the_stored_result(tmp_path, storage):
+    backend = CountingOCR()
+    service = CachedOCRService(backend, storage)
+    first = make_image(tmp_path, "a.png")
+    copy = make_image(tmp_path, "b.png")
+
+    result_a = await service.extract(first, "page-a")
+    result_b = await service.extract(copy, "page-b")
+
+    assert backend.calls == ["page-a"]
+    assert result_b.page_id == "page-b"
+    assert result_b.full_text == result_a.full_text == "text of a.png"
+    assert result_b.blocks == [{"text": "t"}]
+    assert [s.model_dump() for s in get_ocr_cache_stats()] == [
+        {"backend": "fake:v1", "hits": 1, "misses": 1, "hit_rate": 0.5}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cache_is_persistent_and_keyed_by_content_and_version(tmp_path, storage):
+    page = make_image(tmp_path, "a.png")
+    other = make_image(tmp_path, "b.png", color="black")
+    await CachedOCRService(CountingOCR(), storage).extract(page, "p1")
+
+    # a new service, as after a restart, still finds it
+    backend = CountingOCR()
+    service = CachedOCRService(backend, storage)
+    await service.extract(page, "p1")
+    await service.extract(other, "p2")
+    assert backend.calls == ["p2"]
+
+    # another backend configuration does not share results
+    changed = CountingOCR(version="fake:v2")
+    await CachedOCRService(changed, storage).extract(page, "p1")
+    assert changed.calls == ["p1"]
+
+    assert os.path.isdir(os.path.join(storage.base_path, "ocr_cache", "fake_v1"))
+
+
+@pytest.mark.asyncio
+async def test_stats_are_reported_per_backend(tmp_path, storage):
+    # a fallback chain with two cached backends, the later one must not take over the counts
+    primary = CachedOCRService(CountingOCR(version="google:v1"), storage)
+    secondary = CachedOCRService(CountingOCR(version="tesseract:v1"), storage)
+    page = make_image(tmp_path, "a.png")
+
+    await primary.extract(page, "p1")
+    await primary.extract(page, "p1")
+    await secondary.extract(page, "p1")
+
+    assert {s.backend: (s.hits, s.misses) for s in get_ocr_cache_stats()} == {
+        "google:v1": (1, 1),
+        "tesseract:v1": (0, 1),
+    }
+
+
+@pytest.mark.asyncio
+async def test_backends_without_version_are_not_cached(tmp_path, storage):
+    backend = CountingOCR(version=None)
+    service = CachedOCRService(backend, storage)
+    page = make_image(tmp_path, "a.png")
+
+    await service.extract(page, "p1")
+    await service.extract(page, "p1")
+
+    assert backend.calls == ["p1", "p1"]
+    assert not os.path.exists(os.path.join(storage.base_path, "ocr_cache"))
+
+
+@pytest.mark.asyncio
+async def test_corrupt_entry_is_recomputed(tmp_path, storage):
+    backend = CountingOCR()
+    service = CachedOCRService(backend, storage)
+    page = make_image(tmp_path, "a.png")
+    await service.extract(page, "p1")
+
+    for root, _, files in os.walk(service.cache_dir):
+        for name in files:
+            with open(os.path.join(root, name), "w") as f:
+                f.write("{not json")
+
+    result = await service.extract(page, "p1")
+    assert result.full_text == "text of a.png"
+    assert backend.calls == ["p1", "p1"]
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+import app.infra.ocr_fallback as fallback
+from app.infra.ocr_fallback import BackendStats, CircuitBreaker, FallbackOCRService, OCRBackend, get_ocr_backend_stats
+from app.ports.errors import TransientServiceError
+from app.ports.ocr import OCRService
+from app.schemas.ocr import OCRResult
+
+
+class ScriptedOCR(OCRService):
+    """Fails, hangs or answers as told."""
+
+    def __init__(self, name, behaviour="ok"):
+        self.name = name
+        self.behaviour = behaviour
+        self.calls = 0
+
+    async def extract(self, image_path, image_id):
+        self.calls += 1
+        if self.behaviour == "fail":
+            raise TransientServiceError(f"{self.name} is down")
+        if self.behaviour == "bad":
+            raise RuntimeError(f"{self.name} rejected the image")
+        if self.behaviour == "hang":
+            await asyncio.sleep(10)
+        return OCRResult(page_id=image_id, full_text=self.name, blocks=[])
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(fallback, "_backends", {})
+
+
+def chain(*services, timeout_s=1.0, failures=2, reset_s=60.0):
+    return FallbackOCRService(
+        [OCRBackend(s.name, s, timeout_s, CircuitBreaker(failures, reset_s), BackendStats()) for s in services]
+    )
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_the_next_backend():
+    google, tesseract = ScriptedOCR("google", "fail"), ScriptedOCR("tesseract")
+    service = chain(google, tesseract)
+
+    result = await service.extract("page.jpg", "p1")
+
+    assert result.full_text == "tesseract"
+    stats = {s.name: s for s in get_ocr_backend_stats()}
+    assert stats["google"].failures == 1 and stats["google"].error_rate == 1.0
+    assert stats["tesseract"].calls == 1 and stats["tesseract"].latency_p95_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_slow_backends_time_out():
+    service = chain(ScriptedOCR("google", "hang"), ScriptedOCR("tesseract"), timeout_s=0.05)
+
+    result = await service.extract("page.jpg", "p1")
+
+    assert result.full_text == "tesseract"
+    assert get_ocr_backend_stats()[0].timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_the_backend_until_the_reset():
+    google, tesseract = ScriptedOCR("google", "fail"), ScriptedOCR("tesseract")
+    service = chain(google, tesseract, failures=2, reset_s=0.05)
+
+    for i in range(4):
+        await service.extract("page.jpg", f"p{i}")
+
+    # opened after two failures, the other pages went straight to tesseract
+    assert google.calls == 2
+    status = get_ocr_backend_stats()[0]
+    assert status.state == "open"
+    assert status.short_circuits == 2
+
+    # after the reset one trial call goes through and closes the circuit again
+    await asyncio.sleep(0.06)
+    google.behaviour = "ok"
+    assert (await service.extract("page.jpg", "p5")).full_text == "google"
+    assert get_ocr_backend_stats()[0].state == "closed"
+
+
+def test_half_open_circuit_lets_one_trial_through(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(fallback.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_s=10)
+
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_rejected_pages_do_not_open_the_circuit():
+    google, tesseract = ScriptedOCR("google", "bad"), ScriptedOCR("tesseract")
+    service = chain(google, tesseract, failures=2)
+
+    for i in range(4):
+        await service.extract("page.jpg", f"p{i}")
+
+    assert google.calls == 4
+    status = get_ocr_backend_stats()[0]
+    assert status.state == "closed"
+    assert status.failures == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_lets_the_next_call_try():
+    google, tesseract = ScriptedOCR("google", "fail"), ScriptedOCR("tesseract")
+    service = chain(google, tesseract, failures=1, reset_s=0.05)
+    await service.extract("page.jpg", "p1")
+    await asyncio.sleep(0.06)
+
+    google.behaviour = "hang"
+    trial = asyncio.create_task(service.extract("page.jpg", "p2"))
+    await asyncio.sleep(0.01)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    google.behaviour = "ok"
+    assert (await service.extract("page.jpg", "p3")).full_text == "google"
+    assert get_ocr_backend_stats()[0].state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_errors_when_every_backend_fails():
+    service = chain(ScriptedOCR("google", "fail"), ScriptedOCR("tesseract", "bad"))
+    with pytest.raises(TransientServiceError, match="All OCR backends failed"):
+        await service.extract("page.jpg", "p1")
+
+    # a single backend keeps its error, so the retry policy sees its real type
+    single = chain(ScriptedOCR("tesseract", "bad"))
+    with pytest.raises(RuntimeError, match="rejected the image"):
+        await single.extract("page.jpg", "p1")
+
+
+@pytest.mark.asyncio
+async def test_all_circuits_open_is_transient():
+    service = chain(ScriptedOCR("google", "fail"), failures=1)
+    with pytest.raises(TransientServiceError):
+        await service.extract("page.jpg", "p1")
+
+    with pytest.raises(TransientServiceError, match="circuits open"):
+        await service.extract("page.jpg", "p2")
@@ -0,0 +1,65 @@
+import io
+import json
+
+import pytest
+
+from app.infra import ocr_format
+from app.schemas.ocr import OCRResult
+
+
+def vision_like_result(n_blocks=30):
+    """A page shaped like a Google Vision answer, with per-symbol trees."""
+    blocks = []
+    for b in range(n_blocks):
+        box = {"vertices": [{"x": 10 * b, "y": 5}, {"x": 10 * b + 90, "y": 5}, {"x": 10 * b + 90, "y": 40}, {"y": 40}]}
+        words = [
+            {
+                "boundingBox": box,
+                "symbols": [{"text": ch, "boundingBox": box, "confidence": 0.99} for ch in "Zwiebel"],
+                "confidence": 0.98,
+            }
+            for _ in range(8)
+        ]
+        blocks.append({"blockType": "TEXT", "boundingBox": box, "paragraphs": [{"boundingBox": box, "words": words}]})
+    return OCRResult(page_id="page-1", full_text="Zwiebel " * 240, blocks=blocks)
+
+
+def test_round_trip_and_size():
+    result = vision_like_result()
+    data = ocr_format.encode(result)
+
+    sections = ocr_format.read_sections(io.BytesIO(data), ["meta", "text", "blocks"])
+
+    assert sections["meta"] == {"page_id": "page-1"}
+    assert sections["text"] == result.full_text
+    assert sections["blocks"] == result.blocks
+    assert len(data) * 10 < len(json.dumps(result.model_dump()))
+
+
+def test_geometry_is_read_without_the_block_trees():
+    data = ocr_format.encode(vision_like_result(n_blocks=3))
+
+    sections = ocr_format.read_sections(io.BytesIO(data), ["geometry"])
+    blocks = ocr_format.geometry_blocks(sections["geometry"])
+
+    assert list(sections) == ["geometry"]
+    assert [b["blockType"] for b in blocks] == ["TEXT"] * 3
+    assert blocks[2]["boundingBox"]["vertices"] == [
+        {"x": 20, "y": 5},
+        {"x": 110, "y": 5},
+        {"x": 110, "y": 40},
+        {"x": 0, "y": 40},
+    ]
+
+
+def test_blocks_without_box_and_empty_pages():
+    result = OCRResult(page_id="p", full_text="", blocks=[{"text": "no box"}])
+    data = ocr_format.encode(result)
+
+    geometry = ocr_format.read_sections(io.BytesIO(data), ["geometry"])["geometry"]
+    assert ocr_format.geometry_blocks(geometry) == [{"blockType": None, "boundingBox": {"vertices": []}}]
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError, match="Not an OCR result file"):
+        ocr_format.read_sections(io.BytesIO(b'{"page_id": "json", "x": 1}'), ["text"])
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from app.infra.ocr_preprocessing import PreprocessingOCRService, adaptive_binarize, estimate_skew, prepare_image
+from app.infra.storage_local import LocalStorageService
+from app.ports.ocr import OCRService
+from app.schemas.ocr import OCRResult
+
+
+def text_page(size=(2000, 2800), lines=40):
+    """White page with rows of dark 'words'."""
+    img = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(img)
+    for i in range(lines):
+        y = 150 + i * 60
+        for j in range(12):
+            draw.rectangle([100 + j * 150, y, 210 + j * 150, y + 22], fill=20)
+    return img
+
+
+class MarkerOCR(OCRService):
+    """Reports the centre of the ink of the image it is given."""
+
+    def __init__(self):
+        self.paths = []
+
+    def cache_version(self):
+        return "marker:v1"
+
+    async def extract(self, image_path, image_id):
+        self.paths.append(image_path)
+        with Image.open(image_path) as img:
+            ys, xs = np.where(np.asarray(img.convert("L")) < 128)
+        vertices = [{"x": float(xs.mean()), "y": float(ys.mean())}]
+        return OCRResult(page_id=image_id, full_text="marker", blocks=[{"boundingBox": {"vertices": vertices}}])
+
+
+@pytest.mark.parametrize("angle", [3.0, -6.5, 0.0])
+def test_estimate_skew_straightens_text_lines(angle):
+    page = text_page().rotate(angle, expand=True, fillcolor=255)
+    assert estimate_skew(page) == pytest.approx(-angle, abs=0.2)
+
+
+def test_adaptive_binarize_removes_uneven_lighting():
+    # a shadow across the page, darker than the ink on the bright side
+    shade = np.tile(np.linspace(250, 90, 600), (400, 1))
+    shade[200:210, 50:550] -= 80
+    result = np.asarray(adaptive_binarize(Image.fromarray(shade.astype(np.uint8))))
+
+    assert result.dtype == bool
+    assert result[100].all()  # background stays white in the shadow
+    assert not result[205, 60:540].any()  # the stroke is ink everywhere
+
+
+def test_prepare_image_downscales_grayscale_and_reuses_output(tmp_path):
+    src = tmp_path / "page.jpg"
+    text_page(size=(6000, 8000), lines=10).convert("RGB").save(src)
+
+    path, transform = prepare_image(str(src), 300, False, False, "sig")
+
+    assert os.path.dirname(path) == str(tmp_path)
+    with Image.open(path) as prepared:
+        assert prepared.mode == "L"
+        assert max(prepared.size) == 3510
+    assert transform["angle"] == 0.0
+    assert transform["scale"] == pytest.approx(3510 / 8000)
+
+    mtime = os.path.getmtime(path)
+    assert prepare_image(str(src), 300, False, False, "sig") == (path, transform)
+    assert os.path.getmtime(path) == mtime
+
+
+@pytest.mark.asyncio
+async def test_coordinates_are_mapped_back_to_the_original(tmp_path):
+    page = text_page(size=(4000, 5600), lines=30)
+    ImageDraw.Draw(page).rectangle([3000, 5000, 3100, 5100], fill=0)
+    page = page.rotate(4.0, expand=True, fillcolor=255)
+    src = tmp_path / "page.png"
+    page.save(src)
+
+    backend = MarkerOCR()
+    service = PreprocessingOCRService(backend, target_dpi=150, deskew=True)
+    result = await service.extract(str(src), "p1")
+
+    assert backend.paths[0] != str(src)
+    ys, xs = np.where(np.asarray(page) < 128)
+    (centre,) = result.blocks[0]["boundingBox"]["vertices"]
+    # the straightened, downscaled content maps back onto its place in the upload
+    assert centre["x"] == pytest.approx(xs.mean(), abs=10)
+    assert centre["y"] == pytest.approx(ys.mean(), abs=10)
+    assert service.cache_version().startswith("marker:v1+dpi150")
+
+
+@pytest.mark.asyncio
+async def test_unreadable_images_are_passed_on(tmp_path):
+    src = tmp_path / "page.jpg"
+    src.write_bytes(b"not an image")
+
+    class Recording(OCRService):
+        async def extract(self, image_path, image_id):
+            return OCRResult(page_id=image_id, full_text=image_path, blocks=[])
+
+    result = await PreprocessingOCRService(Recording()).extract(str(src), "p1")
+
+    assert result.full_text == str(src)
+
+
+@pytest.mark.asyncio
+async def test_deleting_an_image_removes_its_prepared_copies(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+    src = os.path.join(storage.scanner_image_dir, "img1.jpg")
+    text_page(size=(800, 1000), lines=5).save(src)
+    prepare_image(src, 300, False, True, "sig")
+    assert len(os.listdir(storage.scanner_image_dir)) == 3
+
+    await storage.delete("img1.jpg", "scanner")
+
+    assert os.listdir(storage.scanner_image_dir) == []
@@ -6,98 +6,128 @@ from PIL import Image
 import app.infra.ocr_pytesseract as ocr
 
 
-@pytest.mark.asyncio
-async def test_extract_builds_blocks_and_full_text(monkeypatch, tmp_path):
-    image_path = tmp_path / "img.jpg"
+def rows(*entries):
+    """image_to_data DICT output from (level, block, par, line, text, left, top, width, height) tuples."""
+    keys = ["level", "block_num", "par_num", "line_num", "text", "left", "top", "width", "height"]
+    data = {key: [entry[i] for entry in entries] for i, key in enumerate(keys)}
+    data["conf"] = [-1 if entry[0] != ocr.WORD else 90 for entry in entries]
+    return data
 
-    # Prepare a fake image file PIL can open
-    img = Image.new("RGB", (10, 10), color="white")
-    img.save(image_path)
 
-    # Sentinel image returned after EXIF transpose
-    sentinel_img = object()
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "img.jpg"
+    Image.new("RGB", (10, 10), color="white").save(path)
+    return str(path)
 
-    # Monkeypatch exif_transpose -> returns sentinel
-    def fake_exif_transpose(pil_img):
-        return SimpleNamespace(copy=lambda: sentinel_img)
 
-    monkeypatch.setattr(ocr.ImageOps, "exif_transpose", fake_exif_transpose)
+@pytest.fixture
+def sentinel_img(monkeypatch):
+    sentinel = object()
+    monkeypatch.setattr(ocr.ImageOps, "exif_transpose", lambda pil: SimpleNamespace(copy=lambda: sentinel))
+    monkeypatch.setattr(ocr.pytesseract, "Output", SimpleNamespace(DICT="DICT"))
 
-    # Fake OCR output
-    full_text = "some full text"
+    def no_second_pass(*args, **kwargs):
+        raise AssertionError("image_to_string must not be called, the text comes from image_to_data")
+
+    monkeypatch.setattr(ocr.pytesseract, "image_to_string", no_second_pass)
+    return sentinel
 
-    def fake_image_to_string(image):
-        assert image is sentinel_img
-        return full_text
-
-    # Word-level data including two block-level entries (level == 2)
-    data = {
-        "level": [1, 2, 3, 2],
-        "left": [0, 10, 20, 30],
-        "top": [0, 5, 15, 25],
-        "width": [0, 100, 50, 75],
-        "height": [0, 40, 20, 35],
-    }
 
-    def fake_image_to_data(image, output_type):
+@pytest.mark.asyncio
+async def test_extract_builds_blocks_and_full_text_in_one_pass(monkeypatch, image_path, sentinel_img):
+    data = rows(
+        (1, 0, 0, 0, "", 0, 0, 200, 100),
+        (2, 1, 0, 0, "", 10, 5, 100, 40),
+        (3, 1, 1, 0, "", 10, 5, 100, 40),
+        (4, 1, 1, 1, "", 10, 5, 100, 20),
+        (5, 1, 1, 1, "Pancakes", 10, 5, 60, 20),
+        (4, 1, 1, 2, "", 10, 25, 100, 20),
+        (5, 1, 1, 2, "2", 10, 25, 10, 20),
+        (5, 1, 1, 2, "eggs", 25, 25, 40, 20),
+        (3, 1, 2, 0, "", 10, 50, 100, 20),
+        (4, 1, 2, 1, "", 10, 50, 100, 20),
+        (5, 1, 2, 1, "Mix", 10, 50, 30, 20),
+        (5, 1, 2, 1, " ", 45, 50, 5, 20),
+        (2, 2, 0, 0, "", 30, 25, 75, 35),
+        (3, 2, 1, 0, "", 30, 25, 75, 35),
+        (4, 2, 1, 1, "", 30, 25, 75, 35),
+        (5, 2, 1, 1, "Serves", 30, 25, 40, 35),
+        (5, 2, 1, 1, "4", 75, 25, 10, 35),
+    )
+    calls = []
+
+    def fake_image_to_data(image, lang, config, output_type):
         assert image is sentinel_img
         assert output_type == "DICT"
+        calls.append((lang, config))
         return data
 
-    monkeypatch.setattr(ocr.pytesseract, "image_to_string", fake_image_to_string)
     monkeypatch.setattr(ocr.pytesseract, "image_to_data", fake_image_to_data)
-    monkeypatch.setattr(ocr.pytesseract, "Output", SimpleNamespace(DICT="DICT"))
 
-    service = ocr.PytesseractOCRService()
-    result = await service.extract(str(image_path), "page-1")
+    service = ocr.PytesseractOCRService(lang="deu", oem=1, psm=6)
+    result = await service.extract(image_path, "page-1")
 
+    assert calls == [("deu", "--oem 1 --psm 6")]
     assert result.page_id == "page-1"
-    assert result.full_text == full_text
+    assert result.full_text == "Pancakes\n2 eggs\n\nMix\n\nServes 4"
 
-    # Expect two blocks (level == 2)
     assert len(result.blocks) == 2
-    assert result.blocks[0] == {
-        "blockType": "TEXT",
+    first = result.blocks[0]
+    assert first["blockType"] == "TEXT"
+    assert first["boundingBox"] == {
+        "vertices": [
+            {"x": 10, "y": 5},
+            {"x": 110, "y": 5},
+            {"x": 110, "y": 45},
+            {"x": 10, "y": 45},
+        ]
+    }
+    assert first["text"] == "Pancakes\n2 eggs\n\nMix"
+    assert [line["text"] for line in first["lines"]] == ["Pancakes", "2 eggs", "Mix"]
+    assert first["lines"][1]["words"][1] == {
+        "text": "eggs",
         "boundingBox": {
             "vertices": [
-                {"x": 10, "y": 5},
-                {"x": 110, "y": 5},
-                {"x": 110, "y": 45},
-                {"x": 10, "y": 45},
+                {"x": 25, "y": 25},
+                {"x": 65, "y": 25},
+                {"x": 65, "y": 45},
+                {"x": 25, "y": 45},
             ]
         },
-        "text": "",
+        "confidence": 90.0,
     }
 
-    # Sanity-check second block’s bottom-right vertex
+    assert result.blocks[1]["text"] == "Serves 4"
     assert result.blocks[1]["boundingBox"]["vertices"][2] == {"x": 105, "y": 60}
 
 
 @pytest.mark.asyncio
-async def test_extract_with_no_block_levels(monkeypatch, tmp_path):
-    image_path = tmp_path / "img.jpg"
-
-    img = Image.new("RGB", (10, 10), color="white")
-    img.save(image_path)
-
-    sentinel_img = object()
-    monkeypatch.setattr(
-        ocr.ImageOps,
-        "exif_transpose",
-        lambda pil: SimpleNamespace(copy=lambda: sentinel_img),
-    )
-
-    monkeypatch.setattr(ocr.pytesseract, "image_to_string", lambda img: "")
-
+async def test_extract_with_no_block_levels(monkeypatch, image_path, sentinel_img):
     def fake_image_to_data(image, output_type=None, **kwargs):
-        return {"level": [], "left": [], "top": [], "width": [], "height": []}
+        return rows()
 
     monkeypatch.setattr(ocr.pytesseract, "image_to_data", fake_image_to_data)
-    monkeypatch.setattr(ocr.pytesseract, "Output", SimpleNamespace(DICT="DICT"))
 
     service = ocr.PytesseractOCRService()
-    result = await service.extract(str(image_path), "page-2")
+    result = await service.extract(image_path, "page-2")
 
     assert result.page_id == "page-2"
     assert result.full_text == ""
     assert result.blocks == []
+
+
+@pytest.mark.asyncio
+async def test_extract_limits_tesseract_threads_once_per_process(monkeypatch, image_path, sentinel_img):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setattr(ocr, "_thread_limit", None)
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", lambda image, **kwargs: rows())
+    service = ocr.PytesseractOCRService(threads=2)
+
+    await service.extract(image_path, "page-3")
+    assert ocr.os.environ["OMP_THREAD_LIMIT"] == "2"
+
+    # not written again for the next pages
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "untouched")
+    await service.extract(image_path, "page-4")
+    assert ocr.os.environ["OMP_THREAD_LIMIT"] == "untouched"
@@ -0,0 +1,63 @@
+import math
+import threading
+
+import pytest
+import pytest_asyncio
+
+import app.infra.process_pool as process_pool
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@pytest_asyncio.fixture
+async def pool_settings():
+    saved = (settings.CPU_POOL_WORKERS, settings.CPU_POOL_WARMUP, settings.OCR_BACKEND)
+    yield settings
+    await process_pool.shutdown_process_pool()
+    settings.CPU_POOL_WORKERS, settings.CPU_POOL_WARMUP, settings.OCR_BACKEND = saved
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_runs_work_on_a_thread(pool_settings):
+    pool_settings.CPU_POOL_WORKERS = 0
+    loop_thread = threading.get_ident()
+
+    assert process_pool.get_process_pool() is None
+    assert await process_pool.run_cpu(threading.get_ident) != loop_thread
+    assert process_pool.call_cpu(math.factorial, 5) == 120
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_work_in_worker_processes(pool_settings):
+    pool_settings.CPU_POOL_WORKERS = 1
+    pool_settings.CPU_POOL_WARMUP = ""
+
+    pool = process_pool.get_process_pool()
+    assert pool is process_pool.get_process_pool()
+    assert await process_pool.run_cpu(math.factorial, 10) == 3628800
+    assert process_pool.call_cpu(math.factorial, 4) == 24
+
+    await process_pool.shutdown_process_pool()
+    assert process_pool._pool is None
+
+
+def test_pool_size_defaults_to_core_count(pool_settings, monkeypatch):
+    monkeypatch.setattr(process_pool.os, "cpu_count", lambda: 6)
+    pool_settings.CPU_POOL_WORKERS = None
+    assert process_pool.pool_size() == 6
+
+
+def test_auto_warmups_follow_configured_backends(pool_settings):
+    pool_settings.CPU_POOL_WARMUP = "auto"
+    pool_settings.OCR_BACKEND = "tesseract"
+    assert "tesseract" in process_pool.warmups()
+
+    pool_settings.OCR_BACKEND = "google"
+    assert "tesseract" not in process_pool.warmups()
+
+    pool_settings.OCR_BACKEND = "google, tesseract"
+    assert "tesseract" in process_pool.warmups()
+
+    pool_settings.CPU_POOL_WARMUP = "bge, tesseract"
+    assert process_pool.warmups() == ["bge", "tesseract"]
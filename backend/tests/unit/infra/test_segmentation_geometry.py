@@ -0,0 +1,163 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.infra.segmentation_geometry import GeometrySegmentationService
+from app.schemas.ocr import OCRResult
+from app.schemas.ocr_blocks import block_text
+
+DATA = Path(__file__).parents[2] / "data"
+
+
+def box(x0, y0, x1, y1):
+    return {"vertices": [{"x": x0, "y": y0}, {"x": x1, "y": y0}, {"x": x1, "y": y1}, {"x": x0, "y": y1}]}
+
+
+def block(x, y, lines, height=20, width=400):
+    """A Tesseract block of `lines` (strings) set in type of `height` px."""
+    out_lines = []
+    for n, text in enumerate(lines):
+        top = y + n * int(height * 1.5)
+        words, left = [], x
+        for word in text.split():
+            words.append({"text": word, "boundingBox": box(left, top, left + 12 * len(word), top + height)})
+            left += 12 * len(word) + 10
+        out_lines.append({"boundingBox": box(x, top, x + width, top + height), "text": text, "words": words})
+    bottom = y + (len(lines) - 1) * int(height * 1.5) + height
+    return {
+        "blockType": "TEXT",
+        "boundingBox": box(x, y, x + width, bottom),
+        "text": "\n".join(lines),
+        "lines": out_lines,
+    }
+
+
+BODY = ["some words of the method that go on", "and on for a while until the dish is done"]
+
+
+def ocr(blocks):
+    return OCRResult(page_id="p1", full_text="", blocks=blocks)
+
+
+@pytest.mark.asyncio
+async def test_two_column_page_is_split_at_titles_in_reading_order():
+    blocks = [
+        block(600, 100, BODY * 2),
+        block(100, 100, ["Tomato Soup"], height=40),
+        block(100, 160, BODY * 3),
+        block(100, 400, BODY * 3),
+        block(600, 400, ["Apple Pie"], height=40),
+        block(600, 460, BODY * 3),
+    ]
+
+    result = await GeometrySegmentationService().segment(ocr(blocks), True)
+
+    assert result.segmentation_done is True
+    titles = [segment.title for segment in result.page_segments]
+    assert titles == ["Tomato Soup", "Apple Pie"]
+    # the top of the right column continues the soup from the bottom of the left one
+    soup, pie = result.page_segments
+    assert soup.associated_ocr_blocks == [1, 2, 3, 0]
+    assert pie.associated_ocr_blocks == [4, 5]
+    assert soup.bounding_boxes == [box(100, 100, 500, 570)["vertices"], box(600, 100, 1000, 210)["vertices"]]
+    assert 0 < result.confidence <= 1
+    assert result.confidence == min(segment.confidence for segment in result.page_segments)
+
+
+@pytest.mark.asyncio
+async def test_text_before_the_first_title_continues_the_previous_page():
+    blocks = [
+        block(100, 100, BODY * 3),
+        block(100, 300, ["Apple Pie"], height=40),
+        block(100, 360, BODY * 3),
+    ]
+
+    result = await GeometrySegmentationService().segment(ocr(blocks), True)
+
+    assert [segment.title for segment in result.page_segments] == ["previous_page", "Apple Pie"]
+    assert [segment.associated_ocr_blocks for segment in result.page_segments] == [[0], [1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_short_header_belongs_to_the_only_recipe():
+    blocks = [
+        block(100, 40, ["Chapter 3"]),
+        block(100, 100, ["Apple Pie"], height=40),
+        block(100, 160, BODY * 3),
+    ]
+
+    result = await GeometrySegmentationService().segment(ocr(blocks), True)
+
+    assert [segment.title for segment in result.page_segments] == ["Apple Pie"]
+    assert result.page_segments[0].associated_ocr_blocks == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_short_header_belongs_to_the_first_of_two_recipes():
+    blocks = [
+        block(100, 40, ["Chapter 3"]),
+        block(100, 100, ["Apple Pie"], height=40),
+        block(100, 160, BODY * 3),
+        block(100, 400, ["Plum Cake"], height=40),
+        block(100, 460, BODY * 3),
+    ]
+
+    result = await GeometrySegmentationService().segment(ocr(blocks), True)
+
+    assert [segment.title for segment in result.page_segments] == ["Apple Pie", "Plum Cake"]
+    assert [segment.associated_ocr_blocks for segment in result.page_segments] == [[0, 1, 2], [3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_title_confidence_follows_size_gap_and_length():
+    clear = [block(100, 100, ["Apple Pie"], height=60), block(100, 200, BODY * 10)]
+    # barely larger, pressed against the text above and followed by a single line
+    doubtful = [
+        block(100, 100, BODY * 3),
+        block(100, 195, ["Apple Pie"], height=28),
+        block(100, 230, BODY[:1]),
+    ]
+
+    service = GeometrySegmentationService()
+    clear_result = await service.segment(ocr(clear), True)
+    doubtful_result = await service.segment(ocr(doubtful), True)
+
+    assert clear_result.confidence == pytest.approx(1.0)
+    assert doubtful_result.segmentation_done is True
+    assert doubtful_result.confidence < 0.5
+
+
+@pytest.mark.asyncio
+async def test_page_without_titles_stays_whole():
+    blocks = [block(100, 100, BODY), block(100, 200, BODY)]
+
+    result = await GeometrySegmentationService().segment(ocr(blocks), True)
+
+    assert result.segmentation_done is False
+    assert len(result.page_segments) == 1
+    assert result.page_segments[0].associated_ocr_blocks == [0, 1]
+    assert result.confidence == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_segmentation_disabled_or_empty_page():
+    service = GeometrySegmentationService()
+
+    disabled = await service.segment(ocr([block(100, 100, ["Apple Pie"], height=40)]), False)
+    empty = await service.segment(ocr([]), True)
+
+    assert disabled.segmentation_done is False and disabled.confidence is None
+    assert empty.page_segments[0].associated_ocr_blocks == []
+
+
+@pytest.mark.asyncio
+async def test_google_vision_page_with_title_across_blocks():
+    response = json.loads((DATA / "google_vision_response_1.json").read_text())
+    blocks = response["responses"][0]["fullTextAnnotation"]["pages"][0]["blocks"]
+
+    result = await GeometrySegmentationService().segment(ocr(blocks), True)
+
+    assert [segment.title for segment in result.page_segments] == ["Lapin aux pruneaux"]
+    assert sorted(result.page_segments[0].associated_ocr_blocks) == list(range(len(blocks)))
+    assert block_text(blocks[0]) == "Lapin"
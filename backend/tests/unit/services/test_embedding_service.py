@@ -190,3 +190,38 @@ async def test_index_returns_zero_if_no_recipe():
     assert n == 0
     assert store.add_calls == []
     assert store.delete_calls == []
+
+
+# ---------------------------------------------------
+# index_many() tests
+# ---------------------------------------------------
+
+
+class FakeRecipesById(FakeRecipeRepo):
+    def __init__(self, recipes):
+        super().__init__(None)
+        self.recipes = recipes
+
+    async def get(self, recipe_id, owner_id):
+        self.calls.append((recipe_id, owner_id))
+        return self.recipes.get(recipe_id)
+
+
+@pytest.mark.asyncio
+async def test_index_many_adds_all_recipes_in_one_call():
+    r1 = make_recipe_full()
+    r2 = make_recipe_full()
+    r2.id = "r2"
+    repo = FakeRecipesById({"r1": r1, "r2": r2})
+    store = FakeStore()
+
+    svc = EmbeddingService(repo, FakeChunker(["A", "B"]))
+    n = await svc.index_many(
+        store, [("r1", "u1", True), ("r2", "u1", False), ("missing", "u1", True), ("r1", "u1", False)]
+    )
+
+    assert n == 4
+    assert repo.calls == [("r1", "u1"), ("r2", "u1"), ("missing", "u1")]
+    assert store.delete_calls == [["r1:0", "r1:1"]]
+    assert len(store.add_calls) == 1
+    assert store.add_calls[0].ids == ["r1:0", "r1:1", "r2:0", "r2:1"]
@@ -1,13 +1,20 @@
 import asyncio
 import io
+import os
+import zipfile
 from datetime import datetime
 from unittest.mock import AsyncMock
 
 import pytest
-from fastapi import UploadFile
+from fastapi import BackgroundTasks, UploadFile
+from PIL import Image
 
+from app.core.config import get_settings
+from app.infra.document_pages import UnsupportedDocument
+from app.infra.storage_local import LocalStorageService
 from app.schemas.ocr import PageScanRead
 from app.services.image_ingest_service import ImageIngestService
+from app.workflows.queues.admission import QueueSaturated
 
 
 @pytest.mark.asyncio
@@ -61,3 +68,177 @@ async def test_ingest_pages():
     queued_item = await mock_queue.get()
     assert queued_item.id == "img-abc"
     assert queued_item.filename == "img-abc.jpg"
+
+
+def pdf_upload(n_pages):
+    pages = [Image.new("RGB", (200, 280), color=(10 * i, 255, 255)) for i in range(n_pages)]
+    buf = io.BytesIO()
+    pages[0].save(buf, format="PDF", save_all=True, append_images=pages[1:])
+    buf.seek(0)
+    return UploadFile(filename="book.pdf", file=buf, headers={"content-type": "application/pdf"})
+
+
+def numbered_repo():
+    repo = AsyncMock()
+    saved = []
+
+    async def save(create, owner_id):
+        saved.append(create.filename)
+        return PageScanRead(
+            id=f"img-{len(saved)}",
+            filename=create.filename,
+            bookScanID=create.bookScanID,
+            page_number=len(saved),
+            scanDate=datetime.now(),
+        )
+
+    async def update(dto, owner_id):
+        return PageScanRead(
+            id=dto.id, filename=dto.filename, bookScanID="scan-1", page_number=0, scanDate=datetime.now()
+        )
+
+    repo.save.side_effect = save
+    repo.update.side_effect = update
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_ingest_pdf_queues_every_page_in_order(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+    queue = asyncio.Queue()
+    service = ImageIngestService(storage=storage, image_repo=numbered_repo(), queue=queue)
+
+    result = await service.ingest_pages("scan-1", [pdf_upload(5)], "user-1")
+
+    assert result == [f"img-{i}" for i in range(1, 6)]
+    assert [queue.get_nowait().id for _ in range(5)] == result
+    # the pages are JPEGs rendered from the PDF, the upload itself is gone
+    assert sorted(os.listdir(storage.scanner_image_dir)) == [f"img-{i}.jpg" for i in range(1, 6)]
+    with Image.open(os.path.join(storage.scanner_image_dir, "img-3.jpg")) as page:
+        assert page.format == "JPEG"
+        assert page.size == pytest.approx((200 / 72 * 300, 280 / 72 * 300), abs=1)
+
+
+@pytest.mark.asyncio
+async def test_ingest_zip_extracts_images_in_natural_order(tmp_path):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, fmt, color in [
+            ("scan10.png", "PNG", "blue"),
+            ("scan2.jpg", "JPEG", "lime"),
+            ("scan1.png", "PNG", "red"),
+        ]:
+            buf = io.BytesIO()
+            Image.new("RGB", (20, 20), color=color).save(buf, format=fmt)
+            zf.writestr(f"book/{name}", buf.getvalue())
+        zf.writestr("book/notes.txt", "not a page")
+        zf.writestr("__MACOSX/book/._scan1.png", "resource fork")
+    archive.seek(0)
+
+    storage = LocalStorageService(str(tmp_path))
+    repo = numbered_repo()
+    queue = asyncio.Queue()
+    service = ImageIngestService(storage=storage, image_repo=repo, queue=queue)
+
+    result = await service.ingest_pages("scan-1", [UploadFile(filename="book.zip", file=archive)], "user-1")
+
+    assert result == ["img-1", "img-2", "img-3"]
+    assert queue.qsize() == 3
+    colors = []
+    for page_id in result:
+        with Image.open(os.path.join(storage.scanner_image_dir, f"{page_id}.jpg")) as page:
+            assert page.format == "JPEG"
+            colors.append(max(range(3), key=lambda c: page.getpixel((10, 10))[c]))
+    # scan1, scan2, scan10
+    assert colors == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_ingest_rejects_unreadable_documents(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+    service = ImageIngestService(storage=storage, image_repo=numbered_repo(), queue=asyncio.Queue())
+    broken = UploadFile(filename="book.pdf", file=io.BytesIO(b"%PDF-1.4 truncated"))
+
+    with pytest.raises(UnsupportedDocument):
+        await service.ingest_pages("scan-1", [broken], "user-1")
+
+    assert os.listdir(storage.scanner_image_dir) == []
+
+
+def zip_upload(members):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    archive.seek(0)
+    return UploadFile(filename="book.zip", file=archive)
+
+
+def png_bytes(color):
+    buf = io.BytesIO()
+    Image.new("RGB", (20, 20), color=color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_ingest_skips_unreadable_pages(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+    repo = numbered_repo()
+    queue = asyncio.Queue()
+    service = ImageIngestService(storage=storage, image_repo=repo, queue=queue)
+    upload = zip_upload([("p1.png", png_bytes("red")), ("p2.png", b"not an image"), ("p3.png", png_bytes("blue"))])
+
+    result = await service.ingest_pages("scan-1", [upload], "user-1")
+
+    assert result == ["img-1", "img-2", "img-3"]
+    assert [queue.get_nowait().id for _ in range(queue.qsize())] == ["img-1", "img-3"]
+    repo.delete.assert_awaited_once_with("img-2", "user-1")
+    assert sorted(os.listdir(storage.scanner_image_dir)) == ["img-1.jpg", "img-3.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_failed_ingest_leaves_no_pages_or_files_behind(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+    repo = numbered_repo()
+    repo.update.side_effect = RuntimeError("database gone")
+    service = ImageIngestService(storage=storage, image_repo=repo, queue=asyncio.Queue())
+
+    with pytest.raises(RuntimeError):
+        await service.ingest_pages("scan-1", [pdf_upload(4)], "user-1")
+
+    assert os.listdir(storage.scanner_image_dir) == []
+    assert sorted(call.args[0] for call in repo.delete.await_args_list) == [f"img-{i}" for i in range(1, 5)]
+
+
+@pytest.mark.asyncio
+async def test_documents_are_admitted_by_their_page_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "OCR_QUEUE_HIGH_WATER", 3)
+    storage = LocalStorageService(str(tmp_path))
+    repo = numbered_repo()
+    queue = asyncio.Queue()
+    await queue.put("queued")
+    service = ImageIngestService(storage=storage, image_repo=repo, queue=queue)
+
+    with pytest.raises(QueueSaturated):
+        await service.ingest_pages("scan-1", [pdf_upload(5)], "user-1")
+
+    repo.save.assert_not_awaited()
+    assert os.listdir(storage.scanner_image_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_document_pages_are_extracted_in_the_background(tmp_path):
+    storage = LocalStorageService(str(tmp_path))
+    queue = asyncio.Queue()
+    service = ImageIngestService(storage=storage, image_repo=numbered_repo(), queue=queue)
+    background = BackgroundTasks()
+
+    result = await service.ingest_pages("scan-1", [pdf_upload(3)], "user-1", background=background)
+
+    assert result == ["img-1", "img-2", "img-3"]
+    assert queue.empty()
+
+    await background()
+
+    assert [queue.get_nowait().id for _ in range(3)] == result
+    assert sorted(os.listdir(storage.scanner_image_dir)) == ["img-1.jpg", "img-2.jpg", "img-3.jpg"]
@@ -1,6 +1,8 @@
 import pytest
 from conftest import get_test_file
+from PIL import Image
 
+from app.services.text_or_image_numpy import TextOrImageNumpy
 from app.services.text_or_image_simple import TextOrImageSimple
 
 TEST_IMAGES = {
@@ -19,3 +21,31 @@ def test_looks_text_heavy_with_real_images(filename, expected):
     if not expected:
         result = classifier.is_text_page(image_path)
     assert result == expected, f"Image {filename} misclassified: {result}"
+
+
+@pytest.mark.parametrize("filename, expected", TEST_IMAGES.items())
+def test_numpy_classifier_with_real_images(filename, expected):
+    result = TextOrImageNumpy().classify(get_test_file("storage/pages/" + filename))
+
+    assert result.is_text == expected, f"Image {filename} misclassified: {result}"
+    assert result.confidence > 0.9
+
+
+def test_numpy_classifier_is_deterministic_and_format_independent(tmp_path):
+    source = get_test_file("storage/pages/text_1.png")
+    jpeg = tmp_path / "text_1.jpg"
+    Image.open(source).convert("RGB").save(jpeg, quality=80)
+    classifier = TextOrImageNumpy()
+
+    assert classifier.classify(source) == classifier.classify(source)
+    assert classifier.is_text_page(str(jpeg))
+
+
+def test_numpy_classifier_routes_unreadable_files_to_ocr(tmp_path):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+
+    result = TextOrImageNumpy().classify(str(broken))
+
+    assert result.is_text
+    assert result.confidence == 0.0
@@ -34,6 +34,25 @@ def make_input_page(pid: str, page_number: int, page_type: PageType = PageType.T
     )
 
 
+@pytest.mark.asyncio
+async def test_check_grouping_flags_doubtful_group_in_unattended_mode(monkeypatch):
+    """The reason is returned in the patch; the graph comes back to the node for the review."""
+
+    def fake_interrupt(payload):
+        raise AssertionError("the review waits for the next pass")
+
+    monkeypatch.setattr(
+        "app.workflows.classification.nodes.check_grouping.interrupt",
+        fake_interrupt,
+    )
+
+    state = ClassificationGraphState(input_pages=[make_input_page("p1", 1, PageType.IMAGE)])
+
+    out = await check_grouping(state, {"configurable": {"auto_approve": True}})
+
+    assert out == {"review_reason": "no text page in the group"}
+
+
 @pytest.mark.asyncio
 async def test_check_grouping_reject(monkeypatch):
     """If user_response.approved == False -> current_recipe_state is None."""
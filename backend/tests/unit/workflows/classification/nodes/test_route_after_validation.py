@@ -1,4 +1,5 @@
 from app.schemas.ocr import ClassificationGraphState
+from app.schemas.recipe import RecipeCreate
 from app.workflows.classification.nodes.routers import route_after_validate
 
 
@@ -10,3 +11,16 @@ def test_route_after_validate_first_pass():
 def test_route_after_validate_to_taxonomy():
     state = ClassificationGraphState(first_pass_validation=False)
     assert route_after_validate(state) == "to_taxonomy"
+
+
+def test_route_after_validate_unattended():
+    recipe = RecipeCreate(title="Apple Pie")
+    config = {"configurable": {"auto_approve": True}}
+
+    confident = ClassificationGraphState(first_pass_validation=True, current_recipe_state=recipe)
+    flagged = ClassificationGraphState(first_pass_validation=True, current_recipe_state=recipe, review_reason="why")
+    invalid = ClassificationGraphState(first_pass_validation=True, review_reason="invalid recipe")
+
+    assert route_after_validate(confident, config) == "to_taxonomy"
+    assert route_after_validate(flagged, config) == "to_user_confirmation"
+    assert route_after_validate(invalid, config) == "to_grouping_review"
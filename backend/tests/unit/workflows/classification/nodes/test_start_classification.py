@@ -4,6 +4,7 @@ from app.schemas.ocr import (
     ClassificationGraphState,
     ClassificationRecordInputPage,
     PageType,
+    SegmentationSegment,
 )
 from app.workflows.classification.nodes.start_classification import start_classification
 
@@ -12,11 +13,18 @@ class FakeStorage:
     def __init__(self, data):
         self.data = data
         self.calls = []
+        # pages whose blocks were loaded
+        self.block_reads = []
 
-    async def read_json(self, pid):
+    async def read_ocr(self, pid):
         self.calls.append(pid)
+        self.block_reads.append(pid)
         return self.data[pid]
 
+    async def read_ocr_text(self, pid):
+        self.calls.append(pid)
+        return self.data[pid]["full_text"]
+
 
 class FakeClassifier:
     def __init__(self, result=None):
@@ -62,10 +70,10 @@ async def test_start_classification_skips_non_text_pages():
     # Only text page read
     assert storage.calls == ["p2"]
 
-    # classify called with 1 block
+    # classify called with the text only
     assert len(classifier.calls) == 1
     blocks, ocr_obj = classifier.calls[0]
-    assert blocks == [{"id": 1}]
+    assert blocks == []
     assert ocr_obj.full_text == "hello"
     assert result == {"llm_candidate": classifier.result}
 
@@ -90,12 +98,13 @@ async def test_start_classification_multiple_text_pages_segmentation_false():
 
     result = await start_classification(state, config)
 
-    # Both TEXT pages read
+    # Both TEXT pages read, without their blocks
     assert storage.calls == ["p1", "p2"]
+    assert storage.block_reads == []
 
-    # OCR blocks aggregated
+    # whole pages are classified from their text, no blocks are loaded
     blocks, ocr_obj = classifier.calls[0]
-    assert blocks == [{"a": 1}, {"b": 2}]
+    assert blocks == []
 
     # full text combined
     assert ocr_obj.full_text == "A\n\nB"
@@ -127,18 +136,36 @@ async def test_start_classification_segmentation_done_true():
     assert storage.calls == ["p1"]
 
     blocks, ocr_obj = classifier.calls[0]
-    assert blocks == [{"s": 9}]
+    assert blocks == []
     assert ocr_obj.full_text == "Segmented"
 
     assert result == {"llm_candidate": classifier.result}
 
 
+@pytest.mark.asyncio
+async def test_start_classification_uses_only_the_segment_blocks():
+    page = make_input_page("p1", PageType.TEXT, segmentation_done=True)
+    page.relevant_segment = SegmentationSegment(
+        id=1, title="Soup", bounding_boxes=[], associated_ocr_blocks=[1, 2], confidence=0.9
+    )
+    blocks = [{"text": "Salad"}, {"text": "Soup"}, {"text": "2 carrots"}]
+    storage = FakeStorage({"p1": {"page_id": "p1", "full_text": "Salad\n\nSoup\n\n2 carrots", "blocks": blocks}})
+    classifier = FakeClassifier()
+
+    state = ClassificationGraphState(input_pages=[page])
+    config = {"configurable": {"classification_service": classifier, "storage": storage}}
+
+    await start_classification(state, config)
+
+    assert storage.block_reads == ["p1"]
+    used_blocks, ocr_obj = classifier.calls[0]
+    assert used_blocks == [{"text": "Soup"}, {"text": "2 carrots"}]
+    assert ocr_obj.full_text == "Soup\n\n2 carrots"
+
+
 @pytest.mark.asyncio
 async def test_start_classification_raises_if_no_text_pages():
-    """
-    If no TEXT pages exist, base_result stays None and code
-    will fail at base_result.page_id. This should propagate.
-    """
+    """If no TEXT pages exist there is nothing to classify."""
     pages = [
         make_input_page("i1", PageType.IMAGE),
         make_input_page("i2", PageType.IMAGE),
@@ -150,7 +177,7 @@ async def test_start_classification_raises_if_no_text_pages():
     state = ClassificationGraphState(input_pages=pages)
     config = {"configurable": {"classification_service": classifier, "storage": storage}}
 
-    with pytest.raises(Exception):
+    with pytest.raises(ValueError):
         await start_classification(state, config)
 
 
@@ -159,7 +186,7 @@ async def test_start_classification_propagates_storage_error():
     pages = [make_input_page("p1", PageType.TEXT)]
 
     class FailingStorage(FakeStorage):
-        async def read_json(self, page_id):
+        async def read_ocr_text(self, page_id):
             raise RuntimeError("Storage error")
 
     storage = FailingStorage({})
@@ -0,0 +1,184 @@
+from types import SimpleNamespace
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Command
+
+from app.infra.validation_simple import ValidationSimple
+from app.schemas.ocr import (
+    ClassificationGraphState,
+    ClassificationRecordInputPage,
+    GroupApproval,
+    PageType,
+    RecipeApproval,
+    RecordStatus,
+)
+from app.schemas.recipe import RecipeCreate, RecipeIngredientCreate
+from app.workflows.classification.auto_approve import grouping_review_reason, recipe_review_reason
+from app.workflows.classification.graph_builder import build_classification_graph
+
+GOOD = {
+    "title": "Apple Pie",
+    "ingredients": [{"name": "apples"}, {"name": "flour"}, {"name": "butter"}],
+    "instructions": ["Mix", "Bake"],
+}
+
+
+class FakeClassifier:
+    def __init__(self, candidate):
+        self.candidate = candidate
+        self.calls = 0
+
+    async def classify(self, blocks, ocr_result):
+        self.calls += 1
+        return self.candidate
+
+
+class FakeStorage:
+    async def read_ocr(self, page_id):
+        return {"page_id": page_id, "full_text": "Apple Pie ...", "blocks": []}
+
+    async def read_ocr_text(self, page_id):
+        return "Apple Pie ..."
+
+    async def copy_to_recipe(self, name):
+        pass
+
+
+class FakeRecords:
+    def __init__(self):
+        self.updated = []
+
+    async def update(self, dto, owner_id=None):
+        self.updated.append(dto)
+
+
+class FakeRecipes:
+    def __init__(self):
+        self.added = []
+
+    async def add(self, recipe, owner_id):
+        self.added.append(recipe)
+        return SimpleNamespace(id="recipe-1")
+
+
+class FakeBooks:
+    async def get(self, book_id, owner_id):
+        return SimpleNamespace(title="Grandma's cookbook")
+
+
+async def no_broadcast(message):
+    pass
+
+
+def run_config(classifier, auto_approve=True):
+    return {
+        "configurable": {
+            "classification_service": classifier,
+            "validation_service": ValidationSimple(),
+            # text pages only, no thumbnail is made
+            "thumbnail_service": None,
+            "storage": FakeStorage(),
+            "classification_repo": FakeRecords(),
+            "recipe_repo": FakeRecipes(),
+            "book_repo": FakeBooks(),
+            "image_repo": None,
+            "owner_id": "u1",
+            "thread_id": "rec-1",
+            "auto_approve": auto_approve,
+        }
+    }
+
+
+def text_pages(n):
+    return [
+        ClassificationRecordInputPage(original_id=f"p{i}", page_number=i, page_type=PageType.TEXT) for i in range(n)
+    ]
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    monkeypatch.setattr("app.workflows.classification.nodes.approve_classification.broadcast_status", no_broadcast)
+    return build_classification_graph(checkpointer=InMemorySaver())
+
+
+def state(pages):
+    return ClassificationGraphState(classification_record_id="rec-1", book_scan_id="b1", input_pages=pages)
+
+
+def waiting_for(result):
+    return [key for interrupt in result.get("__interrupt__", []) for key in interrupt.value]
+
+
+@pytest.mark.asyncio
+async def test_confident_record_is_saved_without_reviews(graph):
+    config = run_config(FakeClassifier(GOOD))
+
+    result = await graph.ainvoke(state(text_pages(1)), config=config)
+
+    assert waiting_for(result) == []
+    [recipe] = config["configurable"]["recipe_repo"].added
+    assert recipe.title == "Apple Pie"
+    assert recipe.categories == ["Dinner"] and recipe.tags == ["scanned"]
+    assert recipe.source == "Grandma's cookbook"
+    assert config["configurable"]["classification_repo"].updated[0].status == RecordStatus.APPROVED
+
+
+@pytest.mark.asyncio
+async def test_doubtful_recipe_waits_for_review_then_every_step_is_reviewed(graph):
+    config = run_config(FakeClassifier({**GOOD, "ingredients": [{"name": "apples"}]}))
+
+    result = await graph.ainvoke(state(text_pages(1)), config=config)
+
+    assert waiting_for(result) == ["request_to_approve_llm"]
+    assert result["review_reason"] == "1 ingredient(s)"
+    assert result["current_recipe_state"].title == "Apple Pie"
+
+    # resumed from the API, which does not enable the mode
+    manual = {"configurable": {**config["configurable"], "auto_approve": False}}
+    resumed = await graph.ainvoke(Command(resume={"response_to_approve_llm": RecipeApproval()}), config=manual)
+    assert waiting_for(resumed) == ["request_to_approve_taxonomy"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_candidate_goes_back_to_the_grouping_review(graph):
+    classifier = FakeClassifier({"title": "Apple Pie", "ingredients": [{"name": "apples"}]})
+    config = run_config(classifier)
+
+    result = await graph.ainvoke(state(text_pages(1)), config=config)
+
+    assert waiting_for(result) == ["request_to_approve_grouping"]
+    assert result["current_recipe_state"] is None
+    assert result["review_reason"].startswith("invalid recipe")
+    assert classifier.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_doubtful_grouping_is_reviewed_before_any_llm_call(graph):
+    classifier = FakeClassifier(GOOD)
+    config = run_config(classifier)
+
+    result = await graph.ainvoke(state(text_pages(4)), config=config)
+
+    assert waiting_for(result) == ["request_to_approve_grouping"]
+    assert result["review_reason"] == "4 text pages in the group"
+    assert classifier.calls == 0
+
+    # the user approves the grouping; the recipe is reviewed as well
+    manual = {"configurable": {**config["configurable"], "auto_approve": False}}
+    resumed = await graph.ainvoke(Command(resume={"response_to_approve_grouping": GroupApproval()}), config=manual)
+    assert waiting_for(resumed) == ["request_to_approve_llm"]
+
+
+def test_review_reasons():
+    image_only = [ClassificationRecordInputPage(original_id="i", page_number=1, page_type=PageType.IMAGE)]
+    assert grouping_review_reason(text_pages(2)) is None
+    assert grouping_review_reason(image_only) == "no text page in the group"
+    assert grouping_review_reason(text_pages(4)) == "4 text pages in the group"
+
+    ingredients = [RecipeIngredientCreate(name="apples"), RecipeIngredientCreate(name="flour")]
+    assert recipe_review_reason(RecipeCreate(title="Apple Pie", ingredients=ingredients)) is None
+    long_title = RecipeCreate(title=" ".join(["word"] * 13), ingredients=ingredients)
+    assert recipe_review_reason(long_title) == "title of 13 words"
+    method_as_ingredient = RecipeCreate(title="Pie", ingredients=[*ingredients, RecipeIngredientCreate(name="x" * 81)])
+    assert recipe_review_reason(method_as_ingredient) == "ingredient longer than a line"
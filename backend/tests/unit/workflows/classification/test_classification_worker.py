@@ -3,7 +3,9 @@ from datetime import datetime
 from types import SimpleNamespace
 
 import pytest
+from langgraph.checkpoint.memory import InMemorySaver
 
+from app.infra.validation_simple import ValidationSimple
 from app.schemas.ocr import (
     ClassificationRecordCreate,
     ClassificationRecordInputPage,
@@ -14,11 +16,13 @@ from app.schemas.ocr import (
     RecordStatus,
     SegmentationSegment,
 )
+from app.schemas.recipe import RecipeCreate
 from app.workflows.classification.classification_worker import (
     ClassificationWorker,
     MotifType,
     infer_global_motif,
 )
+from app.workflows.classification.graph_builder import build_classification_graph
 from app.workflows.queues.queues import ClassificationJob
 
 #
@@ -34,6 +38,9 @@ class FakeClassificationRepo:
         self.updated = []
         self.to_return_get_all = []
         self.owner = None
+        self.deleted = []
+        self.used_page_ids = set()
+        self.used_pages_calls = []
 
     async def save(self, record: ClassificationRecordCreate, owner_id: str):
         self.saved.append((record, owner_id))
@@ -54,6 +61,13 @@ class FakeClassificationRepo:
     async def get_all_by_book_id(self, book_id: str, owner_id: str):
         return self.to_return_get_all
 
+    async def get_used_page_ids(self, book_id: str, owner_id: str = None):
+        self.used_pages_calls.append((book_id, owner_id))
+        return set(self.used_page_ids)
+
+    async def delete(self, record_id: str, owner_id: str = None):
+        self.deleted.append(record_id)
+
 
 class FakeGraph:
     def __init__(self, result=None, exc=None):
@@ -89,10 +103,19 @@ class FakePageRepo:
 
 
 class FakeRecipeRepo:
+    def __init__(self):
+        self.added = []
+
     async def add(self, recipe, owner_id):
+        self.added.append(recipe)
         return SimpleNamespace(id="recipe-1")
 
 
+class FakeBookRepo:
+    async def get(self, book_id, owner_id):
+        return SimpleNamespace(title="Grandma's cookbook")
+
+
 #
 # -----------------------------
 #   Page factory
@@ -191,16 +214,7 @@ def test_infer_global_motif_equal_counts_first_text():
 @pytest.mark.asyncio
 async def test_collect_used_pages_for_book():
     repo = FakeClassificationRepo()
-    repo.to_return_get_all = [
-        SimpleNamespace(
-            text_pages=[SimpleNamespace(id="t1"), SimpleNamespace(id="t2")],
-            image_pages=[SimpleNamespace(id="i1")],
-        ),
-        SimpleNamespace(
-            text_pages=[SimpleNamespace(id="t2")],  # duplicate
-            image_pages=[SimpleNamespace(id="i3")],
-        ),
-    ]
+    repo.used_page_ids = {"t1", "t2", "i1", "i3"}
     worker = ClassificationWorker(
         class_queue=asyncio.Queue(),
         image_repo=FakePageRepo(),
@@ -210,10 +224,12 @@ async def test_collect_used_pages_for_book():
         storage=FakeStorage(),
         classification_repo=repo,
         recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
     )
 
     used = await worker.collect_used_pages_for_book("book-1", owner_id="user1")
     assert used == {"t1", "t2", "i1", "i3"}
+    assert repo.used_pages_calls == [("book-1", "user1")]
 
 
 #
@@ -287,6 +303,7 @@ async def test_run_classification_graph_interrupt(monkeypatch):
         storage=FakeStorage(),
         classification_repo=repo,
         recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
     )
 
     pages = [ClassificationRecordInputPage(original_id="p1", page_number=1, page_type=PageType.TEXT)]
@@ -317,6 +334,7 @@ async def test_run_classification_graph_no_interrupt(monkeypatch):
         storage=FakeStorage(),
         classification_repo=repo,
         recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
     )
 
     pages = [ClassificationRecordInputPage(original_id="p1", page_number=1, page_type=PageType.TEXT)]
@@ -329,6 +347,107 @@ async def test_run_classification_graph_no_interrupt(monkeypatch):
     assert repo.updated == []
 
 
+@pytest.mark.asyncio
+async def test_run_classification_graph_unattended(monkeypatch):
+    recipe = RecipeCreate(title="Apple Pie")
+    flagged = FakeGraph(result={"__interrupt__": True, "current_recipe_state": recipe, "thumbnail_path": "thumb"})
+    saved = FakeGraph(result={"current_recipe_state": recipe})
+    pages = [ClassificationRecordInputPage(original_id="p1", page_number=1, page_type=PageType.TEXT)]
+
+    updates = []
+    for graph in (flagged, saved):
+        monkeypatch.setattr("app.workflows.classification.classification_worker.CLASS_GRAPH", graph)
+        repo = FakeClassificationRepo()
+        worker = ClassificationWorker(
+            class_queue=asyncio.Queue(),
+            image_repo=FakePageRepo(),
+            classification_service=FakeClassService(),
+            validation_service=FakeValidation(),
+            thumbnail_service=FakeThumbnail(),
+            storage=FakeStorage(),
+            classification_repo=repo,
+            recipe_repo=FakeRecipeRepo(),
+            book_repo=FakeBookRepo(),
+            auto_approve=True,
+        )
+        await worker.run_classification_graph("book-1", pages, owner_id="u1")
+        assert graph.calls[0][1]["configurable"]["auto_approve"] is True
+        [(update, _)] = repo.updated
+        updates.append(update)
+
+    # flagged recipe waits at its review, a saved one only records its pages
+    assert updates[0].status == RecordStatus.NEEDS_REVIEW and updates[0].thumbnail_path == "thumb"
+    assert updates[1].status is None and [p.id for p in updates[1].text_pages] == ["p1"]
+
+
+@pytest.mark.asyncio
+async def test_unattended_worker_saves_confident_record_through_the_real_graph(monkeypatch):
+    class ConfidentClassifier:
+        async def classify(self, blocks, ocr_result):
+            return {"title": "Apple Pie", "ingredients": ["apples", "flour"], "instructions": ["Bake"]}
+
+    class TextStorage:
+        async def read_ocr_text(self, page_id):
+            return "Apple Pie ..."
+
+    async def no_broadcast(message):
+        pass
+
+    monkeypatch.setattr(
+        "app.workflows.classification.classification_worker.CLASS_GRAPH",
+        build_classification_graph(checkpointer=InMemorySaver()),
+    )
+    monkeypatch.setattr("app.workflows.classification.nodes.approve_classification.broadcast_status", no_broadcast)
+    repo = FakeClassificationRepo()
+    recipes = FakeRecipeRepo()
+    worker = ClassificationWorker(
+        class_queue=asyncio.Queue(),
+        image_repo=FakePageRepo(),
+        classification_service=ConfidentClassifier(),
+        validation_service=ValidationSimple(),
+        # text pages only, no thumbnail is made
+        thumbnail_service=None,
+        storage=TextStorage(),
+        classification_repo=repo,
+        recipe_repo=recipes,
+        book_repo=FakeBookRepo(),
+        auto_approve=True,
+    )
+
+    pages = [ClassificationRecordInputPage(original_id="p1", page_number=1, page_type=PageType.TEXT)]
+    await worker.run_classification_graph("book-1", pages, owner_id="u1")
+
+    assert repo.deleted == []
+    [recipe] = recipes.added
+    assert recipe.source == "Grandma's cookbook"
+    assert repo.updated[0][0].status == RecordStatus.APPROVED
+
+
+@pytest.mark.asyncio
+async def test_run_classification_graph_failure_removes_record(monkeypatch):
+    repo = FakeClassificationRepo()
+    monkeypatch.setattr(
+        "app.workflows.classification.classification_worker.CLASS_GRAPH", FakeGraph(exc=RuntimeError("llm down"))
+    )
+    worker = ClassificationWorker(
+        class_queue=asyncio.Queue(),
+        image_repo=FakePageRepo(),
+        classification_service=FakeClassService(),
+        validation_service=FakeValidation(),
+        thumbnail_service=FakeThumbnail(),
+        storage=FakeStorage(),
+        classification_repo=repo,
+        recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
+    )
+
+    pages = [ClassificationRecordInputPage(original_id="p1", page_number=1, page_type=PageType.TEXT)]
+    with pytest.raises(RuntimeError, match="llm down"):
+        await worker.run_classification_graph("book-1", pages, owner_id="u1")
+
+    assert repo.deleted == ["rec-1"]
+
+
 #
 # -----------------------------
 # handle(job)
@@ -348,6 +467,7 @@ async def test_handle_no_pages():
         storage=FakeStorage(),
         classification_repo=repo,
         recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
     )
 
     job = ClassificationJob(owner_id="u1", pages=[])
@@ -366,6 +486,7 @@ async def test_handle_calls_run_for_each_group(monkeypatch):
         storage=FakeStorage(),
         classification_repo=FakeClassificationRepo(),
         recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
     )
 
     pages = [
@@ -449,6 +570,7 @@ async def test_handle_returns_none_when_no_groups():
         storage=FakeStorage(),
         classification_repo=repo,
         recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
     )
 
     job = ClassificationJob(owner_id="u1", pages=[])
@@ -514,3 +636,74 @@ async def test_group_pages_segment_prev_page_keeps_in_group():
     # Should be one group because both are previous_page segments
     assert len(groups) == 1
     assert len(groups[0]) == 2
+
+
+def alternating_pages(n_groups):
+    pages = []
+    for i in range(n_groups):
+        pages += [make_page(f"i{i}", PageType.IMAGE), make_page(f"t{i}", PageType.TEXT)]
+    return pages
+
+
+@pytest.mark.asyncio
+async def test_handle_classifies_groups_concurrently_up_to_the_limit(monkeypatch):
+    worker = ClassificationWorker(
+        class_queue=asyncio.Queue(),
+        image_repo=FakePageRepo(),
+        classification_service=FakeClassService(),
+        validation_service=FakeValidation(),
+        thumbnail_service=FakeThumbnail(),
+        storage=FakeStorage(),
+        classification_repo=FakeClassificationRepo(),
+        recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
+        group_concurrency=3,
+    )
+    running, peak, done = 0, 0, []
+
+    async def fake_run(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        done.append(kwargs["input_pages"][0].original_id)
+
+    monkeypatch.setattr(worker, "run_classification_graph", fake_run)
+
+    await worker.handle(ClassificationJob(owner_id="u1", pages=alternating_pages(7)))
+
+    assert sorted(done) == sorted(f"i{i}" for i in range(7))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_handle_failed_group_does_not_stop_the_others(monkeypatch):
+    worker = ClassificationWorker(
+        class_queue=asyncio.Queue(),
+        image_repo=FakePageRepo(),
+        classification_service=FakeClassService(),
+        validation_service=FakeValidation(),
+        thumbnail_service=FakeThumbnail(),
+        storage=FakeStorage(),
+        classification_repo=FakeClassificationRepo(),
+        recipe_repo=FakeRecipeRepo(),
+        book_repo=FakeBookRepo(),
+        group_concurrency=2,
+    )
+    done = []
+
+    async def fake_run(**kwargs):
+        first = kwargs["input_pages"][0].original_id
+        if first == "i1":
+            raise TimeoutError("provider timed out")
+        await asyncio.sleep(0.01)
+        done.append(first)
+
+    monkeypatch.setattr(worker, "run_classification_graph", fake_run)
+
+    # the job fails with the group's error, so the retry policy can redo that group
+    with pytest.raises(TimeoutError, match="provider timed out"):
+        await worker.handle(ClassificationJob(owner_id="u1", pages=alternating_pages(4)))
+
+    assert sorted(done) == ["i0", "i2", "i3"]
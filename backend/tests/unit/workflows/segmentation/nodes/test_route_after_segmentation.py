@@ -0,0 +1,52 @@
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from unit.workflows.segmentation.nodes.fakes import FakeBroadcast, FakeRepo, FakeSegmentationService
+
+from app.schemas.ocr import OCRResult, PageStatus, SegmentationGraphState, SegmentationResult
+from app.workflows.segmentation.graph_builder import build_segmentation_graph
+from app.workflows.segmentation.nodes.routers import route_after_segmentation
+
+
+def state_with(confidence):
+    return SegmentationGraphState(
+        page_record_id="p1",
+        ocr_result=OCRResult(page_id="p1", full_text="", blocks=[]),
+        segmentation=SegmentationResult(segmentation_done=True, page_segments=[], confidence=confidence),
+    )
+
+
+@pytest.mark.parametrize(
+    "confidence, threshold, route",
+    [
+        (0.9, 0.8, "to_approval"),
+        (0.8, 0.8, "to_approval"),
+        (0.7, 0.8, "to_user_review"),
+        (None, 0.8, "to_user_review"),
+        (1.0, None, "to_user_review"),
+    ],
+)
+def test_route_after_segmentation(confidence, threshold, route):
+    config = {"configurable": {"auto_approve_confidence": threshold}}
+    assert route_after_segmentation(state_with(confidence), config) == route
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("confidence, approved", [(0.95, True), (0.5, False)])
+async def test_graph_skips_review_for_confident_segmentation(monkeypatch, confidence, approved):
+    segmentation = SegmentationResult(segmentation_done=True, page_segments=[], confidence=confidence)
+    repo = FakeRepo()
+    monkeypatch.setattr("app.workflows.segmentation.nodes.approve_segmentation.broadcast_status", FakeBroadcast())
+    graph = build_segmentation_graph(checkpointer=InMemorySaver())
+    config = {
+        "configurable": {
+            "segmentation_service": FakeSegmentationService(result=segmentation),
+            "page_repo": repo,
+            "thread_id": f"p-{confidence}",
+            "auto_approve_confidence": 0.8,
+        }
+    }
+
+    result = await graph.ainvoke(state_with(None), config=config)
+
+    assert ("__interrupt__" not in result) is approved
+    assert [dto.status for dto in repo.update_calls] == ([PageStatus.APPROVED] if approved else [])
@@ -285,6 +285,37 @@ async def test_segmentation_interrupt_updates_and_broadcasts(monkeypatch):
     assert msg.status == PageStatus.NEEDS_REVIEW
 
 
+@pytest.mark.asyncio
+async def test_segmentation_auto_approved_leaves_page_to_graph(monkeypatch):
+    """
+    A confident segmentation runs through approve_segmentation: no interrupt in the result and
+    nothing left for the worker to store.
+    """
+    page_id = "p250"
+    page = PageScanRead(id=page_id, filename="p.jpg", bookScanID="b1", page_number=1, scanDate=scanDate)
+
+    storage = FakeStorage()
+    storage.read_json_values[page_id] = OCRResult(page_id=page_id, full_text="text", blocks=[])
+    page_repo = FakeImageRepository(pages={page_id: page})
+    seg_result = SegmentationResult(segmentation_done=True, page_segments=[], confidence=0.95)
+    fake_graph = FakeSegGraph(result={"page_record_id": page_id, "segmentation": seg_result})
+    monkeypatch.setattr("app.workflows.segmentation.segmentation_worker.SEG_GRAPH", fake_graph)
+
+    worker = SegmentationWorker(
+        seg_queue=asyncio.Queue(),
+        image_repo=page_repo,
+        segmentation_service=FakeSegmentationService(),
+        storage=storage,
+        auto_approve_confidence=0.8,
+    )
+
+    await worker.handle(page)
+
+    _, config = fake_graph.calls[0]
+    assert config["configurable"]["auto_approve_confidence"] == 0.8
+    assert page_repo.update_calls == []
+
+
 @pytest.mark.asyncio
 async def test_segmentation_storage_read_error(monkeypatch):
     page_id = "p300"
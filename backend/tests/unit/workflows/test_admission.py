@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.core.config import get_settings
+from app.workflows.queues.admission import (
+    DEFAULT_RETRY_AFTER_S,
+    MAX_RETRY_AFTER_S,
+    DrainRate,
+    QueueSaturated,
+    admit,
+    retry_after,
+)
+from app.workflows.queues.priority import PriorityQueue
+
+
+def test_drain_rate_over_sliding_window():
+    rate = DrainRate(window_s=10)
+    for t in range(10):
+        rate.record(now=100.0 + t)
+
+    assert rate.per_second(now=109.0) == pytest.approx(10 / 9)
+    # everything has left the window
+    assert rate.per_second(now=200.0) == 0.0
+
+
+def test_retry_after_follows_drain_rate_within_bounds():
+    assert retry_after(excess=10, rate_per_s=2.0) == 5
+    assert retry_after(excess=1, rate_per_s=100.0) == 1
+    assert retry_after(excess=10_000, rate_per_s=0.1) == MAX_RETRY_AFTER_S
+    assert retry_after(excess=5, rate_per_s=0.0) == DEFAULT_RETRY_AFTER_S
+
+
+@pytest.mark.asyncio
+async def test_admit_rejects_above_high_water_mark(monkeypatch):
+    monkeypatch.setattr(get_settings(), "OCR_QUEUE_HIGH_WATER", 5)
+    q = PriorityQueue()
+    for i in range(4):
+        await q.put(i)
+
+    await admit("ocr", q, incoming=1)
+    with pytest.raises(QueueSaturated) as exc:
+        await admit("ocr", q, incoming=3)
+
+    assert exc.value.stage == "ocr"
+    assert exc.value.depth == 4
+    assert exc.value.retry_after == DEFAULT_RETRY_AFTER_S
+
+
+@pytest.mark.asyncio
+async def test_idle_stage_admits_oversized_batches(monkeypatch):
+    monkeypatch.setattr(get_settings(), "CLS_QUEUE_HIGH_WATER", 2)
+
+    await admit("cls", asyncio.Queue(), incoming=50)
+
+
+@pytest.mark.asyncio
+async def test_queue_records_drain_rate_on_get():
+    q = PriorityQueue()
+    await q.put("a")
+    await q.put("b")
+    await q.get()
+    await q.get()
+
+    assert q.drain_rate.per_second() == pytest.approx(2.0)
@@ -0,0 +1,354 @@
+import asyncio
+
+import pytest
+
+from app.workflows.base_worker import BaseWorker
+from app.workflows.queues.priority import Priority, PriorityQueue
+from app.workflows.retry import RetryPolicy
+
+
+class RecordingWorker(BaseWorker[int]):
+    def __init__(self, queue: asyncio.Queue, concurrency: int = 1, fail_on=None, release=None):
+        super().__init__(queue, worker_name="RecordingWorker", concurrency=concurrency)
+        self.fail_on = fail_on or set()
+        self.release = release
+        self.active = 0
+        self.max_active = 0
+        self.handled = []
+
+    async def handle(self, item: int):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.release is not None:
+                await self.release.wait()
+            else:
+                await asyncio.sleep(0.01)
+            if item in self.fail_on:
+                raise RuntimeError(f"boom {item}")
+            self.handled.append(item)
+        finally:
+            self.active -= 1
+
+
+async def _stop(task: asyncio.Task):
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_handles_up_to_concurrency_items_at_once():
+    queue = asyncio.Queue()
+    for i in range(10):
+        queue.put_nowait(i)
+
+    worker = RecordingWorker(queue, concurrency=3)
+    runner = asyncio.create_task(worker.run())
+
+    await asyncio.wait_for(queue.join(), timeout=2)
+    await _stop(runner)
+
+    assert sorted(worker.handled) == list(range(10))
+    assert worker.max_active == 3
+
+
+@pytest.mark.asyncio
+async def test_default_concurrency_is_sequential():
+    queue = asyncio.Queue()
+    for i in range(4):
+        queue.put_nowait(i)
+
+    worker = RecordingWorker(queue)
+    runner = asyncio.create_task(worker.run())
+
+    await asyncio.wait_for(queue.join(), timeout=2)
+    await _stop(runner)
+
+    assert worker.handled == [0, 1, 2, 3]
+    assert worker.max_active == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_item_is_acknowledged_and_loop_continues():
+    queue = asyncio.Queue()
+    for i in range(5):
+        queue.put_nowait(i)
+
+    worker = RecordingWorker(queue, concurrency=2, fail_on={1, 3})
+    runner = asyncio.create_task(worker.run())
+
+    await asyncio.wait_for(queue.join(), timeout=2)
+    await _stop(runner)
+
+    assert sorted(worker.handled) == [0, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_in_flight_handlers_and_acknowledges_them():
+    queue = asyncio.Queue()
+    for i in range(3):
+        queue.put_nowait(i)
+
+    release = asyncio.Event()  # never set: handlers block until cancelled
+    worker = RecordingWorker(queue, concurrency=2, release=release)
+    runner = asyncio.create_task(worker.run())
+
+    for _ in range(50):
+        if worker.active == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert worker.active == 2
+
+    await _stop(runner)
+
+    assert worker.active == 0
+    assert worker.handled == []
+    # two in-flight items were acknowledged, the third one is still queued
+    assert queue._unfinished_tasks == 1
+    assert queue.qsize() == 1
+
+
+class FlakyWorker(BaseWorker[int]):
+    def __init__(self, queue, failures, exc_type=TimeoutError, **kwargs):
+        super().__init__(queue, worker_name="FlakyWorker", stage="test", **kwargs)
+        self.failures = failures
+        self.exc_type = exc_type
+        self.calls = 0
+        self.flagged = []
+
+    async def handle(self, item: int):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.exc_type(f"attempt {self.calls}")
+
+    async def on_dead_letter(self, item: int, exc: Exception):
+        self.flagged.append(item)
+
+
+class FakeDeadLetters:
+    def __init__(self):
+        self.recorded = []
+
+    async def record(self, stage, worker, item, exc, attempts):
+        self.recorded.append((stage, worker, item, type(exc), attempts))
+
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001)
+
+
+async def _run_until_idle(worker: BaseWorker, queue: asyncio.Queue):
+    runner = asyncio.create_task(worker.run())
+    await asyncio.wait_for(queue.join(), timeout=2)
+    await _stop(runner)
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_until_success():
+    queue = asyncio.Queue()
+    queue.put_nowait(1)
+    dead_letters = FakeDeadLetters()
+    worker = FlakyWorker(queue, failures=2, retry_policy=FAST_RETRY, dead_letters=dead_letters)
+
+    await _run_until_idle(worker, queue)
+
+    assert worker.calls == 3
+    assert dead_letters.recorded == []
+    assert worker.flagged == []
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_are_dead_lettered():
+    queue = asyncio.Queue()
+    queue.put_nowait(7)
+    dead_letters = FakeDeadLetters()
+    worker = FlakyWorker(queue, failures=10, retry_policy=FAST_RETRY, dead_letters=dead_letters)
+
+    await _run_until_idle(worker, queue)
+
+    assert worker.calls == 3
+    assert dead_letters.recorded == [("test", "FlakyWorker", 7, TimeoutError, 3)]
+    assert worker.flagged == [7]
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_failures_are_dead_lettered_immediately():
+    queue = asyncio.Queue()
+    queue.put_nowait(7)
+    dead_letters = FakeDeadLetters()
+    worker = FlakyWorker(queue, failures=1, exc_type=ValueError, retry_policy=FAST_RETRY, dead_letters=dead_letters)
+
+    await _run_until_idle(worker, queue)
+
+    assert worker.calls == 1
+    assert dead_letters.recorded == [("test", "FlakyWorker", 7, ValueError, 1)]
+
+
+class SettlingQueue(asyncio.Queue):
+    """Durable queue stand-in recording how each item was settled."""
+
+    def __init__(self):
+        super().__init__()
+        self.acked = []
+        self.abandoned = []
+
+    async def ack(self, item):
+        self.acked.append(item)
+
+    def abandon(self, item):
+        self.abandoned.append(item)
+
+
+class BrokenDeadLetters:
+    async def record(self, stage, worker, item, exc, attempts):
+        raise RuntimeError("database gone")
+
+
+@pytest.mark.asyncio
+async def test_items_neither_acknowledged_nor_returned_are_abandoned():
+    queue = SettlingQueue()
+    queue.put_nowait(7)
+    worker = FlakyWorker(queue, failures=1, exc_type=ValueError, dead_letters=BrokenDeadLetters())
+
+    await _run_until_idle(worker, queue)
+
+    # the dead letter was not stored, so the job must come back after its visibility timeout
+    assert queue.acked == []
+    assert queue.abandoned == [7]
+
+
+def test_backoff_grows_exponentially_with_jitter_and_cap():
+    policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=5.0)
+
+    for attempt, cap in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)]:
+        delays = [policy.delay(attempt) for _ in range(50)]
+        assert all(0 <= d <= cap for d in delays)
+    assert policy.should_retry(TimeoutError(), attempt=9)
+    assert not policy.should_retry(TimeoutError(), attempt=10)
+    assert not policy.should_retry(KeyError(), attempt=1)
+
+
+class BatchingWorker(BaseWorker[int]):
+    def __init__(self, queue, fail_in_batch=(), poison=None, **kwargs):
+        super().__init__(queue, worker_name="BatchingWorker", stage="test", **kwargs)
+        self.fail_in_batch = set(fail_in_batch)
+        self.poison = poison
+        self.batches = []
+        self.singles = []
+
+    async def handle_batch(self, items):
+        self.batches.append(list(items))
+        if self.poison in items:
+            raise RuntimeError("batch failed")
+        return {i: TimeoutError(f"item {item}") for i, item in enumerate(items) if item in self.fail_in_batch}
+
+    async def handle(self, item: int):
+        self.singles.append(item)
+        if item == self.poison:
+            raise ValueError("poison")
+
+
+@pytest.mark.asyncio
+async def test_batches_fill_up_to_batch_size():
+    queue = asyncio.Queue()
+    for i in range(7):
+        queue.put_nowait(i)
+    worker = BatchingWorker(queue, batch_size=3, batch_wait_ms=50)
+
+    await _run_until_idle(worker, queue)
+
+    assert worker.batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert worker.singles == []
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_handled_after_wait():
+    queue = asyncio.Queue()
+    worker = BatchingWorker(queue, batch_size=10, batch_wait_ms=20)
+    runner = asyncio.create_task(worker.run())
+
+    queue.put_nowait(1)
+    await asyncio.sleep(0.005)
+    queue.put_nowait(2)
+    await asyncio.wait_for(queue.join(), timeout=1)
+    await _stop(runner)
+
+    assert worker.batches == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_batch_failures_are_isolated_per_item():
+    queue = asyncio.Queue()
+    for i in range(4):
+        queue.put_nowait(i)
+    dead_letters = FakeDeadLetters()
+    worker = BatchingWorker(
+        queue,
+        fail_in_batch={1},
+        poison=3,
+        batch_size=2,
+        batch_wait_ms=10,
+        retry_policy=FAST_RETRY,
+        dead_letters=dead_letters,
+    )
+
+    await _run_until_idle(worker, queue)
+
+    # item 1 failed inside its batch and was retried alone; the batch with item 3 raised,
+    # so both of its items were handled one by one and only the poisoned one was dead-lettered
+    assert worker.batches == [[0, 1], [2, 3]]
+    assert worker.singles == [1, 2, 3]
+    assert dead_letters.recorded == [("test", "BatchingWorker", 3, ValueError, 1)]
+    assert queue._unfinished_tasks == 0
+
+
+@pytest.mark.asyncio
+async def test_shutdown_lets_in_flight_items_finish_within_grace_period():
+    queue = asyncio.Queue()
+    for i in range(3):
+        queue.put_nowait(i)
+    release = asyncio.Event()
+    worker = RecordingWorker(queue, concurrency=2, release=release)
+    runner = asyncio.create_task(worker.run())
+    while worker.active < 2:
+        await asyncio.sleep(0.01)
+
+    asyncio.get_running_loop().call_later(0.05, release.set)
+    await worker.shutdown(runner, grace_s=1)
+
+    # both in-flight items finished, the waiting one was never started
+    assert sorted(worker.handled) == [0, 1]
+    assert queue.qsize() == 1
+    assert queue._unfinished_tasks == 1
+
+
+@pytest.mark.asyncio
+async def test_shutdown_returns_items_that_miss_the_deadline():
+    queue = asyncio.Queue()
+    for i in range(3):
+        queue.put_nowait(i)
+    worker = RecordingWorker(queue, concurrency=2, release=asyncio.Event())
+    runner = asyncio.create_task(worker.run())
+    while worker.active < 2:
+        await asyncio.sleep(0.01)
+
+    await worker.shutdown(runner, grace_s=0.05)
+
+    assert worker.handled == []
+    assert sorted([queue.get_nowait() for _ in range(3)]) == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_returns_items_with_their_priority():
+    queue = PriorityQueue()
+    queue.put_nowait(1, priority=Priority.INTERACTIVE)
+    worker = RecordingWorker(queue, release=asyncio.Event())
+    runner = asyncio.create_task(worker.run())
+    while worker.active < 1:
+        await asyncio.sleep(0.01)
+    queue.put_nowait(2, priority=Priority.NORMAL)
+
+    await worker.shutdown(runner, grace_s=0)
+
+    assert queue.drain_nowait() == [(1, Priority.INTERACTIVE), (2, Priority.NORMAL)]
+    assert queue._taken == []
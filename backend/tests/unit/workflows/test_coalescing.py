@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.schemas.embeddings import EmbeddingJob
+from app.schemas.ocr import PageScanRead
+from app.workflows.queues.coalescing import coalesce_key, key_for, merge_embedding_jobs, merge_items
+from app.workflows.queues.debounce import Debouncer
+from app.workflows.queues.priority import Priority, PriorityQueue
+
+
+def make_page(page_id: str, filename: str = "page.jpg") -> PageScanRead:
+    return PageScanRead(id=page_id, filename=filename, bookScanID="b1", page_number=1, scanDate=datetime.now())
+
+
+def test_keys_identify_stage_entity_and_version():
+    assert coalesce_key("emb", EmbeddingJob(recipe_id="r1", user_id="u1")) == "emb:r1:"
+    assert coalesce_key("emb", EmbeddingJob(recipe_id="r1", user_id="u1", version="v2")) == "emb:r1:v2"
+    assert coalesce_key("ocr", make_page("p1")) == "ocr:p1:"
+    assert coalesce_key("cls", object()) is None
+
+
+def test_merged_embedding_jobs_cover_both_requests():
+    merged = merge_embedding_jobs(
+        EmbeddingJob(recipe_id="r1", user_id="u1", targets=["local_bge"], reindex=True),
+        EmbeddingJob(recipe_id="r1", user_id="u1", targets=["mistralai", "local_bge"]),
+    )
+    assert list(merged.targets) == ["local_bge", "mistralai"]
+    assert merged.reindex is True
+
+    all_targets = merge_embedding_jobs(
+        EmbeddingJob(recipe_id="r1", user_id="u1"), EmbeddingJob(recipe_id="r1", user_id="u1", targets=["mistralai"])
+    )
+    assert all_targets.targets is None
+
+
+@pytest.mark.asyncio
+async def test_memory_queue_merges_waiting_duplicates():
+    q = PriorityQueue(key_of=key_for("ocr"), merge=merge_items)
+    await q.put(make_page("p1", "old.jpg"), priority=Priority.BULK)
+    await q.put(make_page("p2"), priority=Priority.BULK)
+    await q.put(make_page("p1", "new.jpg"), priority=Priority.INTERACTIVE)
+
+    assert q.qsize() == 2
+    assert q.coalesced == 1
+
+    # the duplicate moved p1 up and replaced its payload
+    first = await q.get()
+    assert (first.id, first.filename) == ("p1", "new.jpg")
+
+    # once taken, the same page is new work again
+    await q.put(make_page("p1"))
+    assert q.qsize() == 2
+
+    # task accounting only counts queued items
+    for _ in range(3):
+        q.task_done()
+    with pytest.raises(ValueError):
+        q.task_done()
+
+
+@pytest.mark.asyncio
+async def test_debouncer_collapses_a_burst_and_caps_the_delay():
+    q = PriorityQueue()
+    debouncer = Debouncer(window_s=0.05, max_delay_s=0.12)
+
+    for _ in range(6):
+        await debouncer.submit("emb", q, EmbeddingJob(recipe_id="r1", user_id="u1"))
+        await asyncio.sleep(0.03)
+
+    # the burst outlasts the cap, so a job is released while it goes on
+    assert q.qsize() >= 1
+    await asyncio.sleep(0.1)
+    assert debouncer.pending() == 0
+    assert 2 <= q.qsize() < 6
+
+
+@pytest.mark.asyncio
+async def test_debouncer_close_enqueues_held_items():
+    q = PriorityQueue()
+    debouncer = Debouncer(window_s=10)
+    await debouncer.submit("emb", q, EmbeddingJob(recipe_id="r1", user_id="u1"), Priority.BULK)
+    await debouncer.submit("cls", q, object())
+
+    assert q.qsize() == 1
+    await debouncer.close()
+    assert q.qsize() == 2
@@ -0,0 +1,40 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.worker import parse_args
+from app.workflows.ocr.ocr_worker import OCRWorker
+from app.workflows.pipeline import STAGES, build_workers, parse_stages
+from app.workflows.segmentation.segmentation_worker import SegmentationWorker
+
+
+def test_parse_stages_accepts_lists_aliases_all_and_none():
+    assert parse_stages("all") == list(STAGES)
+    assert parse_stages("ocr, embed") == ["ocr", "emb"]
+    assert parse_stages("seg,seg") == ["seg"]
+    assert parse_stages("none") == []
+    assert parse_stages("") == []
+
+
+def test_parse_stages_rejects_unknown_stage():
+    with pytest.raises(ValueError, match="thumbnails"):
+        parse_stages("ocr,thumbnails")
+
+
+def test_worker_cli_defaults_to_all_stages():
+    assert parse_args([]).stages == "all"
+    assert parse_args(["--stages", "ocr,embed"]).stages == "ocr,embed"
+
+
+def test_build_workers_only_builds_selected_stages(session_maker):
+    queues = SimpleNamespace(ocr=asyncio.Queue(), seg=asyncio.Queue(), cls=asyncio.Queue(), emb=asyncio.Queue())
+
+    workers = build_workers(["ocr", "seg"], queues=queues, storage=object(), session_maker=session_maker)
+
+    assert list(workers) == ["ocr", "seg"]
+    assert isinstance(workers["ocr"], OCRWorker)
+    assert isinstance(workers["seg"], SegmentationWorker)
+    assert workers["ocr"].entry_queue is queues.ocr
+    assert workers["seg"].entry_queue is queues.seg
+    assert build_workers([], queues=queues, storage=object(), session_maker=session_maker) == {}
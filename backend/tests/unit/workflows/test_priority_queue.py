@@ -0,0 +1,157 @@
+import asyncio
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from app.workflows.queues.priority import Priority, PriorityQueue, owner_key
+from app.workflows.queues.queues import enqueue
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_is_served_first_and_fifo_within_class():
+    q = PriorityQueue()
+    await q.put("bulk-1", priority=Priority.BULK)
+    await q.put("normal-1")
+    await q.put("bulk-2", priority=Priority.BULK)
+    await q.put("interactive-1", priority=Priority.INTERACTIVE)
+    await q.put("interactive-2", priority=Priority.INTERACTIVE)
+
+    assert q.qsize() == 5
+    served = [await q.get() for _ in range(5)]
+
+    assert served == ["interactive-1", "interactive-2", "normal-1", "bulk-1", "bulk-2"]
+    assert q.empty()
+
+
+@pytest.mark.asyncio
+async def test_starved_items_are_served_before_newer_higher_priority_work():
+    q = PriorityQueue(starvation_after=0.05)
+    await q.put("bulk-old", priority=Priority.BULK)
+    await asyncio.sleep(0.06)
+    await q.put("interactive-new", priority=Priority.INTERACTIVE)
+
+    assert await q.get() == "bulk-old"
+    assert await q.get() == "interactive-new"
+
+
+@pytest.mark.asyncio
+async def test_aged_backlog_keeps_priority_and_owner_turns():
+    q = PriorityQueue(starvation_after=0.05, starved_every=4, owner_of=lambda item: item[0])
+    for n in range(20):
+        await q.put(("a", f"bulk-{n}"), priority=Priority.BULK)
+    await asyncio.sleep(0.06)
+    await q.put(("b", "bulk"), priority=Priority.BULK)
+    await q.put(("c", "interactive"), priority=Priority.INTERACTIVE)
+
+    served = [await q.get() for _ in range(22)]
+
+    # one starved item, then priority and turns again
+    assert served[:4] == [("a", "bulk-0"), ("c", "interactive"), ("b", "bulk"), ("a", "bulk-1")]
+    assert [item for owner, item in served if owner == "a"] == [f"bulk-{n}" for n in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_wait_time_is_recorded_per_class():
+    q = PriorityQueue()
+    await q.put("a", priority=Priority.INTERACTIVE)
+    await q.put("b", priority=Priority.BULK)
+    await asyncio.sleep(0.02)
+    await q.get()
+    await q.get()
+
+    stats = q.wait_stats.snapshot()
+    assert stats["interactive"]["count"] == 1
+    assert stats["bulk"]["count"] == 1
+    assert stats["normal"]["count"] == 0
+    assert stats["bulk"]["max_wait_s"] >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_get_blocks_until_put_and_join_tracks_task_done():
+    q = PriorityQueue()
+    getter = asyncio.create_task(q.get())
+    await asyncio.sleep(0)
+    assert not getter.done()
+
+    q.put_nowait("late", priority=Priority.INTERACTIVE)
+    assert await asyncio.wait_for(getter, timeout=1) == "late"
+
+    q.task_done()
+    await asyncio.wait_for(q.join(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_helper_falls_back_to_plain_queues():
+    plain = asyncio.Queue()
+    await enqueue(plain, "x", Priority.INTERACTIVE)
+    assert await plain.get() == "x"
+
+    prio = PriorityQueue()
+    await enqueue(prio, "bulk", Priority.BULK)
+    await enqueue(prio, "interactive", Priority.INTERACTIVE)
+    assert await prio.get() == "interactive"
+
+
+@dataclass
+class OwnedJob:
+    name: str
+    owner_id: str
+
+
+@pytest.mark.asyncio
+async def test_owners_take_turns_within_a_priority_class():
+    q = PriorityQueue()
+    for i in range(3):
+        await q.put(OwnedJob(f"big-{i}", "heavy-user"))
+    await q.put(OwnedJob("small-0", "light-user"))
+    await q.put(OwnedJob("other-0", "third-user"))
+
+    served = [(await q.get()).name for _ in range(5)]
+
+    assert served == ["big-0", "small-0", "other-0", "big-1", "big-2"]
+
+
+@pytest.mark.asyncio
+async def test_fairness_does_not_override_priority():
+    q = PriorityQueue()
+    await q.put(OwnedJob("bulk-a", "a"), priority=Priority.BULK)
+    await q.put(OwnedJob("bulk-b", "b"), priority=Priority.BULK)
+    await q.put(OwnedJob("interactive-a", "a"), priority=Priority.INTERACTIVE)
+
+    assert [(await q.get()).name for _ in range(3)] == ["interactive-a", "bulk-a", "bulk-b"]
+
+
+@pytest.mark.asyncio
+async def test_requeued_item_keeps_its_priority_and_age():
+    q = PriorityQueue()
+    await q.put("interactive", priority=Priority.INTERACTIVE)
+    taken = await q.get()
+    await q.put("normal")
+    await q.put("bulk", priority=Priority.BULK)
+    enqueued_at = q._taken[0].enqueued_at
+
+    q.requeue_nowait(taken)
+
+    assert await q.get() == "interactive"
+    assert q._taken[-1].enqueued_at == enqueued_at
+
+
+@pytest.mark.asyncio
+async def test_forgotten_items_go_back_as_normal_work():
+    q = PriorityQueue()
+    await q.put("bulk", priority=Priority.BULK)
+    taken = await q.get()
+    q.forget(taken)
+    await q.put("normal", priority=Priority.NORMAL)
+
+    q.requeue_nowait(taken)
+
+    assert [await q.get(), await q.get()] == ["normal", "bulk"]
+
+
+def test_owner_key_uses_owner_then_book_scan():
+    assert owner_key(OwnedJob("x", "u1")) == "u1"
+    assert owner_key(SimpleNamespace(user_id="u2")) == "u2"
+    assert owner_key(SimpleNamespace(bookScanID="book-1")) == "book-1"
+    assert owner_key(object()) is None
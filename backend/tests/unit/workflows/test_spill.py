@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.schemas.embeddings import EmbeddingJob
+from app.schemas.ocr import PageScanRead
+from app.workflows.queues.priority import Priority, PriorityQueue
+from app.workflows.queues.queues import QueueRegistry
+from app.workflows.queues.spill import persist_queues, restore_queues
+
+
+def make_page(page_id: str) -> PageScanRead:
+    return PageScanRead(id=page_id, filename=f"{page_id}.jpg", bookScanID="b1", page_number=1, scanDate=datetime.now())
+
+
+def make_registry() -> QueueRegistry:
+    return QueueRegistry(ocr=PriorityQueue(), seg=PriorityQueue(), cls=PriorityQueue(), emb=asyncio.Queue())
+
+
+@pytest.mark.asyncio
+async def test_waiting_items_survive_a_restart(session_maker):
+    before = make_registry()
+    await before.ocr.put(make_page("p1"), priority=Priority.BULK)
+    await before.ocr.put(make_page("p2"), priority=Priority.INTERACTIVE)
+    await before.emb.put(EmbeddingJob(recipe_id="r1", user_id="u1"))
+
+    assert await persist_queues(before, session_maker) == {"ocr": 2, "emb": 1}
+    assert before.ocr.empty() and before.emb.empty()
+    # spilled items count as done, so a join() does not hang on shutdown
+    await asyncio.wait_for(before.ocr.join(), timeout=1)
+
+    after = make_registry()
+    assert await restore_queues(after, session_maker) == {"ocr": 2, "emb": 1}
+
+    # priorities are kept
+    assert (await after.ocr.get()).id == "p2"
+    assert (await after.ocr.get()).id == "p1"
+    assert (await after.emb.get()).recipe_id == "r1"
+
+    # replayed once only
+    assert await restore_queues(make_registry(), session_maker) == {}
+
+
+@pytest.mark.asyncio
+async def test_restore_stops_at_a_full_queue_and_keeps_the_rest(session_maker):
+    before = make_registry()
+    for page_id in ["p1", "p2", "p3"]:
+        await before.ocr.put(make_page(page_id))
+    await persist_queues(before, session_maker)
+
+    bounded = make_registry()
+    bounded.ocr = PriorityQueue(maxsize=1)
+    # does not wait for room, no worker runs yet
+    assert await asyncio.wait_for(restore_queues(bounded, session_maker), timeout=1) == {"ocr": 1}
+    assert bounded.ocr.get_nowait().id == "p1"
+
+    after = make_registry()
+    assert await restore_queues(after, session_maker) == {"ocr": 2}
+    assert [(await after.ocr.get()).id for _ in range(2)] == ["p2", "p3"]
@@ -0,0 +1,92 @@
+"""
+Pages per second of the Tesseract OCR backend.
+
+Compares the former two-pass implementation (image_to_string, then image_to_data) with the
+single image_to_data pass of `_extract_sync`, run page by page and in parallel through the CPU
+pool. Both keep to TESSERACT_THREADS per Tesseract.
+
+    poetry run python -m tools.tesseract_benchmark tests/data/storage/pages/*.png --repeat 3
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List
+
+import pytesseract
+from PIL import Image, ImageOps
+
+from app.core.config import get_settings
+from app.infra.ocr_pytesseract import PytesseractOCRService, _extract_sync, _limit_threads
+from app.infra.process_pool import get_process_pool, pool_size, shutdown_process_pool
+
+settings = get_settings()
+
+
+def two_pass(image_path: str, image_id: str) -> None:
+    # the implementation replaced by the single pass
+    _limit_threads(settings.TESSERACT_THREADS)
+    with Image.open(image_path) as img:
+        image = ImageOps.exif_transpose(img).copy()
+    pytesseract.image_to_string(image)
+    pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+
+
+def single_pass(image_path: str, image_id: str) -> None:
+    config = f"--oem {settings.TESSERACT_OEM} --psm {settings.TESSERACT_PSM}"
+    _extract_sync(image_path, image_id, settings.TESSERACT_LANG, config, settings.TESSERACT_THREADS)
+
+
+def sequential(fn: Callable[[str, str], None], pages: List[str]) -> None:
+    for i, page in enumerate(pages):
+        fn(page, str(i))
+
+
+def parallel(fn: Callable[[str, str], None], pages: List[str], pool: ProcessPoolExecutor) -> None:
+    list(pool.map(fn, pages, [str(i) for i in range(len(pages))]))
+
+
+async def service(pages: List[str]) -> None:
+    ocr = PytesseractOCRService(
+        lang=settings.TESSERACT_LANG,
+        oem=settings.TESSERACT_OEM,
+        psm=settings.TESSERACT_PSM,
+        threads=settings.TESSERACT_THREADS,
+    )
+    await asyncio.gather(*(ocr.extract(page, str(i)) for i, page in enumerate(pages)))
+
+
+def report(name: str, pages: int, fn: Callable[[], None]) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {pages:>5} pages  {elapsed:8.2f} s  {pages / elapsed:8.2f} pages/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="+", help="page images")
+    parser.add_argument("--repeat", type=int, default=1, help="run every page this many times")
+    args = parser.parse_args()
+
+    pages = args.pages * args.repeat
+    pool = get_process_pool()
+    if pool is None:
+        raise SystemExit("The CPU pool is disabled, set CPU_POOL_WORKERS to a value above 0")
+    # start every pool process before measuring
+    parallel(single_pass, pages[: pool_size()], pool)
+
+    print(f"tesseract {pytesseract.get_tesseract_version()}, {pool_size()} pool processes")
+    try:
+        report("two-pass, sequential", len(pages), lambda: sequential(two_pass, pages))
+        report("single-pass, sequential", len(pages), lambda: sequential(single_pass, pages))
+        report("two-pass, pool", len(pages), lambda: parallel(two_pass, pages, pool))
+        report("single-pass, pool", len(pages), lambda: parallel(single_pass, pages, pool))
+        report("service (single-pass, pool)", len(pages), lambda: asyncio.run(service(pages)))
+    finally:
+        asyncio.run(shutdown_process_pool())
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from sqlalchemy.sql.type_api import TypeEngine
 
 from app.core.config import settings
 from app.database.base import Base
-from app.models import chat, meal_plan, ocr, recent_recipe, recipe, shopping_list, user
+from app.models import chat, dead_letter, job_queue, meal_plan, ocr, recent_recipe, recipe, shopping_list, user
 
 SCHEMAS = {"public", "embeddings", "lg_checkpoints"}
 
@@ -15,7 +15,7 @@ export function useOcrData() {
 
         const fetchOCR = async () => {
             try {
-                const res = await api.get(`/recipescanner/ocr_data/${editingImageId}`);
+                const res = await api.get(`/recipescanner/ocr_data/${editingImageId}`, {params: {geometry: true}});
                 setOcrData(res.data);
             } catch (err) {
                 console.error('Failed to load OCR data:', err);